@@ -1,11 +1,11 @@
 from django.contrib import admin
-from .models import Equipment, Upload
+from .models import Equipment, IngestJob, Upload, UploadSession, UploadSummary
 
 
 @admin.register(Upload)
 class UploadAdmin(admin.ModelAdmin):
-    list_display = ['filename', 'user', 'record_count', 'uploaded_at']
-    list_filter = ['user', 'uploaded_at']
+    list_display = ['filename', 'user', 'record_count', 'rejected_count', 'status', 'uploaded_at']
+    list_filter = ['user', 'status', 'uploaded_at']
     search_fields = ['filename']
     readonly_fields = ['uploaded_at']
 
@@ -15,3 +15,22 @@ class EquipmentAdmin(admin.ModelAdmin):
     list_display = ['name', 'type', 'flowrate', 'pressure', 'temperature', 'upload']
     list_filter = ['type', 'upload']
     search_fields = ['name']
+
+
+@admin.register(IngestJob)
+class IngestJobAdmin(admin.ModelAdmin):
+    list_display = ['upload', 'status', 'rows_processed', 'created_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'user', 'total_size', 'chunk_size', 'created_at', 'upload']
+    readonly_fields = ['created_at']
+
+
+@admin.register(UploadSummary)
+class UploadSummaryAdmin(admin.ModelAdmin):
+    list_display = ['upload', 'total_count', 'updated_at']
+    readonly_fields = ['updated_at']
@@ -0,0 +1,398 @@
+"""
+Synthetic data and timing helpers for the ``benchmark`` management command.
+"""
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+
+import django
+import numpy as np
+import pandas as pd
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from .bulkload import load_rows
+from .ingest import ingest_csv
+from .models import Equipment, Upload
+from .sqlite import serialized_writes
+from .readers import iter_parallel_csv_chunks
+from .renderers import ColumnarJSONRenderer
+from .retention import apply_retention, enforce_retention
+from .serializers import EquipmentSerializer, equipment_columns
+from .utils import COLUMN_FIELDS, CSV_BACKENDS, REQUIRED_COLUMNS, iter_csv_chunks
+
+EQUIPMENT_TYPE_CODES = [code for code, _ in Equipment.EQUIPMENT_TYPES]
+
+# Rows generated per block when writing synthetic files
+WRITE_BLOCK_ROWS = 200_000
+
+
+def write_synthetic_csv(path, rows, seed=0):
+    """Write ``rows`` random equipment rows in the upload CSV format."""
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(path, 'w', newline='') as f:
+        f.write(','.join(REQUIRED_COLUMNS) + '\n')
+        while written < rows:
+            n = min(WRITE_BLOCK_ROWS, rows - written)
+            synthetic_block(rng, written, n).to_csv(f, header=False, index=False)
+            written += n
+    return path
+
+
+def synthetic_block(rng, start, n):
+    """``n`` random equipment rows with the CSV header names."""
+    ids = np.arange(start, start + n)
+    return pd.DataFrame({
+        'Equipment Name': [f'EQ-{i}' for i in ids],
+        'Type': rng.choice(EQUIPMENT_TYPE_CODES, n),
+        'Flowrate': rng.uniform(10, 500, n).round(2),
+        'Pressure': rng.uniform(1, 50, n).round(2),
+        'Temperature': rng.uniform(-20, 400, n).round(1),
+    })
+
+
+def synthetic_rows(rows, seed=0):
+    """``rows`` random equipment rows as validated (Equipment field) columns."""
+    return synthetic_block(np.random.default_rng(seed), 0, rows).rename(columns=COLUMN_FIELDS)
+
+
+@contextmanager
+def synthetic_csv(rows, seed=0):
+    """Yield the path of a temporary synthetic CSV file, removed afterwards."""
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        yield write_synthetic_csv(path, rows, seed)
+    finally:
+        os.remove(path)
+
+
+def rate(rows, seconds):
+    return rows / seconds if seconds else float('inf')
+
+
+def bench_parse(path, workers):
+    """
+    Time a full parse of ``path`` with the given number of worker processes.
+
+    One worker means the serial chunked parser; more use the parallel
+    byte-range parser with a dedicated, pre-started pool.
+
+    Returns:
+        dict: workers, rows, seconds and rows_per_sec
+    """
+    if workers == 1:
+        started = time.perf_counter()
+        with open(path, 'rb') as f:
+            rows = sum(chunk.size for chunk in iter_csv_chunks(f))
+        seconds = time.perf_counter() - started
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context('spawn'), initializer=django.setup
+        )
+        with pool:
+            # Start the workers before the clock does
+            list(pool.map(abs, range(workers)))
+            started = time.perf_counter()
+            rows = sum(chunk.size for chunk in iter_parallel_csv_chunks(path, workers, pool))
+            seconds = time.perf_counter() - started
+
+    return {
+        'workers': workers,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_sec': rate(rows, seconds),
+    }
+
+
+def bench_backend(path, backend):
+    """
+    Time a full serial parse of ``path`` with one CSV parser backend.
+
+    Returns:
+        dict: backend, rows, seconds and rows_per_sec
+    """
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        rows = sum(chunk.size for chunk in iter_csv_chunks(f, backend=backend))
+    seconds = time.perf_counter() - started
+
+    return {
+        'backend': backend,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_sec': rate(rows, seconds),
+    }
+
+
+def available_backends():
+    """CSV parser backends that can run in this environment."""
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return [backend for backend in CSV_BACKENDS if backend != 'pyarrow']
+    return list(CSV_BACKENDS)
+
+
+def bulk_create_rows(upload_id, rows, batch_size=None):
+    """Reference ORM insert path: one Equipment instance per row."""
+    Equipment.objects.bulk_create([
+        Equipment(
+            name=name,
+            type=eq_type,
+            flowrate=flowrate,
+            pressure=pressure,
+            temperature=temperature,
+            upload_id=upload_id,
+        )
+        for name, eq_type, flowrate, pressure, temperature in zip(
+            rows['name'].tolist(),
+            rows['type'].tolist(),
+            rows['flowrate'].tolist(),
+            rows['pressure'].tolist(),
+            rows['temperature'].tolist(),
+        )
+    ], batch_size=batch_size)
+
+
+INSERT_METHODS = {
+    'bulk_create': bulk_create_rows,
+    'loader': load_rows,
+}
+
+
+def bench_insert(rows, method, batch_size):
+    """
+    Time inserting ``rows`` for a throwaway upload with one insert method.
+
+    Everything runs in a transaction that is rolled back, so the database
+    is left as it was.
+
+    Returns:
+        dict: method, batch_size, rows, seconds and rows_per_sec
+    """
+    with transaction.atomic():
+        user = User.objects.create(username=f'benchmark-{time.time_ns()}')
+        upload = Upload.objects.create(filename='benchmark.csv', user=user)
+
+        started = time.perf_counter()
+        INSERT_METHODS[method](upload.id, rows, batch_size)
+        seconds = time.perf_counter() - started
+
+        transaction.set_rollback(True)
+
+    return {
+        'method': method,
+        'batch_size': batch_size,
+        'rows': len(rows),
+        'seconds': seconds,
+        'rows_per_sec': rate(len(rows), seconds),
+    }
+
+
+def delete_uploads_orm(user, keep_count):
+    """Reference retention path: ``delete()`` each surplus upload through the ORM."""
+    for upload in Upload.objects.filter(user=user).order_by('-uploaded_at')[keep_count:]:
+        upload.delete()
+
+
+def defer_retention(user, keep_count):
+    """Upload-path cost of deferred retention: the sweep is only scheduled (and never runs here)."""
+    with override_settings(RETENTION_MODE='deferred'):
+        enforce_retention(user)
+
+
+RETENTION_METHODS = {
+    'orm': delete_uploads_orm,
+    'set': apply_retention,
+    'deferred': defer_retention,
+}
+
+
+def bench_retention(rows, method, uploads=3):
+    """
+    Time trimming a user's uploads of ``len(rows)`` rows each down to one.
+
+    Everything runs in a transaction that is rolled back, so the database
+    is left as it was.
+
+    Returns:
+        dict: method, rows (per upload), surplus_rows (rows of the dropped
+        uploads), seconds and queries
+    """
+    with transaction.atomic():
+        user = User.objects.create(username=f'benchmark-{time.time_ns()}')
+        for _ in range(uploads):
+            upload = Upload.objects.create(filename='benchmark.csv', user=user, record_count=len(rows))
+            load_rows(upload.id, rows)
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            RETENTION_METHODS[method](user, 1)
+            seconds = time.perf_counter() - started
+
+        transaction.set_rollback(True)
+
+    return {
+        'method': method,
+        'rows': len(rows),
+        'surplus_rows': len(rows) * (uploads - 1),
+        'seconds': seconds,
+        'queries': len(queries),
+    }
+
+
+def render_rows_json(queryset):
+    """Reference /data/ path: model instances through EquipmentSerializer and DRF's JSONRenderer."""
+    return JSONRenderer().render(EquipmentSerializer(list(queryset), many=True).data)
+
+
+def render_rows_columns(queryset):
+    """Columnar /data/ path: values_list tuples laid out per field, fast JSON."""
+    rows = list(queryset.values_list(*EquipmentSerializer.Meta.fields))
+    return ColumnarJSONRenderer().render(equipment_columns(rows))
+
+
+RENDER_METHODS = {
+    'json': render_rows_json,
+    'columns': render_rows_columns,
+}
+
+
+def bench_render(rows, method):
+    """
+    Time fetching and rendering ``len(rows)`` equipment rows as one /data/
+    page with one response format.
+
+    Everything runs in a transaction that is rolled back, so the database
+    is left as it was.
+
+    Returns:
+        dict: method, rows, seconds, rows_per_sec and bytes (response size)
+    """
+    with transaction.atomic():
+        user = User.objects.create(username=f'benchmark-{time.time_ns()}')
+        upload = Upload.objects.create(filename='benchmark.csv', user=user, record_count=len(rows))
+        load_rows(upload.id, rows)
+        queryset = Equipment.objects.filter(upload=upload).order_by('name', 'id')
+
+        started = time.perf_counter()
+        body = RENDER_METHODS[method](queryset)
+        seconds = time.perf_counter() - started
+
+        transaction.set_rollback(True)
+
+    return {
+        'method': method,
+        'rows': len(rows),
+        'seconds': seconds,
+        'rows_per_sec': rate(len(rows), seconds),
+        'bytes': len(body),
+    }
+
+
+def latency_stats(latencies, errors):
+    """Summarize read latencies (seconds) as milliseconds."""
+    if not latencies:
+        return {'reads': 0, 'errors': errors, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+    ms = np.array(latencies) * 1000
+    return {
+        'reads': len(latencies),
+        'errors': errors,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'max_ms': float(ms.max()),
+    }
+
+
+def run_readers(readers, upload, stop):
+    """
+    Run ``readers`` threads issuing the data endpoints' queries until
+    ``stop`` is set.
+
+    Returns:
+        dict: Latency statistics (see latency_stats)
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def read_loop():
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    Upload.objects.filter(user_id=upload.user_id).first()
+                    list(Equipment.objects.filter(upload_id=upload.id)[:100])
+                except OperationalError:
+                    with lock:
+                        errors[0] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=read_loop) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    return threads, latencies, errors
+
+
+def bench_concurrency(rows, readers, idle_seconds=2.0, reader_rows=10_000):
+    """
+    Measure read latency while idle and while a ``rows``-row upload is
+    ingested through the synchronous upload path.
+
+    Creates a throwaway user with a small upload for the readers to query
+    and deletes everything afterwards.
+
+    Returns:
+        dict: ``idle`` and ``ingesting`` latency statistics, plus the
+        ingest's rows, seconds and rows_per_sec
+    """
+    user = User.objects.create(username=f'benchmark-{time.time_ns()}')
+    try:
+        reader_upload = Upload.objects.create(filename='reader.csv', user=user)
+        with transaction.atomic():
+            load_rows(reader_upload.id, synthetic_rows(reader_rows))
+
+        with synthetic_csv(rows) as path:
+            stop = threading.Event()
+            threads, latencies, errors = run_readers(readers, reader_upload, stop)
+            time.sleep(idle_seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            idle = latency_stats(latencies, errors[0])
+
+            stop = threading.Event()
+            threads, latencies, errors = run_readers(readers, reader_upload, stop)
+            started = time.perf_counter()
+            with open(path, 'rb') as f, serialized_writes(), transaction.atomic():
+                upload = Upload.objects.create(filename='benchmark.csv', user=user)
+                ingested = ingest_csv(upload, f)
+            seconds = time.perf_counter() - started
+            stop.set()
+            for thread in threads:
+                thread.join()
+            ingesting = latency_stats(latencies, errors[0])
+    finally:
+        user.delete()
+
+    return {
+        'idle': idle,
+        'ingesting': ingesting,
+        'rows': ingested,
+        'seconds': seconds,
+        'rows_per_sec': rate(ingested, seconds),
+    }
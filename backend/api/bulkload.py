@@ -0,0 +1,93 @@
+"""
+Bulk loader that writes validated equipment rows straight from column arrays.
+
+Model instances are never built: SQLite (and other backends) receive the
+rows through ``executemany`` in batches of settings.INGEST_BATCH_SIZE, and
+PostgreSQL through ``COPY ... FROM STDIN``. The caller owns the transaction.
+"""
+import io
+from itertools import islice, repeat
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Equipment
+
+# Equipment columns in insert order; upload_id is filled in per call
+ROW_FIELDS = ['name', 'type', 'flowrate', 'pressure', 'temperature']
+INSERT_COLUMNS = ROW_FIELDS + ['upload_id']
+
+
+def insert_statement():
+    """Parameterized INSERT for one equipment row."""
+    qn = connection.ops.quote_name
+    return 'INSERT INTO {} ({}) VALUES ({})'.format(
+        qn(Equipment._meta.db_table),
+        ', '.join(qn(col) for col in INSERT_COLUMNS),
+        ', '.join(['%s'] * len(INSERT_COLUMNS)),
+    )
+
+
+def copy_statement():
+    """COPY statement reading equipment rows as CSV from STDIN."""
+    qn = connection.ops.quote_name
+    return 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+        qn(Equipment._meta.db_table),
+        ', '.join(qn(col) for col in INSERT_COLUMNS),
+    )
+
+
+def load_executemany(upload_id, rows, batch_size):
+    """Insert rows with ``executemany``, ``batch_size`` rows per call."""
+    params = zip(*(rows[field].tolist() for field in ROW_FIELDS), repeat(upload_id))
+    sql = insert_statement()
+    with connection.cursor() as cursor:
+        while True:
+            batch = list(islice(params, batch_size))
+            if not batch:
+                break
+            cursor.executemany(sql, batch)
+
+
+def load_copy(upload_id, rows, batch_size):
+    """Stream rows to PostgreSQL with COPY, ``batch_size`` rows per buffer."""
+    sql = copy_statement()
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        for start in range(0, len(rows), batch_size):
+            buffer = io.StringIO()
+            rows[ROW_FIELDS].iloc[start:start + batch_size].assign(upload_id=upload_id).to_csv(
+                buffer, header=False, index=False
+            )
+            buffer.seek(0)
+            if hasattr(raw_cursor, 'copy_expert'):
+                # psycopg2
+                raw_cursor.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with raw_cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+
+def load_rows(upload_id, rows, batch_size=None):
+    """
+    Insert validated equipment rows for an upload.
+
+    Args:
+        upload_id: Id of the Upload the rows belong to
+        rows: DataFrame with Equipment field columns (see validate_chunk)
+        batch_size: Rows per statement or COPY buffer, defaults to
+            settings.INGEST_BATCH_SIZE
+
+    Returns:
+        int: Number of rows inserted
+    """
+    if rows.empty:
+        return 0
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+
+    if connection.vendor == 'postgresql':
+        load_copy(upload_id, rows, batch_size)
+    else:
+        load_executemany(upload_id, rows, batch_size)
+    return len(rows)
@@ -0,0 +1,66 @@
+"""
+Chart-ready aggregates of an upload's equipment data.
+
+Read from the upload's columnar store when it has one (see api/columnar.py),
+otherwise computed with database queries.
+"""
+import numpy as np
+
+from .columnar import NUMERIC_FIELDS, ColumnarStore
+from .models import UploadSummary
+
+
+def chart_data(upload, top=10, bins=20, points=50):
+    """
+    Build the data behind the dashboard charts.
+
+    Args:
+        upload: Upload to chart
+        top: Number of rows in the top-by-flowrate ranking
+        bins: Histogram bins per numeric field
+        points: Number of rows in the pressure/temperature sample
+
+    Returns:
+        dict: type_distribution, top_flowrate (name and flowrate, largest
+        first), histograms (edges and counts per numeric field), sample
+        (evenly spread rows) and source ('columnar' or 'database')
+    """
+    type_distribution = UploadSummary.for_upload(upload).as_dict()['type_distribution']
+    store = ColumnarStore.open(upload)
+
+    if store is not None:
+        return {
+            'type_distribution': type_distribution,
+            'top_flowrate': [
+                {'name': name, 'flowrate': value} for name, value in store.top('flowrate', top)
+            ],
+            'histograms': {field: store.histogram(field, bins) for field in NUMERIC_FIELDS},
+            'sample': store.sample(points),
+            'source': 'columnar',
+        }
+
+    # One pass over the upload's rows as plain tuples, then numpy
+    rows = upload.data_equipment
+    values = np.array(
+        list(rows.order_by().values_list('id', *NUMERIC_FIELDS).iterator()), dtype=float
+    ).reshape(-1, 1 + len(NUMERIC_FIELDS))
+    ids = values[:, 0].astype(np.int64)
+
+    histograms = {}
+    for i, field in enumerate(NUMERIC_FIELDS, start=1):
+        counts, edges = np.histogram(values[:, i], bins=bins)
+        histograms[field] = {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+    flowrates = values[:, 1]
+    top_ids = ids[np.argsort(flowrates, kind='stable')[::-1][:top]].tolist()
+    top_rows = {row['id']: row for row in rows.filter(id__in=top_ids).values('id', 'name', 'flowrate')}
+
+    return {
+        'type_distribution': type_distribution,
+        'top_flowrate': [
+            {'name': top_rows[pk]['name'], 'flowrate': top_rows[pk]['flowrate']} for pk in top_ids
+        ],
+        'histograms': histograms,
+        'sample': list(rows.values('name', *NUMERIC_FIELDS)[:points]),
+        'source': 'database',
+    }
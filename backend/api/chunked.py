@@ -0,0 +1,115 @@
+"""
+Chunk storage for resumable uploads.
+
+Chunks of an UploadSession are kept in default storage as
+``sessions/<session id>/<index>.part``; the set of files present is the
+source of truth for which chunks have been received.
+"""
+import hashlib
+import tempfile
+from itertools import islice
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+COPY_BLOCK_SIZE = 1024 * 1024
+# Most missing chunk indexes reported at once
+MISSING_CHUNKS_LIMIT = 100
+
+
+class ChunkError(ValueError):
+    """Raised when a chunk is out of range or fails verification."""
+
+
+def session_dir(session):
+    return f'sessions/{session.id}'
+
+
+def chunk_name(session, index):
+    return f'{session_dir(session)}/{index:06d}.part'
+
+
+def received_chunks(session):
+    """Return the sorted indexes of chunks already stored for a session."""
+    if not default_storage.exists(session_dir(session)):
+        return []
+    _, files = default_storage.listdir(session_dir(session))
+    return sorted(int(name.split('.')[0]) for name in files if name.endswith('.part'))
+
+
+def missing_chunks(session, limit=MISSING_CHUNKS_LIMIT):
+    """
+    Return the lowest indexes of chunks still to be sent, at most ``limit``.
+
+    Stops after the first ``limit`` gaps, so the work follows the chunks
+    received rather than the session's total.
+    """
+    received = set(received_chunks(session))
+    if len(received) >= session.total_chunks:
+        return []
+    return list(islice((i for i in range(session.total_chunks) if i not in received), limit))
+
+
+def store_chunk(session, index, data, checksum):
+    """
+    Verify and store one chunk. Re-sending a chunk replaces it.
+
+    Args:
+        session: UploadSession the chunk belongs to
+        index: Zero-based chunk number
+        data: Chunk bytes
+        checksum: Hex SHA-256 of ``data`` as computed by the client
+
+    Raises:
+        ChunkError: If the index, size or checksum is wrong
+    """
+    if not 0 <= index < session.total_chunks:
+        raise ChunkError(f'Chunk index must be between 0 and {session.total_chunks - 1}')
+
+    expected = session.expected_chunk_size(index)
+    if len(data) != expected:
+        raise ChunkError(f'Chunk {index} must be {expected} bytes, got {len(data)}')
+
+    if not checksum:
+        raise ChunkError('Missing X-Chunk-Checksum header')
+    if hashlib.sha256(data).hexdigest() != checksum.strip().lower():
+        raise ChunkError(f'Checksum mismatch for chunk {index}')
+
+    name = chunk_name(session, index)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(data))
+
+
+def assemble(session):
+    """
+    Concatenate all chunks into a temporary file, one block in memory at a time.
+
+    Returns:
+        File: Assembled file named after the session's original filename,
+        with its SHA-256 in ``content_hash``; the caller must close it
+    """
+    assembled = tempfile.TemporaryFile()
+    hasher = hashlib.sha256()
+    for index in range(session.total_chunks):
+        with default_storage.open(chunk_name(session, index), 'rb') as part:
+            for block in iter(lambda: part.read(COPY_BLOCK_SIZE), b''):
+                hasher.update(block)
+                assembled.write(block)
+    assembled.seek(0)
+
+    file = File(assembled, name=session.filename)
+    file.content_hash = hasher.hexdigest()
+    return file
+
+
+def discard(session):
+    """Delete every stored chunk of a session."""
+    for index in received_chunks(session):
+        default_storage.delete(chunk_name(session, index))
+    # Remove the now-empty session directory where the storage allows it
+    try:
+        default_storage.delete(session_dir(session))
+    except OSError:
+        pass
@@ -0,0 +1,245 @@
+"""
+Columnar, memory-mapped copy of each upload's equipment data.
+
+At ingest the rows of an upload are also appended to flat files under
+MEDIA_ROOT/columnar/<upload id>/:
+
+    flowrate.f8, pressure.f8, temperature.f8   little-endian float64 arrays
+    type.i1                                    int8 index into TYPE_CODES
+    name.off, name.bin                         int64 end offsets into the
+                                               UTF-8 bytes of all names
+    meta.json                                  committed row count
+
+Analytics read these through np.memmap, so a summary or chart over millions
+of rows is a handful of vectorized passes over mapped pages instead of a
+SQL scan building Python objects. The database stays the source of truth;
+uploads without a store fall back to queries.
+
+Only the first ``rows`` entries recorded in meta.json are valid. meta.json
+is replaced atomically once the ingest's transaction commits, so a rolled
+back or failed append leaves the previous data readable and its extra
+bytes are cut off by the next writer.
+"""
+import json
+import os
+import shutil
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from .models import Equipment
+
+TYPE_CODES = [code for code, _ in Equipment.EQUIPMENT_TYPES]
+
+NUMERIC_FIELDS = ['flowrate', 'pressure', 'temperature']
+ROW_FIELDS = ['name', 'type'] + NUMERIC_FIELDS
+FLOAT_DTYPE = np.dtype('<f8')
+TYPE_DTYPE = np.dtype('i1')
+OFFSET_DTYPE = np.dtype('<i8')
+
+
+def store_dir(upload_id):
+    return os.path.join(settings.MEDIA_ROOT, 'columnar', str(upload_id))
+
+
+def read_rows(path):
+    """Committed row count of a store directory (0 if none)."""
+    try:
+        with open(os.path.join(path, 'meta.json')) as f:
+            return json.load(f)['rows']
+    except FileNotFoundError:
+        return 0
+
+
+def delete_store(upload_id):
+    """Remove an upload's columnar store, if any."""
+    shutil.rmtree(store_dir(upload_id), ignore_errors=True)
+
+
+def map_array(path, dtype, rows):
+    """Read-only memory map of the first ``rows`` items of a column file."""
+    if rows == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+
+
+class ColumnarWriter:
+    """
+    Append validated chunks to an upload's store.
+
+    Files are opened on the first append, at the committed length
+    (discarding leftovers of an interrupted write). commit() publishes the
+    new row count when the surrounding transaction commits.
+    """
+
+    def __init__(self, upload_id):
+        self.path = store_dir(upload_id)
+        self.committed_rows = self.rows = read_rows(self.path)
+        self.name_bytes = 0
+        self.files = None
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    def open_files(self):
+        os.makedirs(self.path, exist_ok=True)
+        if self.rows:
+            offsets = map_array(self.file('name.off'), OFFSET_DTYPE, self.rows)
+            self.name_bytes = int(offsets[-1])
+            del offsets
+
+        sizes = {
+            **{f'{field}.f8': self.rows * FLOAT_DTYPE.itemsize for field in NUMERIC_FIELDS},
+            'type.i1': self.rows * TYPE_DTYPE.itemsize,
+            'name.off': self.rows * OFFSET_DTYPE.itemsize,
+            'name.bin': self.name_bytes,
+        }
+        self.files = {}
+        for name, size in sizes.items():
+            f = open(self.file(name), 'ab')
+            f.truncate(size)
+            self.files[name] = f
+
+    def append(self, rows):
+        """Append a DataFrame of validated rows (see validate_chunk)."""
+        if rows.empty:
+            return
+        if self.files is None:
+            self.open_files()
+
+        for field in NUMERIC_FIELDS:
+            self.files[f'{field}.f8'].write(rows[field].to_numpy(dtype=FLOAT_DTYPE).tobytes())
+
+        codes = pd.Categorical(rows['type'], categories=TYPE_CODES).codes.astype(TYPE_DTYPE)
+        self.files['type.i1'].write(codes.tobytes())
+
+        encoded = [name.encode() for name in rows['name'].tolist()]
+        lengths = np.fromiter(map(len, encoded), dtype=OFFSET_DTYPE, count=len(encoded))
+        offsets = np.cumsum(lengths) + self.name_bytes
+        self.files['name.off'].write(offsets.tobytes())
+        self.files['name.bin'].write(b''.join(encoded))
+        self.name_bytes = int(offsets[-1])
+        self.rows += len(rows)
+
+    def commit(self):
+        """Flush the data and publish the row count once the transaction commits."""
+        if self.files is None:
+            return
+        for f in self.files.values():
+            f.flush()
+            os.fsync(f.fileno())
+        rows = self.rows
+        transaction.on_commit(lambda: self.write_meta(rows))
+
+    def write_meta(self, rows):
+        tmp = self.file('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'rows': rows, 'types': TYPE_CODES}, f)
+        os.replace(tmp, self.file('meta.json'))
+
+    def close(self):
+        if self.files is not None:
+            for f in self.files.values():
+                f.close()
+            self.files = None
+
+    def abort(self):
+        """Close after a failed ingest; a store that never committed is removed."""
+        self.close()
+        if not self.committed_rows:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+def writer_for(upload):
+    """
+    A ColumnarWriter for the upload, or None if the store is disabled.
+
+    An upload whose store is missing or out of step with its rows (ingested
+    before the store existed, or while it was disabled) first has its
+    existing rows copied in from the database.
+    """
+    if not settings.COLUMNAR_STORE_ENABLED:
+        return None
+    writer = ColumnarWriter(upload.data_upload_id)
+    if writer.committed_rows != upload.record_count:
+        delete_store(upload.data_upload_id)
+        writer = ColumnarWriter(upload.data_upload_id)
+        rows = Equipment.objects.filter(upload_id=upload.data_upload_id).order_by('id').values_list(
+            *ROW_FIELDS
+        ).iterator(chunk_size=settings.CSV_CHUNK_SIZE)
+        while True:
+            batch = list(islice(rows, settings.CSV_CHUNK_SIZE))
+            if not batch:
+                break
+            writer.append(pd.DataFrame(batch, columns=ROW_FIELDS))
+    return writer
+
+
+class ColumnarStore:
+    """Read-only, memory-mapped view of an upload's committed columns."""
+
+    def __init__(self, path, rows):
+        self.path = path
+        self.rows = rows
+        self.columns = {
+            field: map_array(os.path.join(path, f'{field}.f8'), FLOAT_DTYPE, rows)
+            for field in NUMERIC_FIELDS
+        }
+        self.type_codes = map_array(os.path.join(path, 'type.i1'), TYPE_DTYPE, rows)
+        self.name_offsets = map_array(os.path.join(path, 'name.off'), OFFSET_DTYPE, rows)
+        name_length = int(self.name_offsets[-1]) if rows else 0
+        self.name_bytes = map_array(os.path.join(path, 'name.bin'), np.uint8, name_length)
+
+    @classmethod
+    def open(cls, upload):
+        """The store of the upload owning ``upload``'s rows, or None."""
+        if not settings.COLUMNAR_STORE_ENABLED:
+            return None
+        path = store_dir(upload.data_upload_id)
+        rows = read_rows(path)
+        if rows != upload.record_count or not os.path.exists(os.path.join(path, 'meta.json')):
+            # Missing, or behind the database (e.g. written while disabled)
+            return None
+        return cls(path, rows)
+
+    def name(self, index):
+        start = int(self.name_offsets[index - 1]) if index else 0
+        return bytes(self.name_bytes[start:int(self.name_offsets[index])]).decode()
+
+    def type_stats(self):
+        """Per-type count and sum/min/max of each numeric field, as kept by UploadSummary."""
+        counts = np.bincount(self.type_codes, minlength=len(TYPE_CODES))
+        stats = {TYPE_CODES[code]: {'count': int(count)} for code, count in enumerate(counts) if count}
+        for field, values in self.columns.items():
+            grouped = pd.Series(values, copy=False).groupby(self.type_codes).agg(['sum', 'min', 'max'])
+            for code, row in grouped.iterrows():
+                for agg in ('sum', 'min', 'max'):
+                    stats[TYPE_CODES[code]][f'{agg}_{field}'] = float(row[agg])
+        return stats
+
+    def top(self, field, count):
+        """(name, value) of the ``count`` rows with the largest ``field``."""
+        values = self.columns[field]
+        count = min(count, self.rows)
+        if not count:
+            return []
+        indices = np.argpartition(values, -count)[-count:]
+        indices = indices[np.argsort(values[indices])[::-1]]
+        return [(self.name(i), float(values[i])) for i in indices]
+
+    def histogram(self, field, bins):
+        counts, edges = np.histogram(self.columns[field], bins=bins)
+        return {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+    def sample(self, count):
+        """Evenly spaced rows as dicts of name and numeric fields."""
+        if not self.rows:
+            return []
+        indices = np.unique(np.linspace(0, self.rows - 1, min(count, self.rows)).astype(np.int64))
+        return [
+            {'name': self.name(i), **{field: float(self.columns[field][i]) for field in NUMERIC_FIELDS}}
+            for i in indices
+        ]
@@ -0,0 +1,130 @@
+"""
+Conditional GET support (ETag / Last-Modified) for read endpoints.
+
+An upload's data only changes when rows are appended to it, which also
+saves its stored summary, so (upload, owner of the rows, record count,
+summary update time) identifies the data a response was built from. Views
+derive validators from the upload they already resolve, before running
+their main query, and answer a matching ``If-None-Match`` or
+``If-Modified-Since`` with ``304 Not Modified`` and no body.
+
+An upload still being ingested commits its rows chunk by chunk before its
+record count or summary change, and loses them if the ingest fails, so
+responses built from it get no validators and are never cached.
+"""
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import Upload, UploadSummary
+from .responsecache import cached_response
+
+# Clients may keep responses but must revalidate them before every use
+CACHE_CONTROL = 'private, no-cache'
+
+
+def data_modified(upload):
+    """
+    When ``upload``'s rows last changed: its upload time, or the last
+    update of its stored summary (appends) when that is later.
+
+    Uses the summary fetched with ``select_related('summary',
+    'data_source__summary')``.
+    """
+    owner = upload.data_source if upload.data_source_id else upload
+    try:
+        return max(upload.uploaded_at, owner.summary.updated_at)
+    except UploadSummary.DoesNotExist:
+        return upload.uploaded_at
+
+
+def is_settled(upload):
+    """True when ``upload``'s rows only change along with its version (no upload counts)."""
+    return upload is None or upload.status == Upload.STATUS_READY
+
+
+def upload_version(upload):
+    """Parts of a validator identifying ``upload``'s current data (None: no upload)."""
+    if upload is None:
+        return (None,)
+    return (
+        upload.id, upload.status, upload.data_upload_id, upload.record_count,
+        data_modified(upload).isoformat()
+    )
+
+
+def make_etag(request, *parts):
+    """
+    Strong ETag of a response made from ``parts`` for ``request``.
+
+    The endpoint, its query string and the renderer negotiated for the
+    request (``?format=`` or the Accept header) are included, so
+    differently filtered or formatted responses of the same upload never
+    share a tag, nor the response cache entry keyed by it.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = repr((
+        request.path, sorted(request.query_params.lists()),
+        renderer.media_type if renderer else None, parts
+    ))
+    return '"%s"' % hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def upload_validators(request, upload, *parts):
+    """
+    (ETag, Last-Modified) of a response built from ``upload`` (may be
+    None), or (None, None) while the upload is not settled.
+    """
+    if not is_settled(upload):
+        return None, None
+    last_modified = data_modified(upload) if upload is not None else None
+    return make_etag(request, *upload_version(upload), *parts), last_modified
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    The conditional response (``304 Not Modified``, or 412 for a failed
+    ``If-Match``) for a request whose validators decide it, or None when
+    the full response has to be sent (always without an ETag).
+    """
+    if etag is None:
+        return None
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Add ETag, Last-Modified, Cache-Control and Vary headers to a response.
+
+    The representation depends on the Accept header, so caches must not
+    reuse it for requests accepting something else.
+    """
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(timegm(last_modified.utctimetuple()))
+    response['Cache-Control'] = CACHE_CONTROL
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def conditional_response(request, build, etag, last_modified=None):
+    """
+    Answer ``request`` with a 304 when its validators match, otherwise
+    with the response returned by ``build()`` (or cached from an earlier
+    call, see api/responsecache.py), carrying the validators if it
+    succeeded. Without an ETag the response is always built and not cached.
+    """
+    if etag is None:
+        return build()
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = cached_response(request, build, etag)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+    return response
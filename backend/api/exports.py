@@ -0,0 +1,119 @@
+"""
+Export of an upload's equipment rows to downloadable file formats.
+
+CSV and NDJSON are streamed: rows are read through a chunked database
+iterator and encoded one batch at a time, so server memory stays flat
+whatever the size of the upload.
+"""
+import csv
+import io
+import tempfile
+import zlib
+from itertools import islice
+
+from django.conf import settings
+
+from .renderers import dumps
+from .utils import COLUMN_FIELDS, REQUIRED_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for Parquet export
+    pa = pq = None
+
+# Equipment fields in export column order
+EXPORT_FIELDS = [COLUMN_FIELDS[col] for col in REQUIRED_COLUMNS]
+
+
+def iter_export_rows(upload):
+    """Stream an upload's rows as value tuples in EXPORT_FIELDS order."""
+    return upload.data_equipment.order_by('name', 'id').values_list(
+        *EXPORT_FIELDS
+    ).iterator(chunk_size=settings.EXPORT_BATCH_SIZE)
+
+
+def iter_batches(upload):
+    """An upload's export rows in lists of at most settings.EXPORT_STREAM_ROWS."""
+    rows = iter_export_rows(upload)
+    while True:
+        batch = list(islice(rows, settings.EXPORT_STREAM_ROWS))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_csv(upload):
+    """
+    Stream an upload as CSV bytes, with the upload CSV header, so the
+    export can be uploaded again as-is.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(REQUIRED_COLUMNS)
+    for batch in iter_batches(upload):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an upload without rows
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def iter_ndjson(upload):
+    """Stream an upload as newline-delimited JSON objects keyed by Equipment field name."""
+    for batch in iter_batches(upload):
+        yield b''.join(dumps(dict(zip(EXPORT_FIELDS, row))) + b'\n' for row in batch)
+
+
+def gzip_stream(chunks):
+    """Gzip a stream of byte chunks on the fly."""
+    # wbits 16 + MAX_WBITS: gzip header and trailer instead of raw zlib
+    compressor = zlib.compressobj(level=6, wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def parquet_schema():
+    """Arrow schema of exported files; column names match the upload CSV header."""
+    return pa.schema([
+        ('Equipment Name', pa.string()),
+        ('Type', pa.string()),
+        ('Flowrate', pa.float64()),
+        ('Pressure', pa.float64()),
+        ('Temperature', pa.float64()),
+    ])
+
+
+def write_parquet(upload):
+    """
+    Write an upload's equipment rows to a temporary Parquet file.
+
+    Rows are fetched and written one row group at a time, so memory is
+    bounded by settings.EXPORT_BATCH_SIZE. The file can be uploaded again
+    as-is.
+
+    Returns:
+        file: Temporary file positioned at the start; deleted when closed
+    """
+    schema = parquet_schema()
+    output = tempfile.TemporaryFile()
+    rows = iter_export_rows(upload)
+
+    with pq.ParquetWriter(output, schema) as writer:
+        while True:
+            batch = list(islice(rows, settings.EXPORT_BATCH_SIZE))
+            if not batch:
+                break
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+
+    output.seek(0)
+    return output
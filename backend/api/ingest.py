@@ -0,0 +1,239 @@
+"""
+Streaming ingestion of uploaded equipment data into the database.
+"""
+import logging
+import tempfile
+import time
+
+import pandas as pd
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+
+from . import columnar
+from .bulkload import load_rows
+from .models import Upload, UploadSummary
+from .sqlite import serialized_writes
+from .readers import iter_upload_chunks
+
+logger = logging.getLogger(__name__)
+
+
+def insert_chunk(upload, chunk):
+    """
+    Insert one cleaned chunk of equipment rows for an upload.
+
+    The chunk is written in one transaction (a savepoint when the caller
+    already holds one) as the process's single SQLite writer.
+
+    Args:
+        upload: Upload the rows belong to
+        chunk: Accepted rows of a ValidatedChunk
+
+    Returns:
+        int: Number of rows inserted
+    """
+    with serialized_writes(), transaction.atomic():
+        return load_rows(upload.id, chunk)
+
+
+class RejectedRowsWriter:
+    """
+    Spool rejected rows to a temporary CSV, stored once ingest completes.
+
+    Rows are numbered from 1 for the first data row after the header,
+    continuing across chunks. Rows of a ZIP upload are numbered within
+    their member, named in a leading File column.
+    """
+    def __init__(self):
+        self.count = 0
+        self._file = None
+
+    def write(self, rejected, offset, source=''):
+        """
+        Append a chunk's rejected rows; ``offset`` is the chunk's first row
+        index within ``source``, the ZIP member it came from.
+        """
+        if rejected.empty:
+            return
+        rejected = rejected.assign(row=rejected['row'] + offset + 1)
+        if source:
+            rejected.insert(0, 'File', source)
+
+        header = self._file is None
+        if header:
+            self._file = tempfile.TemporaryFile()
+        rejected.rename(columns={'row': 'Row', 'reason': 'Reason'}).to_csv(
+            self._file, header=header, index=False
+        )
+        self.count += len(rejected)
+
+    def save(self, upload):
+        """Store the spooled file for an upload and return its storage name."""
+        if self._file is None:
+            return ''
+        self._file.seek(0)
+        return default_storage.save(f'rejects/{upload.id}.csv', File(self._file))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def ingest_csv(upload, file, filename=None, chunksize=None, on_chunk=None):
+    """
+    Stream a CSV file, plain or compressed, into Equipment rows chunk by chunk.
+
+    Only one chunk is held in memory at a time, so peak memory is bounded
+    by the chunk size rather than the file size. The caller owns the
+    transaction.
+
+    Rows that fail validation are skipped and written to a rejected-rows
+    CSV; its storage name and the rejected count are set on ``upload`` (and
+    saved) when the whole file has been read, replacing those of any
+    earlier ingest. The upload's stored summary is updated chunk by chunk
+    from the new rows only, so appending to an existing upload costs the
+    same as ingesting the appended rows. When the columnar store is
+    enabled the rows are also appended to it (see api/columnar.py).
+
+    Args:
+        upload: Upload the rows belong to
+        file: File-like object containing CSV data
+        filename: Original filename used to detect compression, defaults
+            to ``file.name``
+        chunksize: Rows per chunk, defaults to settings.CSV_CHUNK_SIZE
+        on_chunk: Optional callable receiving the running row total after
+            each chunk, used for progress reporting
+
+    Returns:
+        int: Total number of rows inserted
+
+    Raises:
+        CSVFormatError: If the file is malformed or lacks required columns
+    """
+    started = time.monotonic()
+    total = 0
+    source = offset = None
+    rejects = RejectedRowsWriter()
+    # A new upload has no summary to load yet; appends merge into theirs
+    appending = upload.record_count > 0
+    summary = UploadSummary.for_upload(upload) if appending else UploadSummary(upload=upload)
+    store = columnar.writer_for(upload)
+    previous_rejects = upload.rejects_file
+
+    try:
+        for chunk in iter_upload_chunks(file, filename, chunksize):
+            if chunk.source != source:
+                # Each ZIP member numbers its rows from its own header
+                source, offset = chunk.source, 0
+            rejects.write(chunk.rejected, offset, source)
+            offset += chunk.size
+            if not chunk.rows.empty:
+                total += insert_chunk(upload, chunk.rows)
+                summary.add_rows(chunk.rows)
+                if store:
+                    store.append(chunk.rows)
+                if on_chunk:
+                    on_chunk(total)
+
+        # Updated in place when a summary of the upload already exists
+        summary.save()
+        if store:
+            store.commit()
+        upload.rejected_count = rejects.count
+        upload.rejects_file = rejects.save(upload)
+        if previous_rejects:
+            transaction.on_commit(lambda: default_storage.delete(previous_rejects))
+        Upload.objects.filter(id=upload.id).update(
+            rejected_count=upload.rejected_count,
+            rejects_file=upload.rejects_file
+        )
+    except Exception:
+        if store:
+            store.abort()
+        raise
+    finally:
+        rejects.close()
+        if store:
+            store.close()
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        'Ingested %d rows into upload %s in %.2fs (%.0f rows/s), rejected %d',
+        total, upload.id, elapsed, total / elapsed if elapsed else 0, rejects.count,
+    )
+    return total
+
+
+def append_csv(upload, file, filename=None):
+    """
+    Append the rows of another file to an existing upload.
+
+    The caller owns the transaction. The upload stops being a
+    deduplication candidate, since its content no longer matches the file
+    it was fingerprinted from.
+
+    Returns:
+        int: Number of rows appended
+    """
+    appended = ingest_csv(upload, file, filename)
+    Upload.objects.filter(id=upload.id).update(
+        record_count=models.F('record_count') + appended,
+        content_hash=''
+    )
+    upload.refresh_from_db(fields=['record_count', 'content_hash'])
+    return appended
+
+
+def rejected_sample(upload, limit=10):
+    """
+    First ``limit`` rejected rows of an upload as dicts with row and reason,
+    and the file (ZIP member) of a ZIP upload.
+    """
+    if not upload.rejects_file:
+        return []
+    with default_storage.open(upload.rejects_file, 'rb') as f:
+        head = pd.read_csv(
+            f, usecols=lambda column: column in ('File', 'Row', 'Reason'), nrows=limit,
+            dtype={'File': str, 'Reason': str}
+        )
+    return head.rename(columns=str.lower).to_dict('records')
+
+
+def find_duplicate_upload(user, content_hash):
+    """
+    Find an earlier upload with identical content whose rows can be shared.
+
+    Only uploads that own their rows are candidates, and only the user's own
+    uploads unless settings.UPLOAD_DEDUP_ACROSS_USERS is set.
+
+    Returns:
+        Upload or None
+    """
+    if not content_hash or not settings.UPLOAD_DEDUP_ENABLED:
+        return None
+
+    candidates = Upload.objects.filter(
+        content_hash=content_hash,
+        data_source__isnull=True,
+        status__in=[Upload.STATUS_READY, Upload.STATUS_RETIRED]
+    )
+    if not settings.UPLOAD_DEDUP_ACROSS_USERS:
+        candidates = candidates.filter(user=user)
+    return candidates.order_by('-uploaded_at').first()
+
+
+def create_duplicate_upload(user, filename, source):
+    """Record a ready upload that shares the equipment rows of ``source``."""
+    return Upload.objects.create(
+        filename=filename,
+        user=user,
+        record_count=source.record_count,
+        rejected_count=source.rejected_count,
+        rejects_file=source.rejects_file,
+        content_hash=source.content_hash,
+        data_source=source,
+        status=Upload.STATUS_READY
+    )
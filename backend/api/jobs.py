@@ -0,0 +1,224 @@
+"""
+Background ingestion queue.
+
+Jobs are stored in the database (IngestJob) and the upload file is kept in
+default storage until the job finishes. Each web process runs a small local
+thread pool that picks up the jobs it enqueues; the ``run_ingest_worker``
+management command drains any queued jobs left behind by a restarted
+process. Jobs are claimed with a conditional UPDATE, so several processes
+can safely share the queue without an external broker. A running job's
+worker refreshes its heartbeat with every chunk; jobs whose worker died
+are re-queued by ``run_ingest_worker`` (see recover_stale_jobs).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import columnar
+from .ingest import ingest_csv
+from .models import Equipment, IngestJob, Upload, UploadSummary
+from .responsecache import invalidate_user
+from .retention import enforce_retention
+from .sqlite import serialized_writes
+from .utils import CSVFormatError
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide ingest thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.INGEST_WORKERS,
+                thread_name_prefix='ingest',
+            )
+        return _executor
+
+
+def enqueue_ingest(upload, file):
+    """
+    Persist an uploaded file and queue it for background ingestion.
+
+    The job is handed to the local worker pool once the surrounding
+    transaction commits.
+
+    Args:
+        upload: Pending Upload the rows will belong to
+        file: Uploaded file object
+
+    Returns:
+        IngestJob: The queued job
+    """
+    file_name = default_storage.save(f'ingest/{upload.id}_{file.name}', file)
+    job = IngestJob.objects.create(upload=upload, file_name=file_name)
+    transaction.on_commit(lambda: get_executor().submit(run_job, job.id))
+    return job
+
+
+def claim_job(job_id):
+    """Atomically move a queued job to running; False if already taken."""
+    now = timezone.now()
+    with serialized_writes():
+        return IngestJob.objects.filter(
+            id=job_id,
+            status=IngestJob.STATUS_QUEUED
+        ).update(status=IngestJob.STATUS_RUNNING, started_at=now, heartbeat_at=now) == 1
+
+
+def stale_cutoff():
+    """Heartbeats older than this belong to workers presumed dead."""
+    return timezone.now() - timedelta(seconds=settings.INGEST_STALE_AFTER)
+
+
+def stale_jobs():
+    """Running jobs whose worker has not reported in since stale_cutoff()."""
+    cutoff = stale_cutoff()
+    return IngestJob.objects.filter(status=IngestJob.STATUS_RUNNING).filter(
+        # Jobs claimed before heartbeats were recorded go by their start
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+
+
+def recover_stale_jobs():
+    """
+    Re-queue running jobs whose worker died mid-ingest.
+
+    A restarted or crashed process leaves its jobs running forever. Their
+    partial rows are removed and they are queued again, or failed if their
+    stored file is gone.
+
+    Returns:
+        tuple: (jobs re-queued, jobs failed)
+    """
+    requeued = failed = 0
+    stale = stale_jobs()
+    for job in list(stale.select_related('upload')):
+        file_kept = default_storage.exists(job.file_name)
+        if file_kept:
+            job_fields = {'status': IngestJob.STATUS_QUEUED, 'rows_processed': 0,
+                          'started_at': None, 'heartbeat_at': None}
+        else:
+            job_fields = {'status': IngestJob.STATUS_FAILED, 'finished_at': timezone.now(),
+                          'error': 'Ingest worker stopped and the uploaded file is gone'}
+
+        with serialized_writes(), transaction.atomic():
+            # Skip a job whose worker reported in since it was read
+            if not stale.filter(id=job.id).update(**job_fields):
+                continue
+            Equipment.objects.filter(upload_id=job.upload_id).delete()
+            UploadSummary.objects.filter(upload_id=job.upload_id).delete()
+            Upload.objects.filter(id=job.upload_id).update(
+                status=Upload.STATUS_PENDING if file_kept else Upload.STATUS_FAILED
+            )
+            invalidate_user(job.upload.user_id)
+        columnar.delete_store(job.upload_id)
+
+        logger.warning('Ingest job %s had stalled; %s', job.id, 're-queued' if file_kept else 'failed')
+        if file_kept:
+            requeued += 1
+        else:
+            failed += 1
+    return requeued, failed
+
+
+def run_job(job_id):
+    """Thread pool entry point: process a job and release the DB connection."""
+    close_old_connections()
+    try:
+        process_job(job_id)
+    except Exception:
+        logger.exception('Ingest job %s crashed', job_id)
+    finally:
+        close_old_connections()
+
+
+def process_job(job_id):
+    """
+    Ingest the file of a queued job.
+
+    Rows are committed chunk by chunk so ``rows_processed`` is visible to the
+    job-status API while the ingest runs. On failure the partial rows are
+    removed and both the job and its upload are marked failed.
+
+    Returns:
+        bool: True if this call claimed and ran the job
+    """
+    if not claim_job(job_id):
+        return False
+
+    job = IngestJob.objects.select_related('upload__user').get(id=job_id)
+    upload = job.upload
+    with serialized_writes():
+        Upload.objects.filter(id=upload.id).update(status=Upload.STATUS_PROCESSING)
+
+    def report_progress(rows):
+        with serialized_writes():
+            IngestJob.objects.filter(id=job.id).update(rows_processed=rows, heartbeat_at=timezone.now())
+
+    try:
+        with default_storage.open(job.file_name, 'rb') as file:
+            record_count = ingest_csv(upload, file, on_chunk=report_progress)
+
+        if not record_count:
+            raise CSVFormatError('CSV file contains no valid data')
+
+        with serialized_writes(), transaction.atomic():
+            Upload.objects.filter(id=upload.id).update(
+                record_count=record_count,
+                status=Upload.STATUS_READY
+            )
+            enforce_retention(upload.user)
+            invalidate_user(upload.user_id)
+            IngestJob.objects.filter(id=job.id).update(
+                status=IngestJob.STATUS_SUCCEEDED,
+                rows_processed=record_count,
+                finished_at=timezone.now()
+            )
+    except Exception as e:
+        if not isinstance(e, CSVFormatError):
+            logger.exception('Ingest job %s failed', job.id)
+        with serialized_writes(), transaction.atomic():
+            Equipment.objects.filter(upload_id=upload.id).delete()
+            UploadSummary.objects.filter(upload_id=upload.id).delete()
+            Upload.objects.filter(id=upload.id).update(status=Upload.STATUS_FAILED)
+            invalidate_user(upload.user_id)
+            IngestJob.objects.filter(id=job.id).update(
+                status=IngestJob.STATUS_FAILED,
+                error=str(e),
+                finished_at=timezone.now()
+            )
+        columnar.delete_store(upload.id)
+    finally:
+        default_storage.delete(job.file_name)
+
+    return True
+
+
+def process_queued_jobs(limit=None):
+    """
+    Run queued jobs in the current thread, oldest first.
+
+    Returns:
+        int: Number of jobs processed
+    """
+    processed = 0
+    queued = IngestJob.objects.filter(
+        status=IngestJob.STATUS_QUEUED
+    ).order_by('created_at').values_list('id', flat=True)
+
+    for job_id in list(queued[:limit] if limit else queued):
+        if process_job(job_id):
+            processed += 1
+    return processed
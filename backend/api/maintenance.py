@@ -0,0 +1,253 @@
+"""
+Periodic database and storage maintenance.
+
+A maintenance run (see the ``run_maintenance`` command) performs, in order:
+
+- retention: trims every user to their keep count and deletes retired
+  uploads no duplicate shares any more (see api/retention.py);
+- orphan cleanup: removes ingest files without a pending job, chunks of
+  abandoned resumable uploads, rejected-rows files and columnar stores of
+  uploads that no longer exist;
+- database upkeep: incremental VACUUM and ANALYZE/optimize on SQLite,
+  VACUUM ANALYZE on PostgreSQL.
+
+Runs only start inside settings.MAINTENANCE_WINDOW and while no ingest is
+running, so they do not compete with uploads for the single SQLite writer.
+"""
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import chunked
+from .jobs import stale_cutoff
+from .models import Equipment, IngestJob, Upload, UploadSession, UploadSummary
+from .retention import delete_uploads, sweep
+from .sqlite import serialized_writes
+
+logger = logging.getLogger(__name__)
+
+
+def parse_window(window):
+    """
+    Parse a "HH:MM-HH:MM" maintenance window.
+
+    Returns:
+        tuple: (start, end) datetime.time, or None for an empty window
+        (maintenance allowed at any time). The window may wrap midnight.
+    """
+    if not window:
+        return None
+    start, end = (datetime.strptime(part.strip(), '%H:%M').time() for part in window.split('-'))
+    return start, end
+
+
+def in_window(now=None):
+    """True if local time ``now`` (default: current) is inside settings.MAINTENANCE_WINDOW."""
+    window = parse_window(settings.MAINTENANCE_WINDOW)
+    if window is None:
+        return True
+    current = timezone.localtime(now).time()
+    start, end = window
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def ingest_running():
+    """
+    True while a worker is ingesting: a job is running and has reported in
+    since stale_cutoff(). Queued jobs and jobs whose worker died do not
+    hold maintenance off.
+    """
+    return IngestJob.objects.filter(
+        status=IngestJob.STATUS_RUNNING, heartbeat_at__gte=stale_cutoff()
+    ).exists()
+
+
+class Report(dict):
+    """Counters of one maintenance run; missing counters read as 0."""
+
+    def __missing__(self, key):
+        return 0
+
+
+def purge_retired(report):
+    """Delete retired uploads whose rows no duplicate shares any more."""
+    orphaned = Upload.objects.filter(status=Upload.STATUS_RETIRED, duplicates__isnull=True)
+    with serialized_writes(), transaction.atomic():
+        ids = list(orphaned.values_list('id', flat=True))
+        report['equipment_rows_deleted'] += delete_uploads(ids)
+    report['uploads_deleted'] += len(ids)
+
+
+def trim_uploads(report):
+    """Apply every user's retention window."""
+    deleted, retired, rows = sweep()
+    report['uploads_deleted'] += deleted
+    report['uploads_retired'] += retired
+    report['equipment_rows_deleted'] += rows
+
+
+def storage_files(directory):
+    """Names (relative to default storage) of the files directly in a directory."""
+    if not default_storage.exists(directory):
+        return []
+    _, files = default_storage.listdir(directory)
+    return [f'{directory}/{name}' for name in files]
+
+
+def older_than(name, cutoff):
+    return default_storage.get_modified_time(name) < cutoff
+
+
+def remove_file(name, report):
+    report['bytes_freed'] += default_storage.size(name)
+    default_storage.delete(name)
+    report['files_removed'] += 1
+
+
+def clean_orphans(report):
+    """
+    Remove stored artifacts nothing refers to any more.
+
+    Files younger than settings.MAINTENANCE_ORPHAN_GRACE seconds are kept, so
+    a file written just before its database row commits is never taken.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.MAINTENANCE_ORPHAN_GRACE)
+
+    # Upload files of background jobs that finished or were deleted
+    pending = set(IngestJob.objects.filter(
+        status__in=[IngestJob.STATUS_QUEUED, IngestJob.STATUS_RUNNING]
+    ).values_list('file_name', flat=True))
+    for name in storage_files('ingest'):
+        if name not in pending and older_than(name, cutoff):
+            remove_file(name, report)
+
+    # Rejected-rows files no upload points at
+    referenced = set(Upload.objects.exclude(rejects_file='').values_list('rejects_file', flat=True))
+    for name in storage_files('rejects'):
+        if name not in referenced and older_than(name, cutoff):
+            remove_file(name, report)
+
+    # Resumable uploads abandoned before finalize, and chunk folders
+    # whose session is gone
+    abandoned = UploadSession.objects.filter(
+        upload__isnull=True,
+        created_at__lt=timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    )
+    for session in abandoned:
+        for index in chunked.received_chunks(session):
+            report['bytes_freed'] += default_storage.size(chunked.chunk_name(session, index))
+            report['files_removed'] += 1
+        chunked.discard(session)
+        with serialized_writes():
+            session.delete()
+        report['sessions_deleted'] += 1
+
+    if default_storage.exists('sessions'):
+        session_ids = {str(pk) for pk in UploadSession.objects.values_list('id', flat=True)}
+        for folder in default_storage.listdir('sessions')[0]:
+            if folder not in session_ids:
+                for name in storage_files(f'sessions/{folder}'):
+                    if older_than(name, cutoff):
+                        remove_file(name, report)
+
+    # Columnar stores of uploads that no longer own rows
+    root = os.path.join(settings.MEDIA_ROOT, 'columnar')
+    if os.path.isdir(root):
+        owners = {str(pk) for pk in Upload.objects.filter(data_source__isnull=True).values_list('id', flat=True)}
+        for folder in os.listdir(root):
+            path = os.path.join(root, folder)
+            if folder in owners or os.path.getmtime(path) >= cutoff.timestamp():
+                continue
+            report['bytes_freed'] += sum(
+                os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+            )
+            shutil.rmtree(path, ignore_errors=True)
+            report['stores_removed'] += 1
+
+
+def sqlite_pragma(cursor, name):
+    cursor.execute(f'PRAGMA {name}')
+    return cursor.fetchone()[0]
+
+
+def maintain_sqlite(report):
+    """
+    Reclaim free pages and refresh planner statistics of a SQLite database.
+
+    A database created before incremental auto-vacuum was configured is
+    converted with one full VACUUM; after that each run frees at most
+    settings.MAINTENANCE_VACUUM_PAGES pages, keeping the write lock short.
+    """
+    with serialized_writes(), connection.cursor() as cursor:
+        page_size = sqlite_pragma(cursor, 'page_size')
+        size_before = sqlite_pragma(cursor, 'page_count') * page_size
+
+        # 2 = INCREMENTAL
+        if sqlite_pragma(cursor, 'auto_vacuum') != 2:
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
+            report['full_vacuum'] = 1
+        else:
+            # Each step of this pragma frees one page; executescript runs it
+            # to completion where execute() would stop after the first
+            cursor.cursor.executescript(f'PRAGMA incremental_vacuum({settings.MAINTENANCE_VACUUM_PAGES});')
+        report['db_bytes_reclaimed'] = size_before - sqlite_pragma(cursor, 'page_count') * page_size
+
+        # Bounded-cost statistics, then let SQLite refresh whatever else it wants
+        cursor.execute('PRAGMA analysis_limit = 1000')
+        cursor.execute('ANALYZE')
+        cursor.execute('PRAGMA optimize')
+        # Write the freed pages back to the main file and shrink the WAL
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        report['db_free_bytes'] = sqlite_pragma(cursor, 'freelist_count') * page_size
+
+
+def maintain_postgresql(report):
+    """VACUUM ANALYZE the tables churned by uploads and retention."""
+    tables = [model._meta.db_table for model in (Equipment, Upload, UploadSummary, IngestJob)]
+    with connection.cursor() as cursor:
+        for table in tables:
+            # VACUUM cannot run inside a transaction; Django autocommits here
+            cursor.execute(f'VACUUM ANALYZE {connection.ops.quote_name(table)}')
+    report['tables_vacuumed'] = len(tables)
+
+
+def maintain_database(report):
+    if connection.vendor == 'sqlite':
+        maintain_sqlite(report)
+    elif connection.vendor == 'postgresql':
+        maintain_postgresql(report)
+
+
+def run_maintenance(force=False):
+    """
+    Run every maintenance task once.
+
+    Args:
+        force: Run even outside the maintenance window or during an ingest
+
+    Returns:
+        Report or None: What was reclaimed, or None if the run was skipped
+    """
+    if not force and (not in_window() or ingest_running()):
+        return None
+
+    report = Report()
+    started = time.monotonic()
+    trim_uploads(report)
+    purge_retired(report)
+    clean_orphans(report)
+    maintain_database(report)
+    report['seconds'] = round(time.monotonic() - started, 2)
+
+    logger.info('Maintenance finished: %s', dict(report))
+    return report
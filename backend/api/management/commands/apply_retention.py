@@ -0,0 +1,16 @@
+"""
+Management command to trim every user's uploads to their retention window.
+"""
+from django.core.management.base import BaseCommand
+
+from api.retention import sweep
+
+
+class Command(BaseCommand):
+    help = 'Delete uploads beyond each user\'s keep count (UPLOAD_KEEP_COUNT)'
+
+    def handle(self, *args, **options):
+        deleted, retired, rows = sweep()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} upload(s) ({rows} equipment rows), retired {retired}'
+        ))
@@ -0,0 +1,63 @@
+"""
+Management command to precompute summaries of uploads that lack one.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api import columnar
+from api.models import Upload, UploadSummary
+from api.sqlite import serialized_writes
+
+
+class Command(BaseCommand):
+    help = 'Build the stored summary (and optionally columnar store) of existing uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Recompute summaries that already exist')
+        parser.add_argument('--columnar', action='store_true', help='Also build missing columnar stores')
+
+    def handle(self, *args, **options):
+        if options['columnar'] and not settings.COLUMNAR_STORE_ENABLED:
+            raise CommandError('--columnar needs COLUMNAR_STORE_ENABLED')
+
+        # Only uploads that own their rows; deduplicated ones share the source's
+        uploads = Upload.objects.filter(
+            data_source__isnull=True,
+            status__in=[Upload.STATUS_READY, Upload.STATUS_RETIRED]
+        ).order_by('id')
+
+        if options['columnar']:
+            # First, so the summaries below are computed from the stores
+            stores = 0
+            for upload in uploads.iterator():
+                if columnar.ColumnarStore.open(upload) is None:
+                    self.build_store(upload)
+                    stores += 1
+            self.stdout.write(f'Built {stores} columnar store(s)')
+
+        if not options['rebuild']:
+            uploads = uploads.filter(summary__isnull=True)
+
+        started = time.monotonic()
+        count = 0
+        for upload in uploads.iterator():
+            with serialized_writes(), transaction.atomic():
+                UploadSummary(upload=upload).rebuild()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {count} upload summaries in {time.monotonic() - started:.2f}s'
+        ))
+
+    def build_store(self, upload):
+        writer = columnar.writer_for(upload)
+        try:
+            with transaction.atomic():
+                writer.commit()
+        except Exception:
+            writer.abort()
+            raise
+        finally:
+            writer.close()
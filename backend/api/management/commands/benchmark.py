@@ -0,0 +1,136 @@
+"""
+Management command to benchmark the ingestion pipeline on synthetic data.
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api import benchmarks, renderers
+from api.utils import CSV_BACKENDS
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ingestion stages on synthetic equipment data'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+        parse = subparsers.add_parser('parse', help='CSV parse throughput versus worker count')
+        parse.add_argument('--rows', type=int, default=1_000_000)
+        parse.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+
+        backends = subparsers.add_parser('backends', help='CSV parser backend throughput versus file size')
+        backends.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+        backends.add_argument('--backends', nargs='+', choices=CSV_BACKENDS)
+
+        insert = subparsers.add_parser('insert', help='Bulk loader versus ORM bulk_create insert throughput')
+        insert.add_argument('--rows', type=int, default=1_000_000)
+        insert.add_argument('--batch-sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+
+        retention = subparsers.add_parser('retention', help='Retention delete cost versus upload size')
+        retention.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        retention.add_argument('--uploads', type=int, default=3)
+
+        render = subparsers.add_parser('render', help='/data/ JSON versus columnar rendering time and size')
+        render.add_argument('--rows', type=int, nargs='+', default=[5_000, 100_000, 1_000_000])
+
+        concurrency = subparsers.add_parser('concurrency', help='Read latency while a large upload is ingested')
+        concurrency.add_argument('--rows', type=int, default=1_000_000)
+        concurrency.add_argument('--readers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        getattr(self, f"bench_{options['benchmark']}")(options)
+
+    def bench_parse(self, options):
+        with benchmarks.synthetic_csv(options['rows']) as path:
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            self.stdout.write(f"Parsing {options['rows']:,} rows ({size_mb:.1f} MB)")
+            self.stdout.write(f"{'workers':>8} {'seconds':>10} {'rows/s':>14} {'speedup':>8}")
+
+            baseline = None
+            for workers in options['workers']:
+                result = benchmarks.bench_parse(path, workers)
+                baseline = baseline or result['seconds']
+                self.stdout.write(
+                    f"{workers:>8} {result['seconds']:>10.2f} "
+                    f"{result['rows_per_sec']:>14,.0f} {baseline / result['seconds']:>7.2f}x"
+                )
+
+    def bench_backends(self, options):
+        backends = options['backends'] or benchmarks.available_backends()
+        self.stdout.write(f"{'rows':>12} {'MB':>8} {'backend':>8} {'seconds':>10} {'rows/s':>14}")
+
+        for rows in options['rows']:
+            with benchmarks.synthetic_csv(rows) as path:
+                size_mb = os.path.getsize(path) / 1024 / 1024
+                for backend in backends:
+                    result = benchmarks.bench_backend(path, backend)
+                    self.stdout.write(
+                        f"{rows:>12,} {size_mb:>8.1f} {backend:>8} "
+                        f"{result['seconds']:>10.2f} {result['rows_per_sec']:>14,.0f}"
+                    )
+
+    def bench_insert(self, options):
+        rows = benchmarks.synthetic_rows(options['rows'])
+        self.stdout.write(f"Inserting {len(rows):,} rows ({connection.vendor}, rolled back)")
+        self.stdout.write(f"{'method':>12} {'batch':>8} {'seconds':>10} {'rows/s':>14}")
+
+        for batch_size in options['batch_sizes']:
+            for method in benchmarks.INSERT_METHODS:
+                result = benchmarks.bench_insert(rows, method, batch_size)
+                self.stdout.write(
+                    f"{method:>12} {batch_size:>8,} "
+                    f"{result['seconds']:>10.2f} {result['rows_per_sec']:>14,.0f}"
+                )
+
+    def bench_retention(self, options):
+        self.stdout.write(
+            f"Trimming {options['uploads']} uploads to 1 ({connection.vendor}, rolled back)"
+        )
+        self.stdout.write(f"{'rows':>12} {'method':>9} {'surplus':>12} {'seconds':>10} {'queries':>8}")
+
+        for count in options['rows']:
+            rows = benchmarks.synthetic_rows(count)
+            for method in benchmarks.RETENTION_METHODS:
+                result = benchmarks.bench_retention(rows, method, options['uploads'])
+                self.stdout.write(
+                    f"{count:>12,} {method:>9} {result['surplus_rows']:>12,} "
+                    f"{result['seconds']:>10.2f} {result['queries']:>8}"
+                )
+
+    def bench_render(self, options):
+        self.stdout.write(
+            f"Rendering equipment rows ({'orjson' if renderers.orjson else 'json'}, rolled back)"
+        )
+        self.stdout.write(f"{'rows':>12} {'format':>8} {'seconds':>10} {'rows/s':>14} {'MB':>8} {'speedup':>8}")
+
+        for count in options['rows']:
+            rows = benchmarks.synthetic_rows(count)
+            baseline = None
+            for method in benchmarks.RENDER_METHODS:
+                result = benchmarks.bench_render(rows, method)
+                baseline = baseline or result['seconds']
+                self.stdout.write(
+                    f"{count:>12,} {method:>8} {result['seconds']:>10.2f} "
+                    f"{result['rows_per_sec']:>14,.0f} {result['bytes'] / 1024 / 1024:>8.1f} "
+                    f"{baseline / result['seconds']:>7.2f}x"
+                )
+
+    def bench_concurrency(self, options):
+        self.stdout.write(
+            f"Ingesting {options['rows']:,} rows with {options['readers']} concurrent readers "
+            f"({connection.vendor}, SQLite tuning {'on' if settings.SQLITE_PRAGMAS else 'off'})"
+        )
+        result = benchmarks.bench_concurrency(options['rows'], options['readers'])
+        self.stdout.write(
+            f"Ingest: {result['seconds']:.2f}s ({result['rows_per_sec']:,.0f} rows/s)"
+        )
+        self.stdout.write(f"{'phase':>10} {'reads':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for phase in ('idle', 'ingesting'):
+            stats = result[phase]
+            self.stdout.write(
+                f"{phase:>10} {stats['reads']:>8,} {stats['errors']:>7} "
+                f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['max_ms']:>8.1f}"
+            )
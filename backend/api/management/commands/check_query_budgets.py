@@ -0,0 +1,20 @@
+"""
+Management command that checks every endpoint stays within its query budget.
+
+Runs the query budget tests (api/tests/test_queries.py), which fail if any
+endpoint runs more queries than settings.QUERY_BUDGETS allows it, runs more
+as a user's history grows (an N+1), or answers a request repeating its ETag
+with a 304 that costs more than NOT_MODIFIED_BUDGET queries.
+"""
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+TEST_LABEL = 'api.tests.test_queries.QueryBudgetTests'
+
+
+class Command(BaseCommand):
+    help = 'Fail if any endpoint runs more queries than its budget or one per upload'
+
+    def handle(self, *args, **options):
+        # Exits with status 1 when a test fails
+        call_command('test', TEST_LABEL, interactive=False, verbosity=options['verbosity'])
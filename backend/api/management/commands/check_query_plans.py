@@ -0,0 +1,20 @@
+"""
+Management command that checks the read endpoints' queries use indexes.
+
+Runs the query plan tests (api/tests/test_queries.py), which capture the
+SELECT statements every read endpoint issues and fail if the database plans
+a full table scan or a temporary sort for any of them, or if an equipment
+query joins the upload table.
+"""
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+TEST_LABEL = 'api.tests.test_queries.QueryPlanTests'
+
+
+class Command(BaseCommand):
+    help = 'Fail if any read endpoint query is planned as a full table scan or joins equipment to uploads'
+
+    def handle(self, *args, **options):
+        # Exits with status 1 when a test fails
+        call_command('test', TEST_LABEL, interactive=False, verbosity=options['verbosity'])
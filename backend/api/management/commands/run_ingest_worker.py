@@ -0,0 +1,32 @@
+"""
+Management command to process queued background ingestion jobs.
+
+Before every poll, jobs left running by a worker that died (no heartbeat
+for settings.INGEST_STALE_AFTER seconds) are re-queued, or failed if their
+file is gone.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.jobs import process_queued_jobs, recover_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Process queued CSV ingestion jobs (runs until interrupted unless --once)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between queue polls')
+
+    def handle(self, *args, **options):
+        while True:
+            requeued, failed = recover_stale_jobs()
+            if requeued or failed:
+                self.stdout.write(f'Recovered stalled ingestion job(s): {requeued} re-queued, {failed} failed')
+            processed = process_queued_jobs()
+            if processed:
+                self.stdout.write(f'Processed {processed} ingestion job(s)')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
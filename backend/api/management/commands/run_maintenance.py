@@ -0,0 +1,34 @@
+"""
+Management command to run database and storage maintenance.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.maintenance import run_maintenance
+
+
+class Command(BaseCommand):
+    help = 'Purge retired uploads, remove orphaned files, VACUUM and ANALYZE (runs until interrupted unless --once)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run once and exit')
+        parser.add_argument('--force', action='store_true', help='Ignore the maintenance window and running ingests')
+        parser.add_argument(
+            '--interval', type=float, default=settings.MAINTENANCE_INTERVAL,
+            help='Seconds between maintenance attempts'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            report = run_maintenance(force=options['force'])
+            if report is None:
+                self.stdout.write('Skipped: outside the maintenance window or an ingest is running')
+            else:
+                self.stdout.write(self.style.SUCCESS('Maintenance finished'))
+                for key, value in sorted(report.items()):
+                    self.stdout.write(f'  {key}: {value:,}')
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,108 @@
+"""
+Middleware for Chemical Equipment Analysis API.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.http import FileResponse
+
+logger = logging.getLogger(__name__)
+
+
+class QueryMetrics:
+    """Number of SQL statements and total database time of a block of code."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+    @property
+    def milliseconds(self):
+        return round(self.seconds * 1000, 2)
+
+
+@contextmanager
+def record_queries():
+    """Count the queries run on the default connection inside the block."""
+    metrics = QueryMetrics()
+    with connection.execute_wrapper(metrics):
+        yield metrics
+
+
+def query_budget(request):
+    """
+    Query budget of the endpoint that served ``request``, or None.
+
+    Budgets are keyed by URL name in settings.QUERY_BUDGETS.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return settings.QUERY_BUDGETS.get(match.url_name)
+
+
+class QueryMetricsMiddleware:
+    """
+    Record the queries and database time of every request.
+
+    Both are logged per endpoint and, with settings.QUERY_METRICS_HEADERS,
+    returned as ``X-DB-Queries`` / ``X-DB-Time-Ms`` and a ``Server-Timing``
+    entry. A request exceeding its endpoint's budget logs a warning.
+
+    Streamed responses (CSV/NDJSON exports) query while their content is
+    sent, after the headers: those queries are counted, logged and checked
+    against the budget once the stream ends, but are not in the headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries() as metrics:
+            response = self.get_response(request)
+
+        if settings.QUERY_METRICS_HEADERS:
+            response['X-DB-Queries'] = str(metrics.count)
+            response['X-DB-Time-Ms'] = str(metrics.milliseconds)
+            response['Server-Timing'] = f'db;desc="{metrics.count} queries";dur={metrics.milliseconds}'
+
+        # Files are sent as they are; anything else streamed is generated
+        if response.streaming and not isinstance(response, FileResponse):
+            response.streaming_content = self.stream(request, response.streaming_content, metrics)
+        else:
+            self.log(request, metrics)
+        return response
+
+    def stream(self, request, content, metrics):
+        """Yield ``content``, adding its queries to ``metrics``, then log them."""
+        try:
+            with connection.execute_wrapper(metrics):
+                yield from content
+        finally:
+            self.log(request, metrics)
+
+    def log(self, request, metrics):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.url_name if match else request.path
+        budget = query_budget(request)
+        if budget is not None and metrics.count > budget:
+            logger.warning(
+                '%s %s ran %d queries (budget %d) in %.2f ms',
+                request.method, endpoint, metrics.count, budget, metrics.milliseconds
+            )
+        else:
+            logger.debug(
+                '%s %s ran %d queries in %.2f ms',
+                request.method, endpoint, metrics.count, metrics.milliseconds
+            )
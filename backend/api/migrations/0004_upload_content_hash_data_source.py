@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 01:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='upload',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the uploaded file', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='upload',
+            name='data_source',
+            field=models.ForeignKey(blank=True, help_text='Earlier identical upload whose equipment rows this upload shares', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='duplicates', to='api.upload'),
+        ),
+        migrations.AlterField(
+            model_name='upload',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed'), ('retired', 'Retired')], default='ready', max_length=20),
+        ),
+    ]
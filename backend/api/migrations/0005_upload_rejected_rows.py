@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_upload_content_hash_data_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='upload',
+            name='rejected_count',
+            field=models.IntegerField(default=0, help_text='Rows refused by validation'),
+        ),
+        migrations.AddField(
+            model_name='upload',
+            name='rejects_file',
+            field=models.CharField(blank=True, help_text='Stored rejected-rows CSV path relative to MEDIA_ROOT', max_length=500),
+        ),
+    ]
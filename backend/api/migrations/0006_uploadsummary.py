@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_upload_rejected_rows'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSummary',
+            fields=[
+                ('upload', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='api.upload')),
+                ('total_count', models.BigIntegerField(default=0)),
+                ('sum_flowrate', models.FloatField(default=0.0)),
+                ('sum_pressure', models.FloatField(default=0.0)),
+                ('sum_temperature', models.FloatField(default=0.0)),
+                ('min_flowrate', models.FloatField(blank=True, null=True)),
+                ('max_flowrate', models.FloatField(blank=True, null=True)),
+                ('min_pressure', models.FloatField(blank=True, null=True)),
+                ('max_pressure', models.FloatField(blank=True, null=True)),
+                ('min_temperature', models.FloatField(blank=True, null=True)),
+                ('max_temperature', models.FloatField(blank=True, null=True)),
+                ('type_counts', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Upload summaries',
+            },
+        ),
+        migrations.AlterField(
+            model_name='upload',
+            name='rejected_count',
+            field=models.IntegerField(default=0, help_text='Rows refused by validation in the latest ingest'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_uploadsummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['upload', 'name'], name='equipment_upload_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['upload', 'type'], name='equipment_upload_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='upload',
+            index=models.Index(fields=['user', '-uploaded_at'], name='upload_user_recent_idx'),
+        ),
+        # The composite indexes above lead with upload_id, so the plain
+        # foreign key index is redundant once they exist
+        migrations.AlterField(
+            model_name='equipment',
+            name='upload',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='equipment', to='api.upload'),
+        ),
+    ]
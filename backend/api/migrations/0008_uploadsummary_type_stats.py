@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:14
+
+from django.db import migrations, models
+
+
+def drop_summaries(apps, schema_editor):
+    # Existing summaries lack the per-type statistics; they are rebuilt on
+    # first use or by the backfill_summaries command.
+    apps.get_model('api', 'UploadSummary').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='uploadsummary',
+            name='type_counts',
+        ),
+        migrations.AddField(
+            model_name='uploadsummary',
+            name='type_stats',
+            field=models.JSONField(default=dict, help_text='Per equipment type: count and sum/min/max of each numeric field'),
+        ),
+        migrations.RunPython(drop_summaries, migrations.RunPython.noop),
+    ]
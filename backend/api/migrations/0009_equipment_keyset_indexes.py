@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_uploadsummary_type_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='equipment',
+            name='equipment_upload_name_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='equipment',
+            name='equipment_upload_type_idx',
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['upload', 'name', 'id'], name='equipment_upload_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['upload', 'type', 'name', 'id'], name='equipment_upload_type_idx'),
+        ),
+    ]
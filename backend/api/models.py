@@ -1,30 +1,65 @@
 """
 Models for Chemical Equipment Analysis API.
 """
+import math
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
 
 class Upload(models.Model):
     """Represents a CSV file upload session."""
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    # Dropped by retention but kept because duplicate uploads share its rows
+    STATUS_RETIRED = 'retired'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_RETIRED, 'Retired'),
+    ]
+    IN_PROGRESS_STATUSES = [STATUS_PENDING, STATUS_PROCESSING]
+    
     filename = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
     record_count = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_READY)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the uploaded file")
+    data_source = models.ForeignKey(
+        'self', on_delete=models.PROTECT, null=True, blank=True, related_name='duplicates',
+        help_text="Earlier identical upload whose equipment rows this upload shares"
+    )
+    rejected_count = models.IntegerField(default=0, help_text="Rows refused by validation in the latest ingest")
+    rejects_file = models.CharField(
+        max_length=500, blank=True,
+        help_text="Stored rejected-rows CSV path relative to MEDIA_ROOT"
+    )
     
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # History and "latest upload" lookups: filter by user, newest first
+            models.Index(fields=['user', '-uploaded_at'], name='upload_user_recent_idx'),
+        ]
     
     def __str__(self):
         return f"{self.filename} ({self.record_count} records)"
     
-    @classmethod
-    def cleanup_old_uploads(cls, user, keep_count=5):
-        """Keep only the last N uploads for a user, delete older ones."""
-        uploads = cls.objects.filter(user=user).order_by('-uploaded_at')
-        uploads_to_delete = uploads[keep_count:]
-        for upload in uploads_to_delete:
-            upload.delete()
+    @property
+    def data_upload_id(self):
+        """Id of the upload that owns this upload's equipment rows."""
+        return self.data_source_id or self.id
+    
+    @property
+    def data_equipment(self):
+        """Equipment rows of this upload, following deduplication."""
+        return Equipment.objects.filter(upload_id=self.data_upload_id)
 
 
 class Equipment(models.Model):
@@ -44,11 +79,270 @@ class Equipment(models.Model):
     flowrate = models.FloatField(help_text="Flowrate in units")
     pressure = models.FloatField(help_text="Pressure in bar")
     temperature = models.FloatField(help_text="Temperature in °C")
-    upload = models.ForeignKey(Upload, on_delete=models.CASCADE, related_name='equipment')
+    # Indexed through the composite indexes below, which lead with upload
+    upload = models.ForeignKey(Upload, on_delete=models.CASCADE, related_name='equipment', db_index=False)
     
     class Meta:
         ordering = ['name']
         verbose_name_plural = "Equipment"
+        indexes = [
+            # Row listings, keyset pages and exports: one upload's rows in
+            # (name, id) order
+            models.Index(fields=['upload', 'name', 'id'], name='equipment_upload_name_idx'),
+            # Type distribution, and pages filtered to one type
+            models.Index(fields=['upload', 'type', 'name', 'id'], name='equipment_upload_type_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.type})"
+
+
+def merge_stats(current, new, fields):
+    """
+    Merge one set of count/sum/min/max statistics into another, in place.
+    
+    Args:
+        current: Dict with 'count' and sum_/min_/max_ keys per field
+        new: Dict of the same shape for the rows being added
+        fields: Names of the numeric fields
+    """
+    current['count'] += new['count']
+    for field in fields:
+        current[f'sum_{field}'] += new[f'sum_{field}']
+        for bound, pick in (('min', min), ('max', max)):
+            key = f'{bound}_{field}'
+            if new[key] is not None:
+                current[key] = new[key] if current[key] is None else pick(current[key], new[key])
+
+
+class UploadSummary(models.Model):
+    """
+    Precomputed summary statistics of an upload's equipment rows.
+    
+    Holds totals and a per-type breakdown as counts, sums and extremes, so
+    appended rows can be merged in without rescanning the rows already
+    stored and reading a summary costs the same whatever the upload's size.
+    """
+    NUMERIC_FIELDS = ['flowrate', 'pressure', 'temperature']
+    
+    upload = models.OneToOneField(Upload, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    total_count = models.BigIntegerField(default=0)
+    sum_flowrate = models.FloatField(default=0.0)
+    sum_pressure = models.FloatField(default=0.0)
+    sum_temperature = models.FloatField(default=0.0)
+    min_flowrate = models.FloatField(null=True, blank=True)
+    max_flowrate = models.FloatField(null=True, blank=True)
+    min_pressure = models.FloatField(null=True, blank=True)
+    max_pressure = models.FloatField(null=True, blank=True)
+    min_temperature = models.FloatField(null=True, blank=True)
+    max_temperature = models.FloatField(null=True, blank=True)
+    type_stats = models.JSONField(
+        default=dict,
+        help_text="Per equipment type: count and sum/min/max of each numeric field"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Upload summaries"
+    
+    def __str__(self):
+        return f"Summary of upload {self.upload_id} ({self.total_count} records)"
+    
+    @classmethod
+    def empty_stats(cls):
+        """Statistics of no rows, in the shape stored per type."""
+        stats = {'count': 0}
+        for field in cls.NUMERIC_FIELDS:
+            stats.update({f'sum_{field}': 0.0, f'min_{field}': None, f'max_{field}': None})
+        return stats
+    
+    @classmethod
+    def for_upload(cls, upload):
+        """
+        Return the summary of the upload owning ``upload``'s rows.
+        
+        Uploads ingested before summaries were stored get one built from
+        their rows on first use (or by the backfill_summaries command).
+        Uploads still being ingested, or whose ingest failed, get an empty
+        summary that is not saved: their rows are incomplete, and the
+        ingest saves the real one. No query is run when the upload was
+        fetched with ``select_related('summary', 'data_source__summary')``.
+        """
+        owner = upload.data_source if upload.data_source_id else upload
+        if owner.status not in (Upload.STATUS_READY, Upload.STATUS_RETIRED):
+            return cls(upload=owner)
+        try:
+            return owner.summary
+        except cls.DoesNotExist:
+            summary = cls(upload=owner)
+            summary.rebuild()
+            return summary
+    
+    def rebuild(self):
+        """
+        Recompute the summary from the upload's columnar store, or with one
+        GROUP BY over the stored equipment rows when it has none, and save it.
+        """
+        from .columnar import ColumnarStore
+        
+        store = ColumnarStore.open(self.upload)
+        if store is not None:
+            type_stats = store.type_stats()
+        else:
+            aggregates = {'count': models.Count('id')}
+            for field in self.NUMERIC_FIELDS:
+                aggregates[f'sum_{field}'] = models.Sum(field)
+                aggregates[f'min_{field}'] = models.Min(field)
+                aggregates[f'max_{field}'] = models.Max(field)
+            type_stats = {
+                row.pop('type'): row
+                for row in Equipment.objects.filter(upload_id=self.upload_id).values('type').annotate(
+                    **aggregates
+                ).order_by()
+            }
+        
+        self.total_count = 0
+        for field in self.NUMERIC_FIELDS:
+            setattr(self, f'sum_{field}', 0.0)
+            setattr(self, f'min_{field}', None)
+            setattr(self, f'max_{field}', None)
+        self.type_stats = {}
+        self.add_type_stats(type_stats)
+        self.save()
+    
+    def add_type_stats(self, type_stats):
+        """
+        Merge per-type statistics of new rows into the summary (not saved).
+        
+        Args:
+            type_stats: Dict mapping equipment type to a dict shaped like
+                empty_stats()
+        """
+        totals = self.totals()
+        for eq_type, stats in type_stats.items():
+            merge_stats(totals, stats, self.NUMERIC_FIELDS)
+            merge_stats(self.type_stats.setdefault(eq_type, self.empty_stats()), stats, self.NUMERIC_FIELDS)
+        
+        self.total_count = totals.pop('count')
+        for key, value in totals.items():
+            setattr(self, key, value)
+    
+    def add_rows(self, rows):
+        """
+        Merge a chunk of new rows into the summary (not saved).
+        
+        Args:
+            rows: DataFrame with Equipment field columns, as produced by
+                validate_chunk
+        """
+        if rows.empty:
+            return
+        
+        grouped = rows.groupby('type')[self.NUMERIC_FIELDS]
+        counts = grouped.size()
+        aggregates = grouped.agg(['sum', 'min', 'max'])
+        type_stats = {}
+        for eq_type, values in aggregates.iterrows():
+            stats = {'count': int(counts[eq_type])}
+            for field in self.NUMERIC_FIELDS:
+                for agg in ('sum', 'min', 'max'):
+                    stats[f'{agg}_{field}'] = float(values[(field, agg)])
+            type_stats[eq_type] = stats
+        self.add_type_stats(type_stats)
+    
+    def totals(self):
+        """The summary's overall statistics, shaped like empty_stats()."""
+        stats = {'count': self.total_count}
+        for field in self.NUMERIC_FIELDS:
+            for agg in ('sum', 'min', 'max'):
+                stats[f'{agg}_{field}'] = getattr(self, f'{agg}_{field}')
+        return stats
+    
+    def describe(self, stats):
+        """Count, averages and ranges of one set of statistics (0.0 when empty)."""
+        count = stats['count']
+        described = {'count': count}
+        for field in self.NUMERIC_FIELDS:
+            described[f'avg_{field}'] = stats[f'sum_{field}'] / count if count else 0.0
+        for field in self.NUMERIC_FIELDS:
+            for bound in ('min', 'max'):
+                value = stats[f'{bound}_{field}']
+                described[f'{bound}_{field}'] = 0.0 if value is None else value
+        return described
+    
+    def as_dict(self):
+        """
+        Summary statistics (total_count, averages, ranges and
+        type_distribution) plus a ``type_breakdown`` of count, averages and
+        ranges per type.
+        """
+        stats = self.describe(self.totals())
+        stats['total_count'] = stats.pop('count')
+        stats['type_distribution'] = {
+            eq_type: type_stats['count'] for eq_type, type_stats in self.type_stats.items()
+        }
+        stats['type_breakdown'] = {
+            eq_type: self.describe(type_stats) for eq_type, type_stats in self.type_stats.items()
+        }
+        return stats
+
+
+class IngestJob(models.Model):
+    """A queued background ingestion of a stored upload file."""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    upload = models.OneToOneField(Upload, on_delete=models.CASCADE, related_name='job')
+    file_name = models.CharField(max_length=500, help_text="Stored file path relative to MEDIA_ROOT")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    rows_processed = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Last sign of life of the worker running the job"
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Job {self.pk} for {self.upload.filename} ({self.status})"
+
+
+class UploadSession(models.Model):
+    """A resumable upload whose file arrives as numbered chunks."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField(help_text="File size in bytes")
+    chunk_size = models.IntegerField(help_text="Size of every chunk but the last, in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+    upload = models.OneToOneField(
+        Upload, on_delete=models.SET_NULL, null=True, blank=True, related_name='session'
+    )
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.total_chunks} chunks)"
+    
+    @property
+    def total_chunks(self):
+        return max(1, math.ceil(self.total_size / self.chunk_size))
+    
+    def expected_chunk_size(self, index):
+        """Byte length chunk ``index`` must have."""
+        if index == self.total_chunks - 1:
+            return self.total_size - self.chunk_size * index
+        return self.chunk_size
@@ -0,0 +1,140 @@
+"""
+Pagination classes for Chemical Equipment Analysis API.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class EquipmentCursorPagination(BasePagination):
+    """
+    Keyset pagination of equipment rows over (name, id).
+
+    The cursor carries the (name, id) of the row a page starts after (or,
+    for ``previous`` links, before), and each page is fetched with a range
+    condition on that key. With the (upload, name) indexes every page is an
+    index seek plus ``page_size`` rows, whatever its depth; there is no
+    OFFSET and no total count.
+
+    Query params: ``cursor``, ``page_size`` (up to
+    settings.DATA_MAX_PAGE_SIZE) and ``ordering`` (``name`` or ``-name``).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+    # Field names of the rows when paginating a values_list() queryset of
+    # plain tuples; None for model instances
+    row_fields = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.descending = self.get_descending(request)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['reverse'])
+
+        # A previous page is read backwards from its cursor, then flipped
+        descending = self.descending != reverse
+        order = ['-name', '-id'] if descending else ['name', 'id']
+        queryset = queryset.order_by(*order)
+        if cursor:
+            queryset = queryset.filter(self.beyond(cursor['name'], cursor['id'], descending))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def beyond(self, name, id, descending):
+        """
+        Rows strictly after (name, id) in the page order.
+
+        Written as a bound on name plus a tie-break, so the name bound is
+        usable as an index range start.
+        """
+        if descending:
+            return Q(name__lte=name) & (Q(name__lt=name) | Q(id__lt=id))
+        return Q(name__gte=name) & (Q(name__gt=name) | Q(id__gt=id))
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return settings.DATA_PAGE_SIZE
+        try:
+            page_size = int(value)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: 'Must be an integer'})
+        return max(1, min(page_size, settings.DATA_MAX_PAGE_SIZE))
+
+    def get_descending(self, request):
+        ordering = request.query_params.get(self.ordering_query_param, 'name')
+        if ordering not in ('name', '-name'):
+            raise ValidationError({self.ordering_query_param: "Must be 'name' or '-name'"})
+        return ordering == '-name'
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            name, id, reverse = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            return {'name': str(name), 'id': int(id), 'reverse': bool(reverse)}
+        except (binascii.Error, TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def cursor_key(self, row):
+        """The (name, id) of a page row."""
+        if self.row_fields is None:
+            return row.name, row.id
+        return row[self.row_fields.index('name')], row[self.row_fields.index('id')]
+    
+    def encode_cursor(self, row, reverse):
+        name, id = self.cursor_key(row)
+        encoded = base64.urlsafe_b64encode(json.dumps([name, id, reverse]).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
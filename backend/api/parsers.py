@@ -0,0 +1,12 @@
+"""
+Request parsers for Chemical Equipment Analysis API.
+"""
+from rest_framework.parsers import BaseParser
+
+
+class OctetStreamParser(BaseParser):
+    """Parse a raw binary request body into bytes (used for upload chunks)."""
+    media_type = 'application/octet-stream'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream.read() if stream is not None else b''
@@ -0,0 +1,313 @@
+"""
+Readers that turn an uploaded file into a stream of validated equipment chunks.
+
+Compressed uploads are decompressed incrementally as the parser pulls bytes,
+so the decompressed file is never materialized in memory or on disk.
+Parquet and Arrow IPC uploads are read batch by batch with pyarrow.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import math
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import django
+import pandas as pd
+from django.conf import settings
+
+from .utils import (
+    PANDAS_READ_OPTIONS, REQUIRED_COLUMNS, CSVFormatError, iter_csv_chunks, validate_chunk
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for columnar uploads
+    pa = pq = None
+
+COLUMNAR_EXTENSIONS = ('.parquet', '.arrow', '.feather', '.ipc')
+SUPPORTED_EXTENSIONS = ('.csv', '.csv.gz', '.csv.bz2', '.csv.xz', '.zip') + COLUMNAR_EXTENSIONS
+
+UNSUPPORTED_FILE_MESSAGE = (
+    'File must be a CSV (optionally .gz, .bz2, .xz or .zip compressed), '
+    'Parquet or Arrow IPC file'
+)
+
+# Raised lazily by the decompressors while the parser is reading
+DECOMPRESSION_ERRORS = (OSError, EOFError, zipfile.BadZipFile, lzma.LZMAError)
+
+
+def is_supported_upload(filename):
+    """Return True if the filename has an extension the ingest path accepts."""
+    return filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def open_csv_streams(file, filename):
+    """
+    Yield a binary stream for every CSV contained in an upload.
+
+    Args:
+        file: File-like object as uploaded
+        filename: Original filename, used to pick the decompressor
+
+    Yields:
+        tuple: (ZIP member name, or '' for any other file; decompressing or
+        pass-through stream of CSV bytes)
+    """
+    name = filename.lower()
+
+    if name.endswith('.gz'):
+        yield '', gzip.GzipFile(fileobj=file)
+    elif name.endswith('.bz2'):
+        yield '', bz2.BZ2File(file)
+    elif name.endswith('.xz'):
+        yield '', lzma.LZMAFile(file)
+    elif name.endswith('.zip'):
+        with zipfile.ZipFile(file) as archive:
+            members = [
+                info for info in archive.infolist()
+                if not info.is_dir()
+                and info.filename.lower().endswith('.csv')
+                and not info.filename.startswith('__MACOSX/')
+            ]
+            if not members:
+                raise CSVFormatError('ZIP archive contains no CSV files')
+            for info in members:
+                with archive.open(info) as member:
+                    yield info.filename, member
+    else:
+        yield '', file
+
+
+def iter_record_batches(file, filename, chunksize):
+    """Yield Arrow record batches of at most ``chunksize`` rows from a columnar upload."""
+    source = local_path(file) or getattr(file, 'file', file)
+
+    if filename.lower().endswith('.parquet'):
+        parquet = pq.ParquetFile(source)
+        check_columnar_schema(parquet.schema_arrow)
+        yield from parquet.iter_batches(batch_size=chunksize, columns=REQUIRED_COLUMNS)
+        return
+
+    try:
+        reader = pa.ipc.open_file(source)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        # Not the random-access file format; try the streaming format
+        file.seek(0)
+        reader = pa.ipc.open_stream(source)
+        batches = iter(reader)
+    check_columnar_schema(reader.schema)
+
+    for batch in batches:
+        batch = batch.select(REQUIRED_COLUMNS)
+        for offset in range(0, batch.num_rows, chunksize):
+            yield batch.slice(offset, chunksize)
+
+
+def check_columnar_schema(schema):
+    """Raise CSVFormatError unless an Arrow schema has the required columns."""
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in schema.names]
+    if missing_columns:
+        raise CSVFormatError(f"Missing columns: {', '.join(missing_columns)}")
+
+
+def iter_columnar_chunks(file, filename, chunksize=None):
+    """
+    Stream a Parquet or Arrow IPC upload as validated chunks.
+
+    Columns are read already typed, so no text parsing happens; the chunks
+    go through the same validation as CSV chunks.
+
+    Yields:
+        ValidatedChunk: Accepted and rejected rows (see validate_chunk)
+    """
+    if pa is None:
+        raise CSVFormatError('Parquet and Arrow uploads require pyarrow to be installed')
+
+    chunksize = chunksize or settings.CSV_CHUNK_SIZE
+    try:
+        for batch in iter_record_batches(file, filename, chunksize):
+            yield validate_chunk(batch.to_pandas())
+    except CSVFormatError:
+        raise
+    except (pa.ArrowException, OSError, ValueError) as e:
+        raise CSVFormatError(f'Could not read columnar file: {e}') from e
+
+
+def local_path(file):
+    """Return the on-disk path of an uploaded/stored file, or None if it has none."""
+    if hasattr(file, 'temporary_file_path'):
+        return file.temporary_file_path()
+    name = getattr(getattr(file, 'file', None), 'name', None)
+    if isinstance(name, str) and os.path.isabs(name) and os.path.isfile(name):
+        return name
+    return None
+
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool():
+    """Return the process-wide CSV parsing pool, creating it on first use."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            # spawn rather than fork: the web process runs ingest threads
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=settings.CSV_PARSE_WORKERS,
+                mp_context=get_context('spawn'),
+                initializer=django.setup,
+            )
+        return _parse_pool
+
+
+def split_byte_ranges(path, parts):
+    """
+    Split a CSV file into newline-aligned byte ranges.
+
+    Args:
+        path: Path of the CSV file
+        parts: Desired number of ranges (fewer are returned for small files)
+
+    Returns:
+        tuple: (header line bytes, list of (start, end) offsets covering
+        every data row exactly once)
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        start = f.tell()
+        step = max(1, (size - start) // parts)
+        bounds = [start]
+        for i in range(1, parts):
+            # Move each cut to the start of the following line
+            f.seek(start + i * step)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+        bounds.append(size)
+    return header, [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+
+
+def parse_byte_range(path, header, start, end):
+    """
+    Parse one byte range of a CSV file (runs in a worker process).
+
+    The header line is prepended so the range parses exactly like the head
+    of the file, then the chunk is validated like any other.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    try:
+        df = pd.read_csv(io.BytesIO(header + data), **PANDAS_READ_OPTIONS)
+    except ValueError as e:
+        raise CSVFormatError(str(e)) from e
+    return validate_chunk(df)
+
+
+def iter_parallel_csv_chunks(path, workers=None, pool=None):
+    """
+    Parse a plain CSV file on disk in parallel across processes.
+
+    The file is cut into newline-aligned ranges of about
+    settings.CSV_PARALLEL_RANGE_BYTES each, parsed by the process pool and
+    yielded in file order. At most two ranges per worker are in flight, so
+    memory stays bounded. Quoted fields containing newlines are not supported
+    in this mode.
+
+    Args:
+        path: Path of the CSV file
+        workers: Worker count, defaults to settings.CSV_PARSE_WORKERS
+        pool: Executor to use instead of the shared parse pool
+
+    Yields:
+        ValidatedChunk: Accepted and rejected rows (see validate_chunk)
+    """
+    workers = workers or settings.CSV_PARSE_WORKERS
+    size = os.path.getsize(path)
+    parts = max(workers, math.ceil(size / settings.CSV_PARALLEL_RANGE_BYTES))
+    header, ranges = split_byte_ranges(path, parts)
+
+    if not ranges:
+        # Header only (or empty): let the serial parser report it
+        with open(path, 'rb') as f:
+            yield from iter_csv_chunks(f)
+        return
+
+    pool = pool or get_parse_pool()
+    ranges = iter(ranges)
+    pending = deque()
+
+    def submit_next():
+        next_range = next(ranges, None)
+        if next_range:
+            pending.append(pool.submit(parse_byte_range, path, header, *next_range))
+
+    for _ in range(workers * 2):
+        submit_next()
+
+    while pending:
+        chunk = pending.popleft().result()
+        submit_next()
+        yield chunk
+
+
+def use_parallel_parse(file, filename):
+    """Decide whether an upload is large and plain enough for parallel parsing."""
+    if settings.CSV_PARSE_WORKERS < 2 or not filename.lower().endswith('.csv'):
+        return None
+    path = local_path(file)
+    if path and os.path.getsize(path) >= settings.CSV_PARALLEL_MIN_BYTES:
+        return path
+    return None
+
+
+def iter_upload_chunks(file, filename=None, chunksize=None):
+    """
+    Stream an uploaded file (CSV, compressed CSV, Parquet or Arrow IPC) as
+    validated chunks.
+
+    Every CSV member of a ZIP archive is validated and ingested in turn,
+    its chunks carrying the member's name as ``source``.
+    Large plain CSV files on disk are parsed in parallel processes.
+
+    Args:
+        file: File-like object as uploaded
+        filename: Original filename, defaults to ``file.name``
+        chunksize: Rows per chunk, defaults to settings.CSV_CHUNK_SIZE
+
+    Yields:
+        ValidatedChunk: Accepted and rejected rows (see validate_chunk)
+
+    Raises:
+        CSVFormatError: If the file cannot be decompressed or parsed
+    """
+    filename = filename or getattr(file, 'name', '') or ''
+
+    if filename.lower().endswith(COLUMNAR_EXTENSIONS):
+        yield from iter_columnar_chunks(file, filename, chunksize)
+        return
+
+    parallel_path = use_parallel_parse(file, filename)
+    if parallel_path:
+        yield from iter_parallel_csv_chunks(parallel_path)
+        return
+
+    try:
+        for member, stream in open_csv_streams(file, filename):
+            for chunk in iter_csv_chunks(stream, chunksize):
+                yield chunk._replace(source=member)
+    except DECOMPRESSION_ERRORS as e:
+        raise CSVFormatError(f'Could not decompress file: {e}') from e
@@ -0,0 +1,43 @@
+"""
+Renderers for Chemical Equipment Analysis API.
+"""
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library encoder
+    orjson = None
+
+
+def dumps(data):
+    """
+    Compact JSON bytes of ``data``, encoded by orjson when installed.
+
+    Types JSON has no notation for (dates, decimals, UUIDs...) are
+    converted as DRF's JSONEncoder does.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=JSONEncoder().default)
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+class ColumnarJSONRenderer(BaseRenderer):
+    """
+    Fast JSON for the columnar format (``?format=columns``).
+
+    Views select this renderer to lay equipment rows out one array per
+    field (see serializers.equipment_columns) instead of one object per row.
+    """
+    media_type = 'application/vnd.equipment-columns+json'
+    format = 'columns'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
@@ -0,0 +1,141 @@
+"""
+Server-side cache of read responses.
+
+Responses of the read endpoints are kept in the ``responses`` cache (see
+settings.CACHES) under the requesting user, their cache generation and the
+response's ETag (see api/conditional.py). The ETag already identifies the
+data a response was built from, so an entry can never be served for data
+that has since changed; a repeat request costs the views' upload lookup
+and a cache read, and never touches the equipment table.
+
+Writes that change what a user sees (uploads, appends, finished ingest
+jobs, retention) call ``invalidate_user``, which moves the user to a new
+generation so none of their old entries are read again. The backend bounds
+its size (MAX_ENTRIES, least recently used first for locmem), and entries
+over settings.RESPONSE_CACHE_MAX_ENTRY_BYTES are not stored at all.
+
+Hits and misses are counted per endpoint in each worker process (see
+``cache_stats``) and reported on every response as ``X-Cache``.
+"""
+import pickle
+import threading
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'responses'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def generation_key(user_id):
+    return f'generation:{user_id}'
+
+
+def user_generation(user_id):
+    """
+    The user's current cache generation.
+
+    A generation that was never set, or was evicted, is replaced by a new
+    random one, so entries written under an evicted generation cannot
+    come back.
+    """
+    cache = get_cache()
+    generation = cache.get(generation_key(user_id))
+    if generation is None:
+        cache.add(generation_key(user_id), uuid.uuid4().hex, timeout=None)
+        generation = cache.get(generation_key(user_id))
+    return generation
+
+
+def invalidate_user(user_id):
+    """Drop every cached response of a user, once the current transaction commits."""
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return
+    transaction.on_commit(
+        lambda: get_cache().set(generation_key(user_id), uuid.uuid4().hex, timeout=None)
+    )
+
+
+def record(endpoint, outcome):
+    with _stats_lock:
+        _stats[endpoint, outcome] += 1
+
+
+def cache_stats():
+    """
+    Hits and misses of this process, in total and per endpoint.
+
+    Returns:
+        dict: hits, misses, hit_ratio and endpoints ({name: {hits, misses}})
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    endpoints = {}
+    for (endpoint, outcome), count in sorted(stats.items()):
+        endpoints.setdefault(endpoint, {'hits': 0, 'misses': 0})[outcome] = count
+    hits = sum(e['hits'] for e in endpoints.values())
+    misses = sum(e['misses'] for e in endpoints.values())
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        'endpoints': endpoints,
+    }
+
+
+def freeze(response):
+    """A picklable (kind, body, headers) copy of a response."""
+    if isinstance(response, Response):
+        # Content-Type is chosen again when the data is rendered
+        headers = {k: v for k, v in response.items() if k.lower() != 'content-type'}
+        return 'data', response.data, headers
+    return 'content', response.content, dict(response.items())
+
+
+def thaw(entry):
+    kind, body, headers = entry
+    response = Response(body) if kind == 'data' else HttpResponse(body)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def cached_response(request, build, etag):
+    """
+    The cached response for ``request`` with ``etag``, or ``build()``'s,
+    stored for next time when it succeeded.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return build()
+
+    cache = get_cache()
+    match = request.resolver_match
+    endpoint = match.url_name if match else request.path
+    key = f'response:{request.user.id}:{user_generation(request.user.id)}:{etag}'
+
+    entry = cache.get(key)
+    if entry is not None:
+        record(endpoint, 'hits')
+        response = thaw(pickle.loads(entry))
+        response['X-Cache'] = 'HIT'
+        return response
+
+    record(endpoint, 'misses')
+    response = build()
+    if response.status_code == 200:
+        entry = pickle.dumps(freeze(response), pickle.HIGHEST_PROTOCOL)
+        if len(entry) <= settings.RESPONSE_CACHE_MAX_ENTRY_BYTES:
+            cache.set(key, entry)
+    response['X-Cache'] = 'MISS'
+    return response
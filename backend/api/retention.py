@@ -0,0 +1,193 @@
+"""
+Upload retention: keep each user's newest uploads and delete the rest.
+
+Surplus uploads are removed with a fixed number of set-based DELETE
+statements (equipment, summaries, jobs, then the uploads themselves, all
+keyed by the set of upload ids). No equipment row is ever loaded, so the
+application's work depends on the number of uploads dropped, not on the
+rows they hold; only the database's own delete time grows with them.
+
+With settings.RETENTION_MODE = 'inline' retention runs inside the
+transaction that made an upload ready. With 'deferred' it is swept on the
+background ingest pool after that transaction commits, so uploads return
+without paying for the deletes at all. The ``apply_retention`` command
+sweeps every user, e.g. after lowering a keep count.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from . import columnar
+from .models import Equipment, IngestJob, Upload, UploadSession, UploadSummary
+from .responsecache import invalidate_user
+from .sqlite import serialized_writes
+
+logger = logging.getLogger(__name__)
+
+RETENTION_MODES = ['inline', 'deferred']
+
+
+def keep_count_for(user):
+    """Number of uploads retained for a user (settings.UPLOAD_KEEP_COUNT_BY_USER overrides)."""
+    return settings.UPLOAD_KEEP_COUNT_BY_USER.get(user.username, settings.UPLOAD_KEEP_COUNT)
+
+
+def select_deletions(surplus_ids):
+    """
+    Split surplus uploads into those to delete and those to retire.
+
+    An upload whose rows are still shared by a duplicate outside the surplus
+    is only retired. A retired source whose last duplicates are being
+    deleted goes too.
+
+    Returns:
+        tuple: (set of upload ids to delete, set of upload ids to retire)
+    """
+    surplus_ids = set(surplus_ids)
+    retire_ids = set(
+        Upload.objects.filter(data_source_id__in=surplus_ids).exclude(
+            id__in=surplus_ids
+        ).values_list('data_source_id', flat=True)
+    )
+    delete_ids = surplus_ids - retire_ids
+
+    sources = Upload.objects.filter(
+        id__in=Upload.objects.filter(id__in=delete_ids).values('data_source_id'),
+        status=Upload.STATUS_RETIRED
+    ).exclude(id__in=delete_ids)
+    still_shared = set(
+        Upload.objects.filter(data_source__in=sources).exclude(
+            id__in=delete_ids
+        ).values_list('data_source_id', flat=True)
+    )
+    delete_ids |= set(sources.values_list('id', flat=True)) - still_shared
+    return delete_ids, retire_ids
+
+
+def delete_uploads(upload_ids):
+    """
+    Delete uploads and everything stored for them with set-based statements.
+
+    Equipment rows are deleted with one DELETE per table (no model instances
+    are loaded or cascaded through the ORM collector); rejected-rows files
+    and columnar stores of uploads that own their rows are removed once the
+    transaction commits. The caller owns the transaction.
+
+    Returns:
+        int: Number of equipment rows deleted
+    """
+    upload_ids = list(upload_ids)
+    if not upload_ids:
+        return 0
+
+    uploads = list(Upload.objects.filter(id__in=upload_ids).values_list(
+        'id', 'user_id', 'data_source_id', 'rejects_file'
+    ))
+    user_ids = {user_id for _, user_id, _, _ in uploads}
+    # Only uploads that own their rows have rows, rejects and a store to remove
+    owners = [(upload_id, rejects_file) for upload_id, _, source_id, rejects_file in uploads if source_id is None]
+    rejects_files = [name for _, name in owners if name]
+    owner_ids = [upload_id for upload_id, _ in owners]
+
+    # _raw_delete issues a plain DELETE ... WHERE without collecting rows
+    rows = Equipment.objects.filter(upload_id__in=owner_ids)._raw_delete(Equipment.objects.db)
+    UploadSummary.objects.filter(upload_id__in=upload_ids)._raw_delete(UploadSummary.objects.db)
+    IngestJob.objects.filter(upload_id__in=upload_ids)._raw_delete(IngestJob.objects.db)
+    UploadSession.objects.filter(upload_id__in=upload_ids).update(upload=None)
+    Upload.objects.filter(id__in=upload_ids)._raw_delete(Upload.objects.db)
+
+    def remove_files():
+        for name in rejects_files:
+            default_storage.delete(name)
+        for upload_id in owner_ids:
+            columnar.delete_store(upload_id)
+
+    transaction.on_commit(remove_files)
+    for user_id in user_ids:
+        invalidate_user(user_id)
+    return rows
+
+
+def apply_retention(user, keep_count=None):
+    """
+    Drop a user's uploads beyond their newest ``keep_count``.
+
+    Uploads still being ingested count towards the kept window but are
+    never removed. The caller owns the transaction.
+
+    Args:
+        user: User whose uploads are trimmed
+        keep_count: Uploads to keep, defaults to keep_count_for(user)
+
+    Returns:
+        tuple: (uploads deleted, uploads retired, equipment rows deleted)
+    """
+    keep_count = keep_count_for(user) if keep_count is None else keep_count
+    # Locked before reading, so the surplus cannot change before the deletes
+    with serialized_writes():
+        surplus_ids = [
+            upload_id for upload_id, upload_status in Upload.objects.filter(user=user).exclude(
+                status=Upload.STATUS_RETIRED
+            ).order_by('-uploaded_at').values_list('id', 'status')[keep_count:]
+            # Never pull data out from under an ingest that is still running
+            if upload_status not in Upload.IN_PROGRESS_STATUSES
+        ]
+        if not surplus_ids:
+            return 0, 0, 0
+
+        delete_ids, retire_ids = select_deletions(surplus_ids)
+        Upload.objects.filter(id__in=retire_ids).update(status=Upload.STATUS_RETIRED)
+        rows = delete_uploads(delete_ids)
+    invalidate_user(user.id)
+    return len(delete_ids), len(retire_ids), rows
+
+
+def enforce_retention(user):
+    """
+    Apply retention after a new upload, as configured by settings.RETENTION_MODE.
+
+    Inline, retention runs in the caller's transaction. Deferred, it is
+    handed to the background ingest pool once that transaction commits.
+    """
+    if settings.RETENTION_MODE not in RETENTION_MODES:
+        raise ValueError(f'Unknown retention mode: {settings.RETENTION_MODE}')
+    if settings.RETENTION_MODE == 'deferred':
+        from .jobs import get_executor
+
+        user_id = user.id
+        transaction.on_commit(lambda: get_executor().submit(run_sweep, user_id))
+    else:
+        apply_retention(user)
+
+
+def run_sweep(user_id):
+    """Thread pool entry point: apply retention for one user in its own transaction."""
+    close_old_connections()
+    try:
+        sweep(Upload.objects.filter(user_id=user_id))
+    except Exception:
+        logger.exception('Retention sweep for user %s failed', user_id)
+    finally:
+        close_old_connections()
+
+
+def sweep(uploads=None):
+    """
+    Apply retention to every user with uploads, each in its own transaction.
+
+    Args:
+        uploads: Upload queryset limiting which users are swept
+
+    Returns:
+        tuple: (uploads deleted, uploads retired, equipment rows deleted)
+    """
+    uploads = Upload.objects.all() if uploads is None else uploads
+    totals = [0, 0, 0]
+    for user in User.objects.filter(id__in=uploads.values('user_id')):
+        with serialized_writes(), transaction.atomic():
+            for i, count in enumerate(apply_retention(user)):
+                totals[i] += count
+    return tuple(totals)
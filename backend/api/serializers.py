@@ -2,8 +2,11 @@
 Serializers for Chemical Equipment Analysis API.
 """
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Equipment, Upload
+from .chunked import received_chunks
+from .models import Equipment, IngestJob, Upload, UploadSession
+from .readers import UNSUPPORTED_FILE_MESSAGE, is_supported_upload
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -30,25 +33,99 @@ class EquipmentSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'type', 'flowrate', 'pressure', 'temperature']
 
 
+def equipment_columns(rows):
+    """
+    Lay equipment rows out one list per field, for ``?format=columns``.
+    
+    ``type`` is dictionary-encoded: its list holds indexes into
+    ``dictionaries['type']``.
+    
+    Args:
+        rows: Tuples of EquipmentSerializer.Meta.fields values, e.g. from
+            ``values_list(*EquipmentSerializer.Meta.fields)``
+    
+    Returns:
+        dict: columns ({field: list}) and dictionaries ({'type': list})
+    """
+    fields = EquipmentSerializer.Meta.fields
+    columns = dict(zip(fields, map(list, zip(*rows)))) if rows else {field: [] for field in fields}
+    types = {}
+    columns['type'] = [types.setdefault(value, len(types)) for value in columns['type']]
+    return {'columns': columns, 'dictionaries': {'type': list(types)}}
+
+
 class UploadSerializer(serializers.ModelSerializer):
     """Serializer for Upload model."""
-    equipment_count = serializers.SerializerMethodField()
+    # Rows are counted at ingest; counting them per upload here was an N+1
+    equipment_count = serializers.IntegerField(source='record_count', read_only=True)
     
     class Meta:
         model = Upload
-        fields = ['id', 'filename', 'uploaded_at', 'record_count', 'equipment_count']
+        fields = [
+            'id', 'filename', 'uploaded_at', 'record_count', 'equipment_count', 'status',
+            'data_source', 'rejected_count'
+        ]
+
+
+class IngestJobSerializer(serializers.ModelSerializer):
+    """Serializer for background ingestion job status."""
+    upload_id = serializers.IntegerField(source='upload.id', read_only=True)
+    filename = serializers.CharField(source='upload.filename', read_only=True)
+    
+    class Meta:
+        model = IngestJob
+        fields = [
+            'id', 'upload_id', 'filename', 'status', 'rows_processed', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload sessions."""
+    chunk_size = serializers.IntegerField(required=False, min_value=1)
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'filename', 'total_size', 'chunk_size', 'total_chunks',
+            'received_chunks', 'created_at', 'upload'
+        ]
+        read_only_fields = ['id', 'created_at', 'upload']
+    
+    def get_received_chunks(self, obj):
+        return received_chunks(obj)
     
-    def get_equipment_count(self, obj):
-        return obj.equipment.count()
+    def validate_filename(self, value):
+        if not is_supported_upload(value):
+            raise serializers.ValidationError(UNSUPPORTED_FILE_MESSAGE)
+        return value
+    
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('File is empty')
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'File is larger than the {settings.UPLOAD_MAX_SIZE} byte upload limit'
+            )
+        return value
+    
+    def validate_chunk_size(self, value):
+        return max(settings.UPLOAD_MIN_CHUNK_SIZE, min(value, settings.UPLOAD_MAX_CHUNK_SIZE))
+    
+    def create(self, validated_data):
+        validated_data.setdefault('chunk_size', settings.UPLOAD_CHUNK_SIZE)
+        return super().create(validated_data)
 
 
 class UploadDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for Upload including equipment list."""
-    equipment = EquipmentSerializer(many=True, read_only=True)
+    equipment = EquipmentSerializer(source='data_equipment', many=True, read_only=True)
     
     class Meta:
         model = Upload
-        fields = ['id', 'filename', 'uploaded_at', 'record_count', 'equipment']
+        fields = ['id', 'filename', 'uploaded_at', 'record_count', 'rejected_count', 'status', 'equipment']
 
 
 class SummarySerializer(serializers.Serializer):
@@ -64,3 +141,4 @@ class SummarySerializer(serializers.Serializer):
     min_temperature = serializers.FloatField()
     max_temperature = serializers.FloatField()
     type_distribution = serializers.DictField()
+    type_breakdown = serializers.DictField()
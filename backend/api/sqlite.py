@@ -0,0 +1,88 @@
+"""
+SQLite production tuning.
+
+Every new SQLite connection gets settings.SQLITE_PRAGMAS (WAL journaling,
+relaxed fsync, a larger page cache, memory-mapped reads and a busy timeout),
+so readers work from a snapshot while an upload is being written instead of
+waiting for it.
+
+SQLite allows one writer at a time, and a transaction that starts reading
+and later wants to write fails at once with "database is locked" when
+another connection is writing, whatever the busy timeout. Every write
+therefore goes through serialized_writes(), which admits one writing
+transaction at a time across every process using the database (web
+workers, run_ingest_worker, run_maintenance, apply_retention...) by
+holding an exclusive lock on a file next to it. Take it outside
+transaction.atomic(), and before the reads a write depends on, so a
+transaction never holds SQLite's lock while waiting for this one.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: writes are serialized per process only
+    fcntl = None
+
+_write_lock = threading.RLock()
+# Lock files held by this process, by database alias, and how many nested
+# serialized_writes() blocks hold each; guarded by _write_lock
+_held = {}
+
+
+def lock_path(connection):
+    """Path of the writer lock file of an SQLite database, or None if it is in memory."""
+    if connection.is_in_memory_db():
+        return None
+    return f"{connection.settings_dict['NAME']}.write-lock"
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created receiver applying settings.SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def serialized_writes(using='default'):
+    """
+    Run a block of ingestion writes as the database's only SQLite writer.
+
+    Waits for writers in other threads of this process, then for writers
+    in other processes. Re-entrant, so a per-chunk write inside a
+    whole-upload transaction does not wait on itself. A no-op on databases
+    with concurrent writers.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or not settings.SQLITE_SERIALIZE_WRITES:
+        yield
+        return
+    with _write_lock:
+        if using not in _held:
+            path = lock_path(connection) if fcntl else None
+            lock_file = None
+            if path:
+                lock_file = open(path, 'a')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                except BaseException:
+                    lock_file.close()
+                    raise
+            _held[using] = [lock_file, 0]
+        held = _held[using]
+        held[1] += 1
+        try:
+            yield
+        finally:
+            held[1] -= 1
+            if not held[1]:
+                del _held[using]
+                if held[0] is not None:
+                    # Closing the file releases its lock
+                    held[0].close()
@@ -0,0 +1,54 @@
+"""
+Shared fixtures of the API tests.
+"""
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.responsecache import get_cache
+
+SAMPLE_HEADER = b'Equipment Name,Type,Flowrate,Pressure,Temperature\n'
+
+
+def sample_csv(index):
+    """A small CSV whose content differs per index, so it is not deduplicated."""
+    return SAMPLE_HEADER + (
+        f'Pump-{index},Pump,{100 + index},5.2,110\n'
+        f'Valve-{index},Valve,60,4.1,105\n'
+        f'Reactor-{index},Reactor,90,7.5,210\n'
+        f'Broken-{index},Pump,abc,5.0,100\n'
+    ).encode()
+
+
+def csv_file(content, name='equipment.csv'):
+    return SimpleUploadedFile(name, content)
+
+
+class APITestMixin:
+    """
+    Give each test a user with a token-authenticated client, and keep the
+    files written by uploads and cached responses out of other tests.
+    """
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root, INGEST_ASYNC=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        get_cache().clear()
+
+        self.user = User.objects.create_user('tester', password='tester')
+        self.client = APIClient()
+        # Real token authentication, so its query counts like in production
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+
+    def upload(self, content, name='equipment.csv'):
+        """POST a CSV to /api/upload/ and return the response."""
+        return self.client.post('/api/upload/', {'file': csv_file(content, name)}, format='multipart')
@@ -0,0 +1,49 @@
+"""
+Tests of resumable upload sessions (api/chunked.py).
+"""
+import hashlib
+
+from django.test import TestCase, override_settings
+
+from .helpers import APITestMixin, sample_csv
+
+
+@override_settings(UPLOAD_MIN_CHUNK_SIZE=16, UPLOAD_MAX_CHUNK_SIZE=64, UPLOAD_MAX_SIZE=4096)
+class UploadSessionTests(APITestMixin, TestCase):
+
+    def start(self, total_size, chunk_size):
+        return self.client.post('/api/upload/sessions/', {
+            'filename': 'equipment.csv', 'total_size': total_size, 'chunk_size': chunk_size,
+        }, format='json')
+
+    def test_chunk_size_is_kept_within_bounds(self):
+        self.assertEqual(self.start(1000, 1).data['chunk_size'], 16)
+        self.assertEqual(self.start(1000, 1000).data['chunk_size'], 64)
+
+    def test_files_over_the_size_limit_are_refused(self):
+        response = self.start(4097, 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('total_size', response.data)
+
+    def test_incomplete_finalize_reports_capped_missing_chunks(self):
+        session = self.start(4096, 16).data
+        self.assertEqual(session['total_chunks'], 256)
+        response = self.client.post(f"/api/upload/sessions/{session['id']}/finalize/")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['missing_chunks'], list(range(100)))
+
+    def test_finalize_queues_the_assembled_file(self):
+        content = sample_csv(0)
+        session = self.start(len(content), 16).data
+        for index in range(session['total_chunks']):
+            chunk = content[index * 16:(index + 1) * 16]
+            response = self.client.put(
+                f"/api/upload/sessions/{session['id']}/chunks/{index}/", chunk,
+                content_type='application/octet-stream',
+                HTTP_X_CHUNK_CHECKSUM=hashlib.sha256(chunk).hexdigest(),
+            )
+            self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(f"/api/upload/sessions/{session['id']}/finalize/")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['job']['status'], 'queued')
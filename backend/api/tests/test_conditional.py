@@ -0,0 +1,80 @@
+"""
+Tests of conditional GETs (api/conditional.py) and the response cache.
+"""
+from django.test import TestCase
+
+from api.models import Equipment, Upload
+from api.renderers import ColumnarJSONRenderer
+
+from .helpers import APITestMixin, csv_file, sample_csv
+
+
+class ConditionalGetTests(APITestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.upload_id = self.upload(sample_csv(0)).data['upload']['id']
+
+    def test_matching_etag_is_not_modified(self):
+        for path in ['/api/data/', '/api/summary/', '/api/charts/', '/api/dashboard/', '/api/history/']:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response['Cache-Control'], 'private, no-cache')
+                repeat = self.client.get(path, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(repeat.status_code, 304)
+                self.assertEqual(repeat.content, b'')
+                self.assertEqual(repeat['ETag'], response['ETag'])
+
+    def test_last_modified_is_not_modified(self):
+        response = self.client.get('/api/summary/')
+        repeat = self.client.get('/api/summary/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_etag_depends_on_query(self):
+        self.assertNotEqual(
+            self.client.get('/api/data/')['ETag'], self.client.get('/api/data/?type=Pump')['ETag']
+        )
+
+    def test_etag_and_cache_depend_on_negotiated_renderer(self):
+        json_response = self.client.get('/api/data/')
+        columnar = self.client.get('/api/data/', HTTP_ACCEPT=ColumnarJSONRenderer.media_type)
+
+        self.assertEqual(columnar['X-Cache'], 'MISS')
+        self.assertIn('columns', columnar.json())
+        self.assertNotEqual(columnar['ETag'], json_response['ETag'])
+        self.assertIn('Accept', columnar['Vary'])
+        # A tag of one representation does not validate the other
+        self.assertEqual(self.client.get('/api/data/', HTTP_IF_NONE_MATCH=columnar['ETag']).status_code, 200)
+
+    def test_repeat_request_is_served_from_cache(self):
+        self.assertEqual(self.client.get('/api/summary/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/summary/')['X-Cache'], 'HIT')
+
+    def test_append_changes_etag_and_content(self):
+        before = self.client.get('/api/summary/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/history/{self.upload_id}/append/', {
+                'file': csv_file(sample_csv(1)),
+            }, format='multipart')
+
+        after = self.client.get('/api/summary/', HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertEqual(after['X-Cache'], 'MISS')
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertEqual(after.data['total_count'], 6)
+
+    def test_upload_being_ingested_gets_no_validators(self):
+        pending = Upload.objects.create(filename='queued.csv', user=self.user, status=Upload.STATUS_PROCESSING)
+        Equipment.objects.create(upload=pending, name='Pump-9', type='Pump', flowrate=1, pressure=1, temperature=1)
+
+        for path in [f'/api/data/?upload_id={pending.id}', f'/api/dashboard/?upload_id={pending.id}']:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertNotIn('ETag', response)
+                self.assertNotIn('X-Cache', response)
+                self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH='*').status_code, 200)
+
+        # Its status is part of the history's validator
+        history = self.client.get('/api/history/')
+        Upload.objects.filter(id=pending.id).update(status=Upload.STATUS_FAILED)
+        self.assertEqual(self.client.get('/api/history/', HTTP_IF_NONE_MATCH=history['ETag']).status_code, 200)
@@ -0,0 +1,100 @@
+"""
+Tests that every CSV parser backend produces the same validated output.
+"""
+import io
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.utils import CSV_BACKENDS, CSVFormatError, iter_csv_chunks
+
+from .helpers import SAMPLE_HEADER
+
+FIXTURES = {
+    'plain': SAMPLE_HEADER + b'Pump-1,Pump,120,5.2,110\nValve-1,Valve,60,4.1,105\n',
+    'byte order mark': b'\xef\xbb\xbf' + SAMPLE_HEADER + b'Pump-1,Pump,120,5.2,110\n',
+    'crlf': SAMPLE_HEADER.replace(b'\n', b'\r\n') + b'Pump-1,Pump,120,5.2,110\r\nValve-1,Valve,60,4.1,105\r\n',
+    'extra field': SAMPLE_HEADER + b'Pump-1,Pump,120,5.2,110\nPump-2,Pump,1,2,3,extra\nValve-1,Valve,60,4.1,105\n',
+    'missing fields': SAMPLE_HEADER + b'Pump-1,Pump,120,5.2,110\nPump-2,Pump,1\nValve-1,Valve,60,4.1,105\n',
+    'extra column': (
+        b'Notes,Equipment Name,Type,Flowrate,Pressure,Temperature\n'
+        b'a,Pump-1,Pump,120,5.2,110\n,Pump-2,Pump,1,2\nb,Valve-1,Valve,60,4.1,105,c\n'
+    ),
+    'blank lines': SAMPLE_HEADER + b'Pump-1,Pump,120,5.2,110\n\n\nValve-1,Valve,60,4.1,105\n',
+    'quoting': SAMPLE_HEADER + b'"Pump, main",Pump,120,5.2,110\n"Valve ""A""",Valve,60,4.1,105\n',
+    'invalid values': (
+        SAMPLE_HEADER + b'Pump-1,Pump,abc,5.2,110\n,Valve,60,4.1,105\nX-1,Widget,1,2,3\n'
+        b'Pump-2,pump,NA,inf,-1e9\nPump-3,Heat Exchanger,1,2,3\n'
+    ),
+    'header only': SAMPLE_HEADER,
+}
+
+# Many rows with every kind of irregular row, so chunk and pyarrow block
+# boundaries fall at and around them
+MIXED = SAMPLE_HEADER + b''.join(
+    [
+        b'Pump-%d,Pump,%d,5.2,110\n' % (i, i),
+        b'Short-%d,Valve,1\n' % i,
+        b'Long-%d,Reactor,1,2,3,4,5\n' % i,
+        b'\n',
+        b'Bad-%d,Valve,x,2,3\n' % i,
+        b'Line-%d,Pump,\n' % i,
+    ][i % 6] for i in range(120)
+)
+
+
+def parse(content, backend, chunksize):
+    """Accepted rows and rejects (with their row number in the file) of a parse."""
+    rows, rejects, offset = [], [], 0
+    for chunk in iter_csv_chunks(io.BytesIO(content), chunksize=chunksize, backend=backend):
+        rows.extend(map(tuple, chunk.rows.astype(object).to_numpy().tolist()))
+        rejects.extend(
+            (offset + int(row), reason) for row, reason in zip(chunk.rejected['row'], chunk.rejected['reason'])
+        )
+        offset += chunk.size
+    return rows, rejects
+
+
+class CSVBackendTests(SimpleTestCase):
+
+    def assert_backends_agree(self, content, chunksize=2):
+        expected = parse(content, 'pandas', chunksize)
+        for backend in CSV_BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(parse(content, backend, chunksize), expected)
+        return expected
+
+    def test_fixtures(self):
+        for name, content in FIXTURES.items():
+            with self.subTest(fixture=name):
+                self.assert_backends_agree(content)
+
+    def test_byte_order_mark_is_ignored(self):
+        rows, _ = self.assert_backends_agree(FIXTURES['byte order mark'])
+        self.assertEqual(len(rows), 1)
+
+    def test_short_rows_are_rejected_alone(self):
+        rows, rejects = self.assert_backends_agree(FIXTURES['missing fields'])
+        self.assertEqual([row[0] for row in rows], ['Pump-1', 'Valve-1'])
+        self.assertEqual(rejects, [(1, 'missing Pressure; missing Temperature')])
+
+    def test_irregular_rows_across_chunks_and_blocks(self):
+        # Small pyarrow blocks, so rows set aside fall in many batches
+        with mock.patch('api.utils.PYARROW_BLOCK_SIZE', 256):
+            for chunksize in (5, 1000):
+                with self.subTest(chunksize=chunksize):
+                    rows, rejects = self.assert_backends_agree(MIXED, chunksize)
+                    self.assertEqual(len(rows), 40)
+                    self.assertEqual(len(rejects), 60)
+
+    def test_missing_columns_fail_every_backend(self):
+        content = b'Equipment Name,Type,Flowrate\nPump-1,Pump,120\n'
+        for backend in CSV_BACKENDS:
+            with self.subTest(backend=backend):
+                with self.assertRaisesMessage(CSVFormatError, 'Missing columns: Pressure, Temperature'):
+                    parse(content, backend, 2)
+
+    def test_empty_file_fails_every_backend(self):
+        for backend in CSV_BACKENDS:
+            with self.subTest(backend=backend), self.assertRaises(CSVFormatError):
+                parse(b'', backend, 2)
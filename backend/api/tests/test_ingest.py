@@ -0,0 +1,123 @@
+"""
+Tests of ingestion and the stored upload summaries it maintains.
+"""
+import io
+import zipfile
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.test import TestCase
+from django.utils import timezone
+
+from api.ingest import rejected_sample
+from api.jobs import claim_job, enqueue_ingest, process_job, process_queued_jobs, recover_stale_jobs
+from api.maintenance import ingest_running
+from api.models import IngestJob, Upload, UploadSummary
+
+from .helpers import APITestMixin, csv_file, sample_csv
+
+
+class UploadSummaryTests(APITestMixin, TestCase):
+
+    def rebuilt(self, upload_id):
+        """The upload's summary recomputed from its stored rows."""
+        summary = UploadSummary(upload=Upload.objects.get(id=upload_id))
+        summary.rebuild()
+        return summary.as_dict()
+
+    def test_upload_stores_summary_of_valid_rows(self):
+        response = self.upload(sample_csv(0))
+        self.assertEqual(response.status_code, 201)
+        upload_id = response.data['upload']['id']
+
+        summary = self.client.get('/api/summary/').data
+        self.assertEqual(summary['total_count'], 3)
+        self.assertEqual(summary['type_distribution'], {'Pump': 1, 'Valve': 1, 'Reactor': 1})
+        self.assertEqual(dict(summary), self.rebuilt(upload_id))
+
+    def test_append_merges_new_rows_into_summary(self):
+        upload_id = self.upload(sample_csv(0)).data['upload']['id']
+        response = self.client.post(f'/api/history/{upload_id}/append/', {
+            'file': csv_file(sample_csv(5)),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 200)
+
+        summary = self.client.get(f'/api/summary/?upload_id={upload_id}').data
+        self.assertEqual(summary['total_count'], 6)
+        self.assertEqual(summary['type_distribution'], {'Pump': 2, 'Valve': 2, 'Reactor': 2})
+        self.assertEqual(summary['max_flowrate'], 105.0)
+        self.assertEqual(dict(summary), self.rebuilt(upload_id))
+        self.assertEqual(Upload.objects.get(id=upload_id).record_count, 6)
+
+    def test_append_to_shared_rows_is_refused(self):
+        source_id = self.upload(sample_csv(0)).data['upload']['id']
+        self.upload(sample_csv(0))
+        response = self.client.post(f'/api/history/{source_id}/append/', {
+            'file': csv_file(sample_csv(1)),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 409)
+
+    def test_rejected_rows_of_zip_members_are_numbered_per_member(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('first.csv', sample_csv(0))
+            zf.writestr('second.csv', sample_csv(1))
+        response = self.upload(archive.getvalue(), name='equipment.zip')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['equipment_count'], 6)
+
+        upload = Upload.objects.get(id=response.data['upload']['id'])
+        self.assertEqual([(row['file'], row['row']) for row in rejected_sample(upload)], [
+            ('first.csv', 4), ('second.csv', 4),
+        ])
+
+    def test_summary_requested_during_background_ingest_is_not_saved(self):
+        response = self.client.post('/api/upload/?async=true', {'file': csv_file(sample_csv(0))}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        upload_id = response.data['upload']['id']
+
+        for path in ['/api/summary/', '/api/charts/', '/api/dashboard/']:
+            self.assertEqual(self.client.get(f'{path}?upload_id={upload_id}').status_code, 200)
+        self.assertFalse(UploadSummary.objects.filter(upload_id=upload_id).exists())
+
+        process_job(IngestJob.objects.get(upload_id=upload_id).id)
+        self.assertEqual(IngestJob.objects.get(upload_id=upload_id).status, IngestJob.STATUS_SUCCEEDED)
+        self.assertEqual(self.client.get(f'/api/summary/?upload_id={upload_id}').data['total_count'], 3)
+
+
+class StaleJobTests(APITestMixin, TestCase):
+
+    def running_job(self, index, heartbeat_age):
+        """A claimed job whose worker last reported ``heartbeat_age`` seconds ago."""
+        upload = Upload.objects.create(filename=f'{index}.csv', user=self.user, status=Upload.STATUS_PROCESSING)
+        job = enqueue_ingest(upload, csv_file(sample_csv(index)))
+        claim_job(job.id)
+        IngestJob.objects.filter(id=job.id).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age)
+        )
+        return job
+
+    def test_stalled_jobs_are_requeued_or_failed(self):
+        stalled = self.running_job(0, heartbeat_age=3600)
+        lost = self.running_job(1, heartbeat_age=3600)
+        default_storage.delete(lost.file_name)
+        live = self.running_job(2, heartbeat_age=0)
+
+        self.assertEqual(recover_stale_jobs(), (1, 1))
+        self.assertEqual(IngestJob.objects.get(id=live.id).status, IngestJob.STATUS_RUNNING)
+        self.assertEqual(IngestJob.objects.get(id=lost.id).status, IngestJob.STATUS_FAILED)
+        self.assertEqual(Upload.objects.get(id=lost.upload_id).status, Upload.STATUS_FAILED)
+        self.assertEqual(Upload.objects.get(id=stalled.upload_id).status, Upload.STATUS_PENDING)
+
+        # The re-queued job runs again from the start
+        self.assertEqual(process_queued_jobs(), 1)
+        self.assertEqual(IngestJob.objects.get(id=stalled.id).status, IngestJob.STATUS_SUCCEEDED)
+        self.assertEqual(Upload.objects.get(id=stalled.upload_id).record_count, 3)
+
+    def test_only_live_jobs_hold_off_maintenance(self):
+        Upload.objects.create(filename='queued.csv', user=self.user, status=Upload.STATUS_PENDING)
+        stalled = self.running_job(0, heartbeat_age=3600)
+        self.assertFalse(ingest_running())
+
+        IngestJob.objects.filter(id=stalled.id).update(heartbeat_at=timezone.now())
+        self.assertTrue(ingest_running())
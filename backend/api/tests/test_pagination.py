@@ -0,0 +1,79 @@
+"""
+Tests of the keyset pagination of /api/data/.
+"""
+from django.test import TestCase
+
+from api.models import Equipment
+
+from .helpers import SAMPLE_HEADER, APITestMixin
+
+# Repeated names, so pages must break ties on id
+ROWS = [
+    ('Valve-1', 'Valve', 60), ('Pump-2', 'Pump', 120), ('Pump-1', 'Pump', 100),
+    ('Reactor-1', 'Reactor', 90), ('Pump-2', 'Pump', 110), ('Valve-1', 'Valve', 65),
+    ('Condenser-1', 'Condenser', 40),
+]
+
+
+class CursorPaginationTests(APITestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.upload(SAMPLE_HEADER + ''.join(
+            f'{name},{eq_type},{flowrate},5.0,100\n' for name, eq_type, flowrate in ROWS
+        ).encode())
+
+    def expected(self, descending=False, **filters):
+        order = ['-name', '-id'] if descending else ['name', 'id']
+        return list(Equipment.objects.filter(**filters).order_by(*order).values_list('id', flat=True))
+
+    def walk(self, url, direction='next'):
+        """Follow ``direction`` links from ``url``; returns (ids in page order, pages)."""
+        ids, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data[direction]
+        return ids, pages
+
+    def test_next_links_visit_every_row_once_in_order(self):
+        ids, pages = self.walk('/api/data/?page_size=2')
+        self.assertEqual(ids, self.expected())
+        self.assertEqual(len(pages), 4)
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_links_return_the_same_pages(self):
+        ids, pages = self.walk('/api/data/?page_size=2')
+        back_ids, back_pages = self.walk(pages[-1]['previous'], 'previous')
+        self.assertEqual(
+            [row['id'] for page in reversed(back_pages) for row in page['results']],
+            ids[:-len(pages[-1]['results'])]
+        )
+        # The first page read backwards links forward again
+        self.assertIsNotNone(back_pages[-1]['next'])
+
+    def test_descending_order(self):
+        ids, _ = self.walk('/api/data/?page_size=3&ordering=-name')
+        self.assertEqual(ids, self.expected(descending=True))
+
+    def test_filters_apply_to_every_page(self):
+        ids, _ = self.walk('/api/data/?page_size=1&type=Pump')
+        self.assertEqual(ids, self.expected(type='Pump'))
+
+    def test_columnar_pages_match_json_pages(self):
+        ids, _ = self.walk('/api/data/?page_size=2')
+        columnar_ids = []
+        url = '/api/data/?page_size=2&format=columns'
+        while url:
+            data = self.client.get(url).json()
+            columnar_ids.extend(data['columns']['id'])
+            url = data['next']
+        self.assertEqual(columnar_ids, ids)
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/data/?cursor=not-a-cursor').status_code, 404)
+
+    def test_invalid_ordering_is_rejected(self):
+        self.assertEqual(self.client.get('/api/data/?ordering=type').status_code, 400)
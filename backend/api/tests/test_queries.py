@@ -0,0 +1,254 @@
+"""
+Query checks of the API endpoints.
+
+Every endpoint must stay within its budget in settings.QUERY_BUDGETS, must
+not run more queries as a user's history grows (an N+1), and must answer a
+request repeating its ETag with a 304 within NOT_MODIFIED_BUDGET queries.
+Every read endpoint's SELECTs must be served by indexes: no full table
+scan, no temporary sort, and no join from equipment to uploads.
+"""
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Equipment, IngestJob, Upload
+
+from .helpers import APITestMixin, csv_file, sample_csv
+
+# Endpoints that are measured; {upload}, {job} and {cursor} (the second
+# page of /api/data/?page_size=1) are filled in
+ENDPOINTS = [
+    '/api/data/',
+    '/api/data/?upload_id={upload}',
+    '/api/data/?format=columns',
+    '/api/data/?page_size=1&cursor={cursor}',
+    '/api/data/?type=Pump&min_flowrate=10',
+    '/api/summary/',
+    '/api/summary/?upload_id={upload}',
+    '/api/charts/',
+    '/api/dashboard/',
+    '/api/dashboard/?type=Pump&ordering=-name',
+    '/api/history/',
+    '/api/history/{upload}/',
+    '/api/history/{upload}/rejects/',
+    '/api/report/',
+    '/api/export/parquet/',
+    '/api/export/csv/',
+    '/api/export/ndjson/?gzip=1',
+    '/api/jobs/',
+    '/api/jobs/{job}/',
+]
+
+# Read endpoints whose query plans are checked, filled in like ENDPOINTS
+PLAN_ENDPOINTS = [
+    '/api/data/',
+    '/api/data/?upload_id={upload}',
+    '/api/data/?format=columns',
+    '/api/data/?page_size=1&cursor={cursor}',
+    '/api/data/?ordering=-name&page_size=1&cursor={cursor}',
+    '/api/data/?type=Pump',
+    '/api/data/?name_prefix=Pump&min_flowrate=10',
+    '/api/summary/',
+    '/api/charts/',
+    '/api/dashboard/',
+    '/api/dashboard/?upload_id={upload}&type=Pump',
+    '/api/history/',
+    '/api/history/{upload}/',
+    '/api/report/',
+    '/api/export/parquet/',
+    '/api/export/csv/',
+    '/api/export/ndjson/',
+    '/api/jobs/',
+    '/api/jobs/{job}/',
+]
+
+# Plan fragments that mean a query reads a whole table or sorts in memory
+SQLITE_BAD_PLANS = ('SCAN ', 'USE TEMP B-TREE')
+POSTGRES_BAD_PLANS = ('Seq Scan',)
+
+# Most queries (token authentication included) of a conditional GET answered
+# with 304 Not Modified
+NOT_MODIFIED_BUDGET = 2
+
+# Uploads added before the second measurement
+HISTORY_UPLOADS = 6
+
+# Logged by Django, but not counted by the budgets (QueryMetricsMiddleware
+# only sees statements run through a cursor)
+TRANSACTION_CONTROL = {'BEGIN', 'COMMIT', 'ROLLBACK'}
+
+
+def statements(queries):
+    """SQL of the statements captured by a CaptureQueriesContext, as budgets count them."""
+    return [query['sql'] for query in queries.captured_queries if query['sql'] not in TRANSACTION_CONTROL]
+
+
+@contextmanager
+def capture_selects(selects):
+    """Record (sql, params) of every SELECT run on the default connection."""
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            selects.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield
+
+
+def explain(sql, params):
+    """The database's plan of a statement, one line per step."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+        # Tiny test tables always favour sequential scans; make the planner
+        # show whether an index could serve the query instead.
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN {sql}', params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def is_full_scan(plan):
+    bad = SQLITE_BAD_PLANS if connection.vendor == 'sqlite' else POSTGRES_BAD_PLANS
+    return any(fragment in line for line in plan for fragment in bad)
+
+
+def joins_upload(sql):
+    """
+    True if an equipment query joins uploads (e.g. to filter by user).
+
+    Views resolve the user's upload first and then filter equipment by
+    upload id alone, so equipment reads never pay for the join.
+    """
+    qn = connection.ops.quote_name
+    return f'FROM {qn(Equipment._meta.db_table)}' in sql and f'JOIN {qn(Upload._meta.db_table)}' in sql
+
+
+class EndpointTestMixin(APITestMixin):
+
+    def fill_paths(self, paths):
+        """
+        Upload a file and queue a job, then fill in the {upload}, {job} and
+        {cursor} of ``paths``.
+        """
+        upload_id = self.upload(sample_csv(0)).data['upload']['id']
+        # A queued job record is enough for the job endpoints to query
+        pending = Upload.objects.create(filename='queued.csv', user=self.user, status=Upload.STATUS_PENDING)
+        job_id = IngestJob.objects.create(upload=pending, file_name='ingest/queued.csv').id
+        next_link = self.client.get('/api/data/?page_size=1').data['next']
+        cursor = parse_qs(urlparse(next_link).query)['cursor'][0]
+        return [path.format(upload=upload_id, job=job_id, cursor=cursor) for path in paths]
+
+
+# Transactions as in production: TestCase would add a savepoint query to
+# every atomic block
+@override_settings(
+    # Trim inline so the upload request's own queries are measured, and
+    # keep every upload but those of the retention test
+    RETENTION_MODE='inline', UPLOAD_KEEP_COUNT=HISTORY_UPLOADS + 3, UPLOAD_KEEP_COUNT_BY_USER={}
+)
+class QueryBudgetTests(EndpointTestMixin, TransactionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.paths = self.fill_paths(ENDPOINTS)
+
+    def measure(self, method, path, **kwargs):
+        """
+        Run a request and check it against its endpoint's budget.
+
+        Returns:
+            tuple: (response, number of queries)
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(path, **kwargs)
+            if response.streaming:
+                # Streamed exports query as their content is read
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, f'{method.upper()} {path}')
+
+        url_name = response.resolver_match.url_name
+        self.assertIn(url_name, settings.QUERY_BUDGETS, f'no budget for {url_name!r}')
+        sql = statements(queries)
+        self.assertLessEqual(
+            len(sql), settings.QUERY_BUDGETS[url_name], f'{method.upper()} {path} ran:\n' + '\n'.join(sql)
+        )
+        return response, len(sql)
+
+    def add_history(self):
+        """Upload HISTORY_UPLOADS more files and return the last upload's id."""
+        for index in range(1, HISTORY_UPLOADS + 1):
+            upload_id = self.upload(sample_csv(index)).data['upload']['id']
+        return upload_id
+
+    def test_uploads_within_budget(self):
+        self.measure('post', '/api/upload/', data={'file': csv_file(sample_csv(1))}, format='multipart')
+        # A repeated file is served by deduplication
+        self.measure('post', '/api/upload/', data={'file': csv_file(sample_csv(1))}, format='multipart')
+
+    def test_append_within_budget(self):
+        latest_id = self.add_history()
+        self.measure('post', f'/api/history/{latest_id}/append/', data={
+            'file': csv_file(sample_csv(HISTORY_UPLOADS + 1)),
+        }, format='multipart')
+
+    def test_upload_applying_retention_within_budget(self):
+        self.add_history()
+        # An upload past the keep count also pays for retention's deletes
+        with override_settings(UPLOAD_KEEP_COUNT=2):
+            self.measure('post', '/api/upload/', data={
+                'file': csv_file(sample_csv(HISTORY_UPLOADS + 1)),
+            }, format='multipart')
+        self.assertEqual(Upload.objects.filter(user=self.user, status=Upload.STATUS_READY).count(), 2)
+
+    def test_reads_within_budget_and_constant_with_history(self):
+        first = {}
+        for path in self.paths:
+            with self.subTest(path=path):
+                first[path] = self.measure('get', path)[1]
+
+        # Counts must not follow the size of the history
+        self.add_history()
+        for path in self.paths:
+            with self.subTest(path=path):
+                self.assertLessEqual(self.measure('get', path)[1], first[path])
+
+    def test_not_modified_within_budget(self):
+        for path in self.paths:
+            etag = self.client.get(path).get('ETag')
+            if not etag:
+                continue
+            with self.subTest(path=path), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertLessEqual(len(statements(queries)), NOT_MODIFIED_BUDGET)
+
+
+class QueryPlanTests(EndpointTestMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest(f'Query plan checks support SQLite and PostgreSQL, not {connection.vendor}')
+        self.paths = self.fill_paths(PLAN_ENDPOINTS)
+
+    def test_read_queries_use_indexes(self):
+        for path in self.paths:
+            with self.subTest(path=path):
+                selects = []
+                with capture_selects(selects):
+                    response = self.client.get(path)
+                    if response.streaming:
+                        # Streamed exports query as their content is read
+                        b''.join(response.streaming_content)
+                self.assertLess(response.status_code, 400)
+
+                for sql, params in selects:
+                    plan = explain(sql, params)
+                    self.assertFalse(is_full_scan(plan), f'{sql}\n' + '\n'.join(plan))
+                    self.assertFalse(joins_upload(sql), f'equipment query joins the upload table: {sql}')
@@ -0,0 +1,67 @@
+"""
+Tests of upload retention (api/retention.py).
+"""
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Equipment, Upload, UploadSummary
+from api.retention import apply_retention
+
+from .helpers import APITestMixin, sample_csv
+
+
+# Keep everything while uploading; each test trims explicitly
+@override_settings(RETENTION_MODE='inline', UPLOAD_KEEP_COUNT=100, UPLOAD_KEEP_COUNT_BY_USER={})
+class RetentionTests(APITestMixin, TestCase):
+
+    def add_uploads(self, count, start=0):
+        """Upload ``count`` distinct files; returns their ids, oldest first."""
+        return [self.upload(sample_csv(index)).data['upload']['id'] for index in range(start, start + count)]
+
+    def test_keeps_newest_uploads_and_deletes_their_rows(self):
+        ids = self.add_uploads(4)
+        deleted, retired, rows = apply_retention(self.user, keep_count=2)
+
+        self.assertEqual((deleted, retired, rows), (2, 0, 6))
+        self.assertEqual(set(Upload.objects.values_list('id', flat=True)), set(ids[2:]))
+        self.assertFalse(Equipment.objects.filter(upload_id__in=ids[:2]).exists())
+        self.assertFalse(UploadSummary.objects.filter(upload_id__in=ids[:2]).exists())
+        self.assertEqual(Equipment.objects.count(), 6)
+
+    def test_source_of_kept_duplicate_is_retired_then_deleted_with_it(self):
+        source_id, other_id = self.add_uploads(2)
+        duplicate = self.upload(sample_csv(0)).data['upload']
+        self.assertEqual(duplicate['data_source'], source_id)
+
+        self.assertEqual(apply_retention(self.user, keep_count=1)[:2], (1, 1))
+        source = Upload.objects.get(id=source_id)
+        self.assertEqual(source.status, Upload.STATUS_RETIRED)
+        self.assertFalse(Upload.objects.filter(id=other_id).exists())
+        self.assertEqual(Equipment.objects.filter(upload_id=source_id).count(), 3)
+        # The duplicate still reads the retired source's rows
+        self.assertEqual(self.client.get('/api/summary/').data['total_count'], 3)
+
+        # The last duplicate going takes the retired source with it
+        self.assertEqual(apply_retention(self.user, keep_count=0), (2, 0, 3))
+        self.assertFalse(Upload.objects.exists())
+
+    def test_uploads_being_ingested_are_never_removed(self):
+        pending = Upload.objects.create(filename='queued.csv', user=self.user, status=Upload.STATUS_PENDING)
+        self.add_uploads(2)
+        apply_retention(self.user, keep_count=0)
+        self.assertEqual(list(Upload.objects.values_list('id', flat=True)), [pending.id])
+
+    def test_statement_count_does_not_depend_on_uploads_removed(self):
+        self.add_uploads(7)
+        with CaptureQueriesContext(connection) as few:
+            self.assertEqual(apply_retention(self.user, keep_count=5)[0], 2)
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(apply_retention(self.user, keep_count=0)[0], 5)
+        self.assertEqual(len(many), len(few))
+
+    def test_history_lists_every_kept_upload(self):
+        ids = self.add_uploads(7)
+        with override_settings(UPLOAD_KEEP_COUNT=5, UPLOAD_KEEP_COUNT_BY_USER={'tester': 7}):
+            history = self.client.get('/api/history/').data
+        self.assertEqual([upload['id'] for upload in history], ids[::-1])
@@ -0,0 +1,30 @@
+"""
+File upload handlers for Chemical Equipment Analysis API.
+"""
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class ContentHashUploadHandler(FileUploadHandler):
+    """
+    Compute the SHA-256 of each uploaded file while its chunks stream in.
+
+    Must run before the handlers that store the file: data is passed through
+    unchanged and no file object is produced. Digests are recorded on the
+    request as ``upload_content_hashes[field_name]``.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_content_hashes'):
+            self.request.upload_content_hashes = {}
+        self.request.upload_content_hashes[self.field_name] = self.hasher.hexdigest()
+        return None
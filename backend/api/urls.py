@@ -11,9 +11,27 @@ urlpatterns = [
     
     # Data endpoints
     path('upload/', views.CSVUploadView.as_view(), name='upload'),
+    path('upload/sessions/', views.UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('upload/sessions/<uuid:pk>/', views.UploadSessionDetailView.as_view(), name='upload-session-detail'),
+    path('upload/sessions/<uuid:pk>/chunks/<int:index>/', views.UploadChunkView.as_view(), name='upload-session-chunk'),
+    path('upload/sessions/<uuid:pk>/finalize/', views.UploadSessionFinalizeView.as_view(), name='upload-session-finalize'),
     path('data/', views.EquipmentListView.as_view(), name='equipment-list'),
     path('summary/', views.SummaryView.as_view(), name='summary'),
+    path('charts/', views.ChartDataView.as_view(), name='charts'),
+    path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
     path('history/', views.UploadHistoryView.as_view(), name='upload-history'),
     path('history/<int:pk>/', views.UploadDetailView.as_view(), name='upload-detail'),
+    path('history/<int:pk>/append/', views.UploadAppendView.as_view(), name='upload-append'),
+    path('history/<int:pk>/rejects/', views.UploadRejectsView.as_view(), name='upload-rejects'),
     path('report/', views.PDFReportView.as_view(), name='pdf-report'),
+    path('export/parquet/', views.ParquetExportView.as_view(), name='export-parquet'),
+    path('export/csv/', views.CSVExportView.as_view(), name='export-csv'),
+    path('export/ndjson/', views.NDJSONExportView.as_view(), name='export-ndjson'),
+    
+    # Background ingestion
+    path('jobs/', views.IngestJobListView.as_view(), name='job-list'),
+    path('jobs/<int:pk>/', views.IngestJobDetailView.as_view(), name='job-detail'),
+    
+    # Operations
+    path('cache/stats/', views.CacheStatsView.as_view(), name='cache-stats'),
 ]
@@ -1,7 +1,17 @@
 """
 Utility functions for CSV parsing and PDF generation.
 """
+import codecs
+import csv
+import heapq
 import io
+import os
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from importlib.util import find_spec
+
+import numpy as np
 import pandas as pd
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
@@ -11,83 +21,348 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.graphics.shapes import Drawing
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics.charts.barcharts import VerticalBarChart
-from django.db.models import Avg, Min, Max, Count
+from django.conf import settings
+
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+# Maps CSV header names to Equipment field names.
+COLUMN_FIELDS = {
+    'Equipment Name': 'name',
+    'Type': 'type',
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+
+TEXT_COLUMNS = ['Equipment Name', 'Type']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+
+class CSVFormatError(ValueError):
+    """Raised when an uploaded CSV cannot be parsed into equipment rows."""
+
+
+# A validated chunk: ``rows`` holds the accepted, cleaned rows; ``rejected``
+# the raw values of refused rows with their 0-based ``row`` position in the
+# chunk and a ``reason``; ``size`` the number of raw rows read; ``source``
+# the ZIP member the rows came from ('' for any other file).
+ValidatedChunk = namedtuple('ValidatedChunk', ['rows', 'rejected', 'size', 'source'], defaults=[''])
 
+REJECTED_COLUMNS = ['row', 'reason'] + REQUIRED_COLUMNS
 
-def parse_csv(file):
+
+@lru_cache(maxsize=None)
+def equipment_type_lookup():
+    """Map lower-cased type codes and labels to Equipment type codes."""
+    from .models import Equipment
+    
+    lookup = {}
+    for code, label in Equipment.EQUIPMENT_TYPES:
+        lookup[code.lower()] = code
+        lookup[label.lower()] = code
+    return lookup
+
+
+def to_float(values):
+    """Convert a column to float64, raising on the first unparseable value."""
+    if getattr(values.dtype, 'storage', None) == 'pyarrow':
+        # Arrow's string cast is several times faster than numpy's
+        values = values.astype('float64[pyarrow]')
+    return values.astype('float64')
+
+
+def validate_chunk(df):
     """
-    Parse uploaded CSV file and return equipment data as list of dicts.
+    Validate and normalize a raw CSV chunk using column-wise operations.
+    
+    Each check builds a boolean mask over the whole chunk: required values
+    must be present, Type must name one of Equipment.EQUIPMENT_TYPES (code
+    or label, any case), numeric columns must parse as finite numbers within
+    settings.EQUIPMENT_VALUE_RANGES. Rows failing any check are rejected
+    with every reason that applies; the rest are accepted.
     
     Args:
-        file: File-like object containing CSV data
+        df: DataFrame with the original CSV header names
         
     Returns:
-        tuple: (list of equipment dicts, error message or None)
-    """
-    try:
-        df = pd.read_csv(file)
-        
-        # Validate required columns
-        required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            return None, f"Missing columns: {', '.join(missing_columns)}"
-        
-        # Clean and validate data
-        df = df.dropna(subset=required_columns)
-        
-        equipment_list = []
-        for _, row in df.iterrows():
-            equipment_list.append({
-                'name': str(row['Equipment Name']).strip(),
-                'type': str(row['Type']).strip(),
-                'flowrate': float(row['Flowrate']),
-                'pressure': float(row['Pressure']),
-                'temperature': float(row['Temperature']),
-            })
+        ValidatedChunk: Accepted rows with columns named after Equipment
+        fields (text trimmed, types canonical, numbers as float), and the
+        rejected rows
         
-        return equipment_list, None
+    Raises:
+        CSVFormatError: If required columns are missing
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise CSVFormatError(f"Missing columns: {', '.join(missing_columns)}")
+    
+    df = df[REQUIRED_COLUMNS]
+    reasons = pd.Series('', index=df.index, dtype=object)
+    bad = np.zeros(len(df), dtype=bool)
+    
+    def reject(mask, message):
+        # Messages are only built for the (usually few) failing rows
+        if mask.any():
+            reasons[mask] = reasons[mask] + '; ' + message(mask)
+            bad[mask] = True
+    
+    cleaned = pd.DataFrame(index=df.index)
+    for col in TEXT_COLUMNS:
+        text = df[col].astype('string').str.strip()
+        missing = (text.isna() | (text == '')).to_numpy()
+        reject(missing, lambda mask: f'missing {col}')
+        cleaned[COLUMN_FIELDS[col]] = text
+    
+    types = cleaned['type'].str.lower().map(equipment_type_lookup())
+    reject(
+        (types.isna() & cleaned['type'].fillna('').ne('')).to_numpy(),
+        lambda mask: "unknown Type '" + cleaned['type'][mask] + "'"
+    )
+    cleaned['type'] = types
+    
+    for col in NUMERIC_COLUMNS:
+        field = COLUMN_FIELDS[col]
+        raw = df[col]
+        try:
+            # Fast path: the whole column converts cleanly
+            values = to_float(raw)
+        except (TypeError, ValueError):
+            values = pd.to_numeric(raw, errors='coerce').astype('float64')
+        missing = raw.isna().to_numpy()
+        invalid = ~missing & ~np.isfinite(values.to_numpy())
+        reject(missing, lambda mask: f'missing {col}')
+        reject(invalid, lambda mask: f"invalid {col} '" + raw[mask].astype('string') + "'")
         
-    except Exception as e:
-        return None, str(e)
+        low, high = settings.EQUIPMENT_VALUE_RANGES.get(field, (None, None))
+        if low is not None:
+            reject(
+                (values < low).to_numpy(),
+                lambda mask: f'{col} ' + values[mask].astype(str) + f' below minimum {low:g}'
+            )
+        if high is not None:
+            reject(
+                (values > high).to_numpy(),
+                lambda mask: f'{col} ' + values[mask].astype(str) + f' above maximum {high:g}'
+            )
+        cleaned[field] = values
+    
+    rejected = df[bad].astype('string')
+    rejected.insert(0, 'reason', reasons[bad].str[2:])
+    rejected.insert(0, 'row', np.flatnonzero(bad))
+    
+    return ValidatedChunk(cleaned[~bad], rejected.reset_index(drop=True), len(df))
+
+
+# Cells read as missing by every parser backend (pandas' defaults), so all
+# backends drop exactly the same rows.
+NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+]
+NA_VALUE_SET = frozenset(NA_VALUES)
+
+# read_csv options shared by the pandas backend and the parallel parser
+PANDAS_READ_OPTIONS = {
+    'dtype': {col: str for col in REQUIRED_COLUMNS},
+    'usecols': lambda col: col in REQUIRED_COLUMNS,
+    'na_values': NA_VALUES,
+    'keep_default_na': False,
+}
+
+# Bytes pyarrow parses per block (and per thread)
+PYARROW_BLOCK_SIZE = 16 * 1024 * 1024
 
+CSV_BACKENDS = ['pandas', 'pyarrow', 'python']
 
-def calculate_summary(equipment_queryset):
+
+def read_chunks_pandas(file, chunksize):
+    """Raw CSV chunks from the pandas C engine with explicit column dtypes."""
+    yield from pd.read_csv(file, chunksize=chunksize, **PANDAS_READ_OPTIONS)
+
+
+def read_chunks_pyarrow(file, chunksize):
     """
-    Calculate summary statistics for equipment queryset.
+    Raw CSV chunks from pyarrow's multi-threaded streaming CSV reader.
     
-    Args:
-        equipment_queryset: QuerySet of Equipment objects
-        
-    Returns:
-        dict: Summary statistics
+    pyarrow refuses rows whose field count differs from the header's, which
+    the other backends read with the missing fields empty and the extra
+    ones ignored. Such rows are set aside while parsing, read the same way,
+    and put back at their place in the file, so validate_chunk sees the
+    same rows (and rejects the same ones) whichever backend parsed it.
     """
-    stats = equipment_queryset.aggregate(
-        total_count=Count('id'),
-        avg_flowrate=Avg('flowrate'),
-        avg_pressure=Avg('pressure'),
-        avg_temperature=Avg('temperature'),
-        min_flowrate=Min('flowrate'),
-        max_flowrate=Max('flowrate'),
-        min_pressure=Min('pressure'),
-        max_pressure=Max('pressure'),
-        min_temperature=Min('temperature'),
-        max_temperature=Max('temperature'),
+    import pyarrow.csv as pa_csv
+    
+    # (record index, raw text) of the rows set aside, smallest index first
+    set_aside = []
+    lock = threading.Lock()
+    
+    def set_aside_row(row):
+        if row.number is None:
+            # Its place in the file is unknown, so it cannot be put back
+            return 'error'
+        with lock:
+            # Numbered from 1, header included
+            heapq.heappush(set_aside, (row.number - 2, row.text))
+        return 'skip'
+    
+    reader = pa_csv.open_csv(
+        file,
+        read_options=pa_csv.ReadOptions(block_size=PYARROW_BLOCK_SIZE, use_threads=True),
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=set_aside_row),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={col: 'string' for col in REQUIRED_COLUMNS},
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
     )
+    names = reader.schema.names
+    columns = [col for col in REQUIRED_COLUMNS if col in names]
+    positions = [names.index(col) for col in columns]
+    if len(columns) < len(REQUIRED_COLUMNS):
+        # Let validate_chunk report the missing columns
+        yield pd.DataFrame(columns=columns)
+        return
+    
+    def take_set_aside(end):
+        """Pop the rows set aside up to record index ``end`` (growing as they are taken)."""
+        taken = []
+        with lock:
+            while set_aside and set_aside[0][0] <= end + len(taken):
+                taken.append(heapq.heappop(set_aside))
+        return taken
+    
+    def with_set_aside(frame, start, taken):
+        """Put rows set aside back into a frame of the rows from record index ``start``."""
+        records = []
+        for _, text in taken:
+            fields = next(csv.reader([text]), [])
+            values = [fields[pos] if pos < len(fields) else '' for pos in positions]
+            records.append([None if value in NA_VALUE_SET else value for value in values])
+        slots = [index - start for index, _ in taken]
+        frame.index = np.setdiff1d(np.arange(len(frame) + len(taken)), slots)
+        restored = pd.DataFrame(records, columns=columns, index=slots)
+        return pd.concat([frame, restored]).sort_index().reset_index(drop=True)
+    
+    position = 0
+    for batch in reader:
+        taken = take_set_aside(position + batch.num_rows)
+        if not taken:
+            for offset in range(0, batch.num_rows, chunksize):
+                yield batch.slice(offset, chunksize).select(columns).to_pandas()
+            position += batch.num_rows
+            continue
+        
+        frame = with_set_aside(batch.select(columns).to_pandas(), position, taken)
+        for offset in range(0, len(frame), chunksize):
+            yield frame.iloc[offset:offset + chunksize]
+        position += len(frame)
+    
+    # Rows set aside after the last batch
+    taken = take_set_aside(float('inf'))
+    if taken:
+        yield with_set_aside(pd.DataFrame(columns=columns), position, taken)
+
+
+def read_chunks_python(file, chunksize):
+    """Raw CSV chunks from the standard library csv module (no native parser)."""
+    sample = file.read(0)
+    # utf-8-sig drops a byte order mark, as the native parsers do
+    lines = codecs.iterdecode(file, 'utf-8-sig') if isinstance(sample, bytes) else file
+    reader = csv.reader(lines)
+    
+    header = next(reader, None)
+    if header is None:
+        raise CSVFormatError('No columns to parse from file')
+    if header[0].startswith('\ufeff'):
+        # Text streams decoded without utf-8-sig keep it
+        header[0] = header[0][1:]
+    positions = {col: header.index(col) for col in REQUIRED_COLUMNS if col in header}
     
-    # Calculate type distribution
-    type_counts = equipment_queryset.values('type').annotate(count=Count('id'))
-    type_distribution = {item['type']: item['count'] for item in type_counts}
+    def to_frame(rows):
+        data = {}
+        for col, pos in positions.items():
+            values = [row[pos] if pos < len(row) else '' for row in rows]
+            data[col] = [None if value in NA_VALUE_SET else value for value in values]
+        return pd.DataFrame(data, columns=list(positions))
     
-    # Handle None values for empty querysets
-    for key in stats:
-        if stats[key] is None:
-            stats[key] = 0 if 'count' in key else 0.0
+    rows = []
+    for row in reader:
+        if row:
+            rows.append(row)
+        if len(rows) >= chunksize:
+            yield to_frame(rows)
+            rows = []
+    yield to_frame(rows)
+
+
+def file_size(file):
+    """Best-effort size in bytes of an uploaded or opened file, or None."""
+    size = getattr(file, 'size', None)
+    if size is None:
+        try:
+            size = os.fstat(file.fileno()).st_size
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+    return size
+
+
+def select_csv_backend(file, backend=None):
+    """
+    Pick the parser backend for a file.
+    
+    Uses ``backend`` or settings.CSV_PARSER_BACKEND; ``auto`` chooses pyarrow
+    for files of at least settings.CSV_PYARROW_MIN_BYTES when it is
+    installed, and the pandas C engine otherwise.
+    """
+    backend = backend or settings.CSV_PARSER_BACKEND
+    if backend != 'auto':
+        if backend not in CSV_BACKENDS:
+            raise ValueError(f'Unknown CSV parser backend: {backend}')
+        return backend
+    
+    size = file_size(file)
+    if size is not None and size >= settings.CSV_PYARROW_MIN_BYTES and find_spec('pyarrow'):
+        return 'pyarrow'
+    return 'pandas'
+
+
+def iter_csv_chunks(file, chunksize=None, backend=None):
+    """
+    Stream a CSV file as validated chunks of at most ``chunksize`` rows.
     
-    stats['type_distribution'] = type_distribution
+    Every backend feeds validate_chunk, so the output does not depend on which
+    one parsed the file.
     
-    return stats
+    Args:
+        file: File-like object containing CSV data
+        chunksize: Rows per chunk, defaults to settings.CSV_CHUNK_SIZE
+        backend: 'pandas', 'pyarrow', 'python' or 'auto', defaults to
+            settings.CSV_PARSER_BACKEND
+        
+    Yields:
+        ValidatedChunk: Accepted and rejected rows (see validate_chunk)
+        
+    Raises:
+        CSVFormatError: If the file is malformed or lacks required columns
+    """
+    chunksize = chunksize or settings.CSV_CHUNK_SIZE
+    read_chunks = {
+        'pandas': read_chunks_pandas,
+        'pyarrow': read_chunks_pyarrow,
+        'python': read_chunks_python,
+    }[select_csv_backend(file, backend)]
+    
+    try:
+        for chunk in read_chunks(file, chunksize):
+            yield validate_chunk(chunk)
+    except CSVFormatError:
+        raise
+    except (ValueError, csv.Error) as e:
+        # Covers pandas ParserError/EmptyDataError, pyarrow ArrowInvalid
+        # and undecodable bytes.
+        raise CSVFormatError(str(e)) from e
 
 
 def generate_pdf_report(equipment_queryset, summary, filename="report.pdf"):
@@ -163,12 +438,18 @@ def generate_pdf_report(equipment_queryset, summary, filename="report.pdf"):
     # Type Distribution
     elements.append(Paragraph("Equipment Type Distribution", heading_style))
     
-    type_data = [['Equipment Type', 'Count']]
+    # Per-type averages come from the precomputed breakdown when present
+    breakdown = summary.get('type_breakdown', {})
+    type_data = [['Equipment Type', 'Count', 'Avg Flowrate', 'Avg Pressure', 'Avg Temp (°C)']]
     for eq_type, count in summary['type_distribution'].items():
-        type_data.append([eq_type, str(count)])
+        averages = breakdown.get(eq_type)
+        type_data.append([eq_type, str(count)] + (
+            [f"{averages[f'avg_{COLUMN_FIELDS[col]}']:.2f}" for col in NUMERIC_COLUMNS]
+            if averages else ['-'] * len(NUMERIC_COLUMNS)
+        ))
     
     if len(type_data) > 1:
-        type_table = Table(type_data, colWidths=[200, 100])
+        type_table = Table(type_data, colWidths=[100, 60, 80, 80, 80])
         type_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#38a169')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -4,18 +4,45 @@ API Views for Chemical Equipment Analysis.
 from rest_framework import viewsets, status, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.http import HttpResponse
-from .models import Equipment, Upload
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from . import exports
+from .charts import chart_data
+from .conditional import (
+    conditional_response, is_settled, make_etag, not_modified, set_validators, upload_validators,
+    upload_version
+)
+from .chunked import ChunkError, assemble, discard, missing_chunks, store_chunk
+from .models import Equipment, IngestJob, Upload, UploadSession, UploadSummary
+from .pagination import EquipmentCursorPagination
+from .parsers import OctetStreamParser
+from .readers import UNSUPPORTED_FILE_MESSAGE, is_supported_upload
+from .renderers import ColumnarJSONRenderer
+from .responsecache import cache_stats, get_cache, invalidate_user
+from .retention import enforce_retention, keep_count_for
+from .sqlite import serialized_writes
 from .serializers import (
     UserSerializer, EquipmentSerializer, UploadSerializer,
-    UploadDetailSerializer, SummarySerializer
+    UploadDetailSerializer, SummarySerializer, IngestJobSerializer,
+    UploadSessionSerializer, equipment_columns
+)
+from .ingest import (
+    append_csv, create_duplicate_upload, find_duplicate_upload, ingest_csv, rejected_sample
 )
-from .utils import parse_csv, calculate_summary, generate_pdf_report
+from .jobs import enqueue_ingest
+from .uploadhandlers import ContentHashUploadHandler
+from .utils import CSVFormatError, generate_pdf_report
 
 
 class RegisterView(generics.CreateAPIView):
@@ -64,11 +91,90 @@ class LoginView(APIView):
         )
 
 
+def is_truthy(value):
+    """Interpret a query/form parameter as a boolean flag."""
+    return str(value).lower() in ('true', '1', 'yes')
+
+
+def bounded_int(value, default, maximum):
+    """Parse a positive integer query parameter, clamped to ``maximum``."""
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_requested_upload(request, with_summary=False):
+    """
+    Resolve the upload a data request refers to.
+    
+    Returns the user's upload named by ``?upload_id=``, or their latest ready
+    upload when none is given; None if there is no such upload. With
+    ``with_summary`` its stored summary is fetched in the same query.
+    """
+    uploads = Upload.objects.filter(user=request.user).exclude(status=Upload.STATUS_RETIRED)
+    if with_summary:
+        uploads = uploads.select_related('summary', 'data_source__summary')
+    upload_id = request.query_params.get('upload_id')
+    
+    if upload_id:
+        return uploads.filter(id=upload_id).first()
+    return uploads.filter(status=Upload.STATUS_READY).first()
+
+
+def recent_uploads(user):
+    """
+    A user's uploads as listed in their history, newest first: as many as
+    retention keeps for them (see keep_count_for).
+    """
+    return Upload.objects.filter(user=user).exclude(status=Upload.STATUS_RETIRED)[:keep_count_for(user)]
+
+
+def equipment_for(upload):
+    """Equipment rows of an upload (following deduplication), or none."""
+    if upload is None:
+        return Equipment.objects.none()
+    return upload.data_equipment
+
+
+def record_duplicate(user, filename, source):
+    """Create an upload sharing ``source``'s rows and apply retention."""
+    with serialized_writes(), transaction.atomic():
+        upload = create_duplicate_upload(user, filename, source)
+        enforce_retention(user)
+        invalidate_user(user.id)
+    return upload
+
+
+def duplicate_response(upload):
+    """201 response for an upload that was satisfied by deduplication."""
+    return Response({
+        'message': 'Upload successful (identical to an earlier upload)',
+        'upload': UploadSerializer(upload).data,
+        'equipment_count': upload.record_count,
+        'deduplicated': True
+    }, status=status.HTTP_201_CREATED)
+
+
 class CSVUploadView(APIView):
-    """Handle CSV file uploads."""
+    """
+    Handle CSV file uploads.
+    
+    Ingests synchronously by default. With ``async=true`` (or
+    settings.INGEST_ASYNC) the file is stored and queued, and the response
+    carries a job id to poll via /jobs/<id>/.
+    
+    Files are fingerprinted while they stream in; content identical to an
+    earlier upload is not parsed again but shares the existing rows.
+    """
     parser_classes = [MultiPartParser, FormParser]
     permission_classes = [IsAuthenticated]
     
+    def initial(self, request, *args, **kwargs):
+        # Must be installed before anything reads the multipart body
+        request.upload_handlers.insert(0, ContentHashUploadHandler(request._request))
+        super().initial(request, *args, **kwargs)
+    
     def post(self, request):
         file = request.FILES.get('file')
         
@@ -78,78 +184,353 @@ class CSVUploadView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if not file.name.endswith('.csv'):
+        if not is_supported_upload(file.name):
             return Response(
-                {'error': 'File must be a CSV'},
+                {'error': UNSUPPORTED_FILE_MESSAGE},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Parse CSV
-        equipment_list, error = parse_csv(file)
+        content_hash = getattr(request, 'upload_content_hashes', {}).get('file', '')
+        source = find_duplicate_upload(request.user, content_hash)
+        if source:
+            return duplicate_response(record_duplicate(request.user, file.name, source))
+        
+        run_async = is_truthy(request.data.get(
+            'async', request.query_params.get('async', settings.INGEST_ASYNC)
+        ))
+        if run_async:
+            with serialized_writes(), transaction.atomic():
+                upload = Upload.objects.create(
+                    filename=file.name,
+                    user=request.user,
+                    content_hash=content_hash,
+                    status=Upload.STATUS_PENDING
+                )
+                job = enqueue_ingest(upload, file)
+                invalidate_user(request.user.id)
+            
+            return Response({
+                'message': 'Upload queued for processing',
+                'upload': UploadSerializer(upload).data,
+                'job': IngestJobSerializer(job).data
+            }, status=status.HTTP_202_ACCEPTED)
         
-        if error:
+        # Stream the CSV into the database chunk by chunk; a failure at any
+        # point rolls back the upload record and every inserted row.
+        try:
+            with serialized_writes(), transaction.atomic():
+                upload = Upload.objects.create(
+                    filename=file.name,
+                    user=request.user,
+                    content_hash=content_hash
+                )
+                record_count = ingest_csv(upload, file)
+                
+                if not record_count:
+                    transaction.set_rollback(True)
+                    rejected = rejected_sample(upload)
+                    if upload.rejects_file:
+                        default_storage.delete(upload.rejects_file)
+                    return Response(
+                        {
+                            'error': 'CSV file contains no valid data',
+                            'rejected_count': upload.rejected_count,
+                            'rejected_sample': rejected
+                        },
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                
+                upload.record_count = record_count
+                upload.save(update_fields=['record_count'])
+                
+                # Drop uploads beyond the user's retention window
+                enforce_retention(request.user)
+                invalidate_user(request.user.id)
+        except CSVFormatError as e:
             return Response(
-                {'error': f'Failed to parse CSV: {error}'},
+                {'error': f'Failed to parse CSV: {e}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if not equipment_list:
+        return Response({
+            'message': 'Upload successful',
+            'upload': UploadSerializer(upload).data,
+            'equipment_count': record_count,
+            'rejected_count': upload.rejected_count
+        }, status=status.HTTP_201_CREATED)
+
+
+class UploadAppendView(APIView):
+    """
+    Append the rows of another file to an existing upload.
+    
+    Only the new rows are parsed, inserted and merged into the upload's
+    stored summary; rows already stored are not touched.
+    """
+    parser_classes = [MultiPartParser, FormParser]
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        file = request.FILES.get('file')
+        
+        if not file:
             return Response(
-                {'error': 'CSV file contains no valid data'},
+                {'error': 'No file provided'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Create upload record
-        upload = Upload.objects.create(
-            filename=file.name,
-            user=request.user,
-            record_count=len(equipment_list)
-        )
-        
-        # Create equipment records
-        equipment_objects = [
-            Equipment(
-                name=eq['name'],
-                type=eq['type'],
-                flowrate=eq['flowrate'],
-                pressure=eq['pressure'],
-                temperature=eq['temperature'],
-                upload=upload
+        if not is_supported_upload(file.name):
+            return Response(
+                {'error': UNSUPPORTED_FILE_MESSAGE},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            for eq in equipment_list
-        ]
-        Equipment.objects.bulk_create(equipment_objects)
         
-        # Cleanup old uploads (keep only last 5)
-        Upload.cleanup_old_uploads(request.user, keep_count=5)
+        try:
+            with serialized_writes(), transaction.atomic():
+                # Lock the upload so concurrent appends apply one at a time
+                upload = get_object_or_404(
+                    Upload.objects.select_for_update().filter(user=request.user).exclude(
+                        status=Upload.STATUS_RETIRED
+                    ),
+                    pk=pk
+                )
+                
+                if upload.status != Upload.STATUS_READY:
+                    return Response(
+                        {'error': f'Cannot append to an upload that is {upload.status}'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                if upload.data_source_id or upload.duplicates.exists():
+                    return Response(
+                        {'error': 'Cannot append to an upload that shares its data with another upload'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                
+                appended = append_csv(upload, file)
+                
+                if not appended:
+                    transaction.set_rollback(True)
+                    rejected = rejected_sample(upload)
+                    if upload.rejects_file:
+                        default_storage.delete(upload.rejects_file)
+                    return Response(
+                        {
+                            'error': 'CSV file contains no valid data',
+                            'rejected_count': upload.rejected_count,
+                            'rejected_sample': rejected
+                        },
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                invalidate_user(request.user.id)
+        except CSVFormatError as e:
+            return Response(
+                {'error': f'Failed to parse CSV: {e}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return Response({
-            'message': 'Upload successful',
+            'message': 'Append successful',
             'upload': UploadSerializer(upload).data,
-            'equipment_count': len(equipment_list)
-        }, status=status.HTTP_201_CREATED)
+            'appended_count': appended,
+            'rejected_count': upload.rejected_count
+        })
 
 
-class EquipmentListView(generics.ListAPIView):
-    """List equipment data for current user's latest upload."""
-    serializer_class = EquipmentSerializer
+class UploadSessionCreateView(generics.CreateAPIView):
+    """Start a resumable upload; the file is then sent as numbered chunks."""
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+class UploadSessionDetailView(generics.RetrieveAPIView):
+    """Report which chunks of a resumable upload have been received."""
+    serializer_class = UploadSessionSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        upload_id = self.request.query_params.get('upload_id')
+        return UploadSession.objects.filter(user=self.request.user)
+
+
+class UploadChunkView(APIView):
+    """
+    Receive one chunk of a resumable upload.
+    
+    The body is the raw chunk bytes and the ``X-Chunk-Checksum`` header its
+    hex SHA-256. Chunks may be sent in any order and re-sent safely.
+    """
+    parser_classes = [OctetStreamParser]
+    permission_classes = [IsAuthenticated]
+    
+    def put(self, request, pk, index):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
         
-        if upload_id:
-            return Equipment.objects.filter(
-                upload_id=upload_id,
-                upload__user=self.request.user
+        if session.upload_id:
+            return Response(
+                {'error': 'Upload session already finalized'},
+                status=status.HTTP_409_CONFLICT
             )
         
-        # Get latest upload for user
-        latest_upload = Upload.objects.filter(user=self.request.user).first()
-        if latest_upload:
-            return Equipment.objects.filter(upload=latest_upload)
+        try:
+            store_chunk(session, index, request.data, request.headers.get('X-Chunk-Checksum'))
+        except ChunkError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Equipment.objects.none()
+        return Response({'index': index, 'received': True})
+
+
+class UploadSessionFinalizeView(APIView):
+    """Assemble a fully received upload session and queue it for ingestion."""
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        
+        # Finalizing twice (e.g. after a lost response) returns the same result
+        if session.upload_id:
+            upload = session.upload
+            if upload.data_source_id:
+                return duplicate_response(upload)
+            return Response({
+                'message': 'Upload queued for processing',
+                'upload': UploadSerializer(upload).data,
+                'job': IngestJobSerializer(upload.job).data
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        missing = missing_chunks(session)
+        if missing:
+            return Response(
+                {'error': 'Upload is incomplete', 'missing_chunks': missing},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        assembled = assemble(session)
+        try:
+            source = find_duplicate_upload(request.user, assembled.content_hash)
+            if source:
+                with serialized_writes(), transaction.atomic():
+                    upload = record_duplicate(request.user, session.filename, source)
+                    session.upload = upload
+                    session.save(update_fields=['upload'])
+                discard(session)
+                return duplicate_response(upload)
+            
+            with serialized_writes(), transaction.atomic():
+                upload = Upload.objects.create(
+                    filename=session.filename,
+                    user=request.user,
+                    content_hash=assembled.content_hash,
+                    status=Upload.STATUS_PENDING
+                )
+                job = enqueue_ingest(upload, assembled)
+                session.upload = upload
+                session.save(update_fields=['upload'])
+                invalidate_user(request.user.id)
+        finally:
+            assembled.close()
+        
+        discard(session)
+        
+        return Response({
+            'message': 'Upload queued for processing',
+            'upload': UploadSerializer(upload).data,
+            'job': IngestJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+# Numeric fields /data/ accepts min_<field> and max_<field> bounds for
+EQUIPMENT_RANGE_FIELDS = ['flowrate', 'pressure', 'temperature']
+
+
+def filter_equipment(queryset, params):
+    """
+    Apply the /data/ filters to an equipment queryset.
+    
+    Supports ``type`` (comma-separated), ``name`` (case-insensitive
+    substring), ``name_prefix`` (case-sensitive, an index range) and
+    ``min_``/``max_`` bounds on flowrate, pressure and temperature.
+    
+    Raises:
+        ValidationError: If a numeric bound is not a number
+    """
+    types = params.get('type')
+    if types:
+        queryset = queryset.filter(type__in=[t for t in types.split(',') if t])
+    
+    name = params.get('name')
+    if name:
+        queryset = queryset.filter(name__icontains=name)
+    
+    prefix = params.get('name_prefix')
+    if prefix:
+        # A range rather than LIKE so the (upload, name) index applies
+        queryset = queryset.filter(name__gte=prefix, name__lt=prefix + '\U0010ffff')
+    
+    for field in EQUIPMENT_RANGE_FIELDS:
+        for bound, lookup in (('min', 'gte'), ('max', 'lte')):
+            param = f'{bound}_{field}'
+            value = params.get(param)
+            if value is None or value == '':
+                continue
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValidationError({param: 'Must be a number'})
+            queryset = queryset.filter(**{f'{field}__{lookup}': value})
+    return queryset
+
+
+def equipment_page(paginator, queryset, request, view, base_url=None):
+    """
+    One page of equipment rows: {next, previous, results}, or with
+    ``?format=columns`` {next, previous, columns, dictionaries} read as
+    plain tuples, without model instances or per-row serializers.
+    
+    ``base_url`` replaces the request URL the next/previous links are
+    built on.
+    """
+    columnar = request.accepted_renderer.format == ColumnarJSONRenderer.format
+    if columnar:
+        paginator.row_fields = EquipmentSerializer.Meta.fields
+        queryset = queryset.values_list(*paginator.row_fields)
+    rows = paginator.paginate_queryset(queryset, request, view=view)
+    if base_url:
+        paginator.base_url = base_url
+    
+    if columnar:
+        body = equipment_columns(rows)
+    else:
+        body = {'results': EquipmentSerializer(rows, many=True).data}
+    return {'next': paginator.get_next_link(), 'previous': paginator.get_previous_link(), **body}
+
+
+class EquipmentListView(generics.ListAPIView):
+    """
+    List equipment data for current user's latest upload, a page at a time.
+    
+    Pages are ordered by name and fetched with keyset cursors (see
+    EquipmentCursorPagination); filters are described in filter_equipment.
+    ``?format=columns`` returns each page as one array per field (see
+    equipment_columns).
+    """
+    serializer_class = EquipmentSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = EquipmentCursorPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
+    
+    def list(self, request, *args, **kwargs):
+        self.upload = get_requested_upload(request, with_summary=True)
+        if request.accepted_renderer.format == ColumnarJSONRenderer.format:
+            build = lambda: Response(equipment_page(self.paginator, self.get_queryset(), request, self))
+        else:
+            build = lambda: super(EquipmentListView, self).list(request, *args, **kwargs)
+        return conditional_response(request, build, *upload_validators(request, self.upload))
+    
+    def get_queryset(self):
+        queryset = equipment_for(self.upload)
+        return filter_equipment(queryset, self.request.query_params)
 
 
 class SummaryView(APIView):
@@ -157,32 +538,146 @@ class SummaryView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        upload_id = request.query_params.get('upload_id')
+        upload = get_requested_upload(request, with_summary=True)
+        return conditional_response(
+            request, lambda: self.summary_response(upload), *upload_validators(request, upload)
+        )
+    
+    def summary_response(self, upload):
+        if upload is None:
+            summary = UploadSummary().as_dict()
+        else:
+            # Precomputed at ingest, so no scan of the rows
+            summary = UploadSummary.for_upload(upload).as_dict()
+        serializer = SummarySerializer(summary)
+        return Response(serializer.data)
+
+
+class ChartDataView(APIView):
+    """
+    Return chart aggregates for an upload: type distribution, top equipment
+    by flowrate, histograms of the numeric fields and a row sample.
+    
+    Query params ``top``, ``bins`` and ``points`` size each part.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        upload = get_requested_upload(request, with_summary=True)
         
-        if upload_id:
-            queryset = Equipment.objects.filter(
-                upload_id=upload_id,
-                upload__user=request.user
+        if upload is None:
+            return Response(
+                {'error': 'No data available for charts'},
+                status=status.HTTP_404_NOT_FOUND
             )
+        
+        params = request.query_params
+        return conditional_response(request, lambda: Response(chart_data(
+            upload,
+            top=bounded_int(params.get('top'), 10, 100),
+            bins=bounded_int(params.get('bins'), 20, 200),
+            points=bounded_int(params.get('points'), 50, 1000)
+        )), *upload_validators(request, upload))
+
+
+class DashboardView(APIView):
+    """
+    Everything the dashboard shows, in one response: the first page of
+    equipment data, the summary and the upload history.
+    
+    The upload is resolved once, from the history rows when it is among
+    them, so the whole response costs the history query (with summaries
+    joined) and one equipment page; an older upload costs one more.
+    Accepts the ``upload_id``, filter, ``page_size`` and ``ordering``
+    params of /data/, including ``format=columns``; the ``next`` link
+    continues on /data/, pinned to the upload shown. The ETag covers the
+    history and the upload shown, so an unchanged dashboard is answered
+    with a 304 before any equipment query.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
+    
+    def get(self, request):
+        history = list(recent_uploads(request.user).select_related('summary', 'data_source__summary'))
+        upload_id = request.query_params.get('upload_id')
+        if upload_id:
+            upload = next((u for u in history if str(u.id) == upload_id), None)
         else:
-            latest_upload = Upload.objects.filter(user=request.user).first()
-            if latest_upload:
-                queryset = Equipment.objects.filter(upload=latest_upload)
-            else:
-                queryset = Equipment.objects.none()
+            upload = next((u for u in history if u.status == Upload.STATUS_READY), None)
+        if upload is None and (upload_id or history):
+            # Not among the recent uploads (or no ready one is)
+            upload = get_requested_upload(request, with_summary=True)
         
-        summary = calculate_summary(queryset)
-        serializer = SummarySerializer(summary)
-        return Response(serializer.data)
+        etag = None
+        if is_settled(upload):
+            etag = make_etag(request, *map(upload_version, history), upload_version(upload))
+        return conditional_response(request, lambda: self.dashboard_response(upload, history), etag)
+    
+    def dashboard_response(self, upload, history):
+        request = self.request
+        params = request.query_params.copy()
+        if upload is not None:
+            params['upload_id'] = upload.id
+        data = equipment_page(
+            EquipmentCursorPagination(),
+            filter_equipment(equipment_for(upload), request.query_params),
+            request, self,
+            base_url=request.build_absolute_uri(f"{reverse('equipment-list')}?{params.urlencode()}")
+        )
+        
+        if upload is None:
+            summary = UploadSummary().as_dict()
+        else:
+            summary = UploadSummary.for_upload(upload).as_dict()
+        
+        return Response({
+            'upload': UploadSerializer(upload).data if upload else None,
+            'data': data,
+            'summary': SummarySerializer(summary).data,
+            'history': UploadSerializer(history, many=True).data,
+        })
 
 
 class UploadHistoryView(generics.ListAPIView):
-    """List upload history (last 5 uploads)."""
+    """List upload history (the uploads retention keeps for the user)."""
     serializer_class = UploadSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Upload.objects.filter(user=self.request.user)[:5]
+        return recent_uploads(self.request.user)
+    
+    def list(self, request, *args, **kwargs):
+        history = list(self.get_queryset())
+        etag = make_etag(request, *(
+            (upload.id, upload.status, upload.record_count, upload.rejected_count) for upload in history
+        ))
+        return conditional_response(
+            request, lambda: Response(self.get_serializer(history, many=True).data), etag
+        )
+
+
+class IngestJobListView(generics.ListAPIView):
+    """List the current user's background ingestion jobs."""
+    serializer_class = IngestJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        # A job is created with its upload, so upload recency orders jobs
+        # too and lets the (user, -uploaded_at) index drive the query.
+        return IngestJob.objects.filter(
+            upload__user=self.request.user
+        ).select_related('upload').order_by('-upload__uploaded_at')[:20]
+
+
+class IngestJobDetailView(generics.RetrieveAPIView):
+    """Report state, row count and errors of one ingestion job."""
+    serializer_class = IngestJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return IngestJob.objects.filter(
+            upload__user=self.request.user
+        ).select_related('upload')
 
 
 class UploadDetailView(generics.RetrieveAPIView):
@@ -191,7 +686,9 @@ class UploadDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Upload.objects.filter(user=self.request.user)
+        return Upload.objects.filter(user=self.request.user).exclude(
+            status=Upload.STATUS_RETIRED
+        )
 
 
 class PDFReportView(APIView):
@@ -199,32 +696,151 @@ class PDFReportView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
-        upload_id = request.query_params.get('upload_id')
+        upload = get_requested_upload(request, with_summary=True)
         
-        if upload_id:
-            queryset = Equipment.objects.filter(
-                upload_id=upload_id,
-                upload__user=request.user
+        if upload is None and not request.query_params.get('upload_id'):
+            return Response(
+                {'error': 'No data available for report'},
+                status=status.HTTP_404_NOT_FOUND
             )
-        else:
-            latest_upload = Upload.objects.filter(user=request.user).first()
-            if latest_upload:
-                queryset = Equipment.objects.filter(upload=latest_upload)
-            else:
-                return Response(
-                    {'error': 'No data available for report'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
         
-        if not queryset.exists():
+        summary = UploadSummary.for_upload(upload).as_dict() if upload else None
+        if not summary or not summary['total_count']:
             return Response(
                 {'error': 'No equipment data found'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        summary = calculate_summary(queryset)
-        pdf_buffer = generate_pdf_report(queryset, summary)
+        return conditional_response(
+            request, lambda: self.report_response(upload, summary), *upload_validators(request, upload)
+        )
+    
+    def report_response(self, upload, summary):
+        pdf_buffer = generate_pdf_report(equipment_for(upload), summary)
         
         response = HttpResponse(pdf_buffer, content_type='application/pdf')
         response['Content-Disposition'] = 'attachment; filename="equipment_report.pdf"'
         return response
+
+
+class ParquetExportView(APIView):
+    """Download an upload's equipment rows as a Parquet file."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        if exports.pq is None:
+            return Response(
+                {'error': 'Parquet export requires pyarrow to be installed'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        
+        upload = get_requested_upload(request)
+        if upload is None:
+            return Response(
+                {'error': 'No data available for export'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        filename = upload.filename.split('.')[0] or 'equipment'
+        return FileResponse(
+            exports.write_parquet(upload),
+            as_attachment=True,
+            filename=f'{filename}.parquet',
+            content_type='application/vnd.apache.parquet'
+        )
+
+
+class StreamingExportView(APIView):
+    """
+    Base view streaming an upload's equipment rows in a text format.
+    
+    The rows go out as they are read, in constant memory; ``?gzip=1``
+    compresses the stream into a ``.gz`` download. An unchanged upload is
+    answered with 304 when the request repeats the export's ETag.
+    """
+    permission_classes = [IsAuthenticated]
+    # Set by subclasses: file extension, content type, and the function
+    # turning an upload into the chunks of the file
+    extension = None
+    content_type = None
+    encode = None
+    
+    def get(self, request):
+        upload = get_requested_upload(request, with_summary=True)
+        if upload is None:
+            return Response(
+                {'error': 'No data available for export'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        etag, last_modified = upload_validators(request, upload)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        
+        filename = f"{upload.filename.split('.')[0] or 'equipment'}.{self.extension}"
+        content = self.encode(upload)
+        content_type = self.content_type
+        if is_truthy(request.query_params.get('gzip')):
+            content = exports.gzip_stream(content)
+            content_type = 'application/gzip'
+            filename += '.gz'
+        
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        if etag is not None:
+            set_validators(response, etag, last_modified)
+        return response
+
+
+class CSVExportView(StreamingExportView):
+    """Stream an upload's equipment rows as CSV (re-uploadable as-is)."""
+    extension = 'csv'
+    content_type = 'text/csv'
+    encode = staticmethod(exports.iter_csv)
+
+
+class NDJSONExportView(StreamingExportView):
+    """Stream an upload's equipment rows as newline-delimited JSON."""
+    extension = 'ndjson'
+    content_type = 'application/x-ndjson'
+    encode = staticmethod(exports.iter_ndjson)
+
+
+class UploadRejectsView(APIView):
+    """Download the rows of an upload that failed validation, with reasons."""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        upload = get_object_or_404(
+            Upload.objects.filter(user=request.user).exclude(status=Upload.STATUS_RETIRED),
+            pk=pk
+        )
+        
+        if not upload.rejects_file or not default_storage.exists(upload.rejects_file):
+            return Response(
+                {'error': 'No rejected rows for this upload'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        filename = upload.filename.split('.')[0] or 'equipment'
+        return FileResponse(
+            default_storage.open(upload.rejects_file, 'rb'),
+            as_attachment=True,
+            filename=f'{filename}_rejected.csv',
+            content_type='text/csv'
+        )
+
+
+class CacheStatsView(APIView):
+    """Response cache hits and misses of the worker serving the request (staff only)."""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        cache = get_cache()
+        return Response({
+            'enabled': settings.RESPONSE_CACHE_ENABLED,
+            'backend': settings.RESPONSE_CACHE_BACKEND,
+            'max_entries': getattr(cache, '_max_entries', None),
+            **cache_stats(),
+        })
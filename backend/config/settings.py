@@ -29,6 +29,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -103,6 +104,7 @@ CORS_ALLOW_HEADERS = [
     'x-csrftoken',
     'x-requested-with',
 ]
+CORS_EXPOSE_HEADERS = ['x-db-queries', 'x-db-time-ms', 'server-timing']
 
 # REST Framework settings
 REST_FRAMEWORK = {
@@ -114,3 +116,177 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
 }
+
+# CSV ingestion
+# Uploads are streamed into the database in chunks of this many rows, so
+# peak memory stays flat regardless of file size.
+CSV_CHUNK_SIZE = int(os.environ.get('CSV_CHUNK_SIZE', '50000'))
+
+# Background ingestion
+# When true, /upload/ queues files for the local worker pool by default
+# instead of ingesting inside the request (clients may pass async=true).
+INGEST_ASYNC = os.environ.get('INGEST_ASYNC', 'False').lower() in ('true', '1', 'yes')
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', '2'))
+# A running job whose worker has not reported progress for this many
+# seconds is presumed dead: run_ingest_worker re-queues it
+INGEST_STALE_AFTER = int(os.environ.get('INGEST_STALE_AFTER', '600'))
+
+# Resumable uploads
+# Default and maximum chunk sizes (bytes) for /upload/sessions/ chunk PUTs.
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', str(4 * 1024 * 1024)))
+# Smaller requested sizes are raised to UPLOAD_MIN_CHUNK_SIZE, so a session
+# never has more than UPLOAD_MAX_SIZE / UPLOAD_MIN_CHUNK_SIZE chunks.
+UPLOAD_MIN_CHUNK_SIZE = int(os.environ.get('UPLOAD_MIN_CHUNK_SIZE', str(256 * 1024)))
+UPLOAD_MAX_CHUNK_SIZE = int(os.environ.get('UPLOAD_MAX_CHUNK_SIZE', str(16 * 1024 * 1024)))
+# Largest file (bytes) a resumable upload session accepts
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', str(2 * 1024 ** 3)))
+
+# Upload deduplication
+# Uploads are fingerprinted by SHA-256; re-uploading identical content
+# shares the existing equipment rows instead of parsing them again.
+UPLOAD_DEDUP_ENABLED = os.environ.get('UPLOAD_DEDUP_ENABLED', 'True').lower() in ('true', '1', 'yes')
+# Also share rows with identical uploads made by other users.
+UPLOAD_DEDUP_ACROSS_USERS = os.environ.get('UPLOAD_DEDUP_ACROSS_USERS', 'False').lower() in ('true', '1', 'yes')
+
+# Parallel CSV parsing
+# Plain CSV files of at least CSV_PARALLEL_MIN_BYTES are split into
+# newline-aligned ranges of about CSV_PARALLEL_RANGE_BYTES and parsed by
+# CSV_PARSE_WORKERS processes. Set CSV_PARSE_WORKERS=1 to disable.
+CSV_PARSE_WORKERS = int(os.environ.get('CSV_PARSE_WORKERS', str(os.cpu_count() or 1)))
+CSV_PARALLEL_MIN_BYTES = int(os.environ.get('CSV_PARALLEL_MIN_BYTES', str(64 * 1024 * 1024)))
+CSV_PARALLEL_RANGE_BYTES = int(os.environ.get('CSV_PARALLEL_RANGE_BYTES', str(32 * 1024 * 1024)))
+
+# Exports
+# Rows fetched from the database (and written) per batch by export endpoints.
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '50000'))
+# Rows encoded per chunk of a streamed CSV/NDJSON export
+EXPORT_STREAM_ROWS = int(os.environ.get('EXPORT_STREAM_ROWS', '5000'))
+
+# CSV parser backend: 'pandas' (C engine), 'pyarrow' (multi-threaded),
+# 'python' (stdlib csv) or 'auto', which uses pyarrow for files of at least
+# CSV_PYARROW_MIN_BYTES when it is installed and pandas otherwise.
+CSV_PARSER_BACKEND = os.environ.get('CSV_PARSER_BACKEND', 'auto')
+CSV_PYARROW_MIN_BYTES = int(os.environ.get('CSV_PYARROW_MIN_BYTES', str(8 * 1024 * 1024)))
+
+# Inclusive (min, max) limits for numeric equipment values, keyed by field;
+# rows outside them are rejected during ingest. None leaves a bound open.
+EQUIPMENT_VALUE_RANGES = {
+    'flowrate': (0.0, None),
+    'pressure': (0.0, None),
+    'temperature': (-273.15, None),
+}
+
+# Rows per executemany call (SQLite) or COPY buffer (PostgreSQL) when
+# loading equipment rows
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', '10000'))
+
+# SQLite tuning applied to every connection (see api/sqlite.py): WAL lets
+# readers run while an upload is written; SQLITE_TUNING=false keeps SQLite
+# defaults. Ingestion writes are serialized across processes with a lock
+# file next to the database (<NAME>.write-lock).
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', 'true').lower() in ('true', '1', 'yes')
+SQLITE_PRAGMAS = {
+    # Only takes effect for new databases; run_maintenance converts old ones
+    'auto_vacuum': 'INCREMENTAL',
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Negative cache_size is in KiB
+    'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', '65536')),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '10000')),
+    'temp_store': 'MEMORY',
+} if SQLITE_TUNING else {}
+SQLITE_SERIALIZE_WRITES = os.environ.get('SQLITE_SERIALIZE_WRITES', 'true').lower() in ('true', '1', 'yes')
+
+# Keep a memory-mapped columnar copy of each upload's data under
+# MEDIA_ROOT/columnar/ for fast summaries and charts
+COLUMNAR_STORE_ENABLED = os.environ.get('COLUMNAR_STORE_ENABLED', 'true').lower() in ('true', '1', 'yes')
+
+# Upload retention
+# Each user keeps their newest UPLOAD_KEEP_COUNT uploads; per-user overrides
+# come from UPLOAD_KEEP_COUNT_BY_USER="alice=20,bob=10". RETENTION_MODE is
+# 'inline' (trim within the upload's transaction) or 'deferred' (trim on the
+# background pool after commit).
+UPLOAD_KEEP_COUNT = int(os.environ.get('UPLOAD_KEEP_COUNT', '5'))
+UPLOAD_KEEP_COUNT_BY_USER = {
+    username.strip(): int(count)
+    for username, count in (
+        item.split('=', 1) for item in os.environ.get('UPLOAD_KEEP_COUNT_BY_USER', '').split(',') if '=' in item
+    )
+}
+RETENTION_MODE = os.environ.get('RETENTION_MODE', 'inline')
+
+# Maintenance (manage.py run_maintenance)
+# Runs start only inside MAINTENANCE_WINDOW ("HH:MM-HH:MM" local time, may
+# wrap midnight; empty allows any time) and while no ingest is running.
+MAINTENANCE_WINDOW = os.environ.get('MAINTENANCE_WINDOW', '02:00-05:00')
+MAINTENANCE_INTERVAL = int(os.environ.get('MAINTENANCE_INTERVAL', '3600'))
+# Free pages released per SQLite incremental VACUUM
+MAINTENANCE_VACUUM_PAGES = int(os.environ.get('MAINTENANCE_VACUUM_PAGES', '10000'))
+# Unreferenced files younger than this (seconds) are left alone
+MAINTENANCE_ORPHAN_GRACE = int(os.environ.get('MAINTENANCE_ORPHAN_GRACE', '3600'))
+# Resumable upload sessions not finalized within this many seconds are discarded
+UPLOAD_SESSION_TTL = int(os.environ.get('UPLOAD_SESSION_TTL', str(24 * 3600)))
+
+# /data/ pagination: rows per page by default and at most (?page_size=)
+DATA_PAGE_SIZE = int(os.environ.get('DATA_PAGE_SIZE', '500'))
+DATA_MAX_PAGE_SIZE = int(os.environ.get('DATA_MAX_PAGE_SIZE', '5000'))
+
+# Query metrics (see api/middleware.py)
+# Every request's SQL query count and database time are logged per endpoint;
+# QUERY_METRICS_HEADERS also returns them as X-DB-Queries / X-DB-Time-Ms.
+QUERY_METRICS_HEADERS = os.environ.get('QUERY_METRICS_HEADERS', str(DEBUG)).lower() in ('true', '1', 'yes')
+# Most queries an endpoint (by URL name) may run per request, token
+# authentication included; checked by the tests in api/tests/test_queries.py
+# and logged as a warning when exceeded.
+QUERY_BUDGETS = {
+    # Including set-based retention deletes once a user is at their keep count
+    'upload': 21,
+    'upload-append': 12,
+    'equipment-list': 3,
+    'summary': 2,
+    'charts': 2,
+    'dashboard': 3,
+    'upload-history': 2,
+    'upload-detail': 3,
+    'upload-rejects': 2,
+    'pdf-report': 3,
+    'export-parquet': 3,
+    'export-csv': 3,
+    'export-ndjson': 3,
+    'job-list': 2,
+    'job-detail': 2,
+}
+
+# Response cache (see api/responsecache.py)
+# Read responses are cached per user and ETag in the 'responses' cache:
+# RESPONSE_CACHE_BACKEND 'locmem' (per process), 'file' (shared by the
+# workers of one host, under RESPONSE_CACHE_LOCATION) or 'redis' (needs the
+# redis package; RESPONSE_CACHE_LOCATION is its URL, and Redis' own
+# maxmemory policy bounds it instead of RESPONSE_CACHE_MAX_ENTRIES).
+RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes')
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'locmem')
+RESPONSE_CACHE_LOCATION = os.environ.get('RESPONSE_CACHE_LOCATION', str(BASE_DIR / 'cache'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '1000'))
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '3600'))
+# Responses larger than this (pickled bytes) are not cached
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRY_BYTES', str(1024 * 1024)))
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': CACHE_BACKENDS[RESPONSE_CACHE_BACKEND],
+        'LOCATION': '' if RESPONSE_CACHE_BACKEND == 'locmem' else RESPONSE_CACHE_LOCATION,
+        'TIMEOUT': RESPONSE_CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': RESPONSE_CACHE_MAX_ENTRIES,
+        } if RESPONSE_CACHE_BACKEND != 'redis' else {},
+    },
+}
@@ -2,11 +2,50 @@
 API Client for PyQt5 Desktop Application.
 Handles all HTTP requests to the Django backend.
 """
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
 import requests
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Callable
 
 API_BASE_URL = 'http://localhost:8000/api'
 
+# Files larger than this are sent with the resumable chunked upload protocol
+RESUMABLE_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+CHUNK_UPLOAD_RETRIES = 5
+JOB_POLL_INTERVAL = 1.0
+# Seconds to wait for a queued ingestion job before giving up on it
+JOB_TIMEOUT = 30 * 60
+# Equipment rows fetched per /data/ page
+DATA_PAGE_SIZE = 1000
+# Responses kept for revalidation with If-None-Match (least recently used go first)
+RESPONSE_CACHE_SIZE = 64
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def rows_from_columns(page: Dict) -> List[Dict]:
+    """Rows of a ``format=columns`` data page, as the dicts of the row format."""
+    columns = dict(page['columns'])
+    types = page['dictionaries']['type']
+    columns['type'] = [types[code] for code in columns['type']]
+    fields = list(columns)
+    return [dict(zip(fields, values)) for values in zip(*columns.values())]
+
+
+def with_rows(page: Dict) -> Dict:
+    """A copy of a columnar data page with its rows decoded into ``results``."""
+    if 'columns' not in page:
+        return page
+    return {'next': page['next'], 'previous': page['previous'], 'results': rows_from_columns(page)}
+
+# Already compressed or binary formats that are sent as-is
+NO_GZIP_EXTENSIONS = ('.gz', '.bz2', '.xz', '.zip', '.parquet', '.arrow', '.feather', '.ipc')
+
 
 class APIClient:
     """HTTP client for backend API communication."""
@@ -15,6 +54,11 @@ class APIClient:
         self.token: Optional[str] = None
         self.user: Optional[Dict] = None
         self.session = requests.Session()
+        # (path, size, mtime) -> server upload session id, so a failed
+        # upload of the same file resumes instead of starting over
+        self._upload_sessions: Dict[Tuple, str] = {}
+        # Full request URL -> (ETag, decoded body) of cacheable GET responses
+        self._response_cache: 'OrderedDict[str, Tuple[str, Any]]' = OrderedDict()
     
     def set_token(self, token: str, user: Dict):
         """Set authentication token."""
@@ -27,6 +71,7 @@ class APIClient:
         self.token = None
         self.user = None
         self.session.headers.pop('Authorization', None)
+        self._response_cache.clear()
     
     def is_authenticated(self) -> bool:
         """Check if user is authenticated."""
@@ -62,52 +107,274 @@ class APIClient:
         except Exception as e:
             return False, {'error': str(e)}
     
-    def upload_csv(self, file_path: str) -> Tuple[bool, Dict]:
-        """Upload a CSV file."""
+    def upload_csv(self, file_path: str, progress: Optional[ProgressCallback] = None,
+                   compress: bool = False) -> Tuple[bool, Dict]:
+        """
+        Upload a CSV file, using resumable chunks for large files.
+        
+        With ``compress`` the file is gzipped to a temporary file first and
+        sent as ``<name>.gz``; the server decompresses it while parsing.
+        """
         try:
-            with open(file_path, 'rb') as f:
-                files = {'file': (file_path.split('/')[-1], f, 'text/csv')}
-                headers = {'Authorization': f'Token {self.token}'}
-                response = requests.post(
-                    f'{API_BASE_URL}/upload/',
-                    files=files,
-                    headers=headers
+            if compress and not file_path.lower().endswith(NO_GZIP_EXTENSIONS):
+                stat = os.stat(file_path)
+                resume_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime, 'gzip')
+                compressed_path = self._gzip_file(file_path)
+                try:
+                    return self._upload_file(
+                        compressed_path, os.path.basename(file_path) + '.gz', progress, resume_key
+                    )
+                finally:
+                    os.remove(compressed_path)
+            
+            return self._upload_file(file_path, os.path.basename(file_path), progress)
+        except Exception as e:
+            return False, {'error': str(e)}
+    
+    def _gzip_file(self, file_path: str) -> str:
+        """Gzip a file into a temporary file, streaming in bounded blocks."""
+        fd, compressed_path = tempfile.mkstemp(suffix='.csv.gz')
+        with os.fdopen(fd, 'wb') as raw, open(file_path, 'rb') as src:
+            # A fixed mtime keeps the output byte-identical between attempts,
+            # so an interrupted resumable upload can continue
+            with gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) as gz:
+                shutil.copyfileobj(src, gz, 1024 * 1024)
+        return compressed_path
+    
+    def _upload_file(self, file_path: str, filename: str, progress: Optional[ProgressCallback] = None,
+                     resume_key: Optional[Tuple] = None) -> Tuple[bool, Dict]:
+        """Send a file to the server under ``filename``."""
+        if os.path.getsize(file_path) > RESUMABLE_UPLOAD_THRESHOLD:
+            return self.upload_csv_resumable(file_path, progress, filename, resume_key)
+        
+        with open(file_path, 'rb') as f:
+            files = {'file': (filename, f, 'text/csv')}
+            headers = {'Authorization': f'Token {self.token}'}
+            response = requests.post(
+                f'{API_BASE_URL}/upload/',
+                files=files,
+                headers=headers
+            )
+        if response.status_code == 201:
+            return True, response.json()
+        return False, response.json()
+    
+    def upload_csv_resumable(self, file_path: str, progress: Optional[ProgressCallback] = None,
+                             filename: Optional[str] = None,
+                             resume_key: Optional[Tuple] = None) -> Tuple[bool, Dict]:
+        """
+        Upload a CSV file as checksummed chunks and wait for ingestion.
+        
+        Chunks the server already has are skipped, so calling this again
+        after a network failure resumes where the previous attempt stopped.
+        """
+        try:
+            stat = os.stat(file_path)
+            key = resume_key or (os.path.abspath(file_path), stat.st_size, stat.st_mtime)
+            
+            session = None
+            if key in self._upload_sessions:
+                response = self.session.get(
+                    f'{API_BASE_URL}/upload/sessions/{self._upload_sessions[key]}/'
                 )
+                if response.status_code == 200:
+                    session = response.json()
+            
+            if session is None:
+                response = self.session.post(
+                    f'{API_BASE_URL}/upload/sessions/',
+                    json={
+                        'filename': filename or os.path.basename(file_path),
+                        'total_size': stat.st_size
+                    }
+                )
+                if response.status_code != 201:
+                    return False, response.json()
+                session = response.json()
+                self._upload_sessions[key] = session['id']
+            
+            if session['upload'] is None:
+                success, error = self._send_chunks(file_path, session, progress)
+                if not success:
+                    return False, {'error': error}
+            
+            response = self.session.post(
+                f'{API_BASE_URL}/upload/sessions/{session["id"]}/finalize/'
+            )
+            if response.status_code not in (201, 202):
+                return False, response.json()
+            
+            self._upload_sessions.pop(key, None)
+            # 201: identical to an earlier upload, nothing left to ingest
             if response.status_code == 201:
                 return True, response.json()
-            return False, response.json()
+            return self.wait_for_job(response.json()['job']['id'])
         except Exception as e:
             return False, {'error': str(e)}
     
-    def get_data(self, upload_id: Optional[int] = None) -> Tuple[bool, Any]:
-        """Get equipment data."""
+    def _send_chunks(self, file_path: str, session: Dict,
+                     progress: Optional[ProgressCallback]) -> Tuple[bool, str]:
+        """PUT every chunk the server is missing, retrying with backoff."""
+        received = set(session['received_chunks'])
+        chunk_size = session['chunk_size']
+        total_size = session['total_size']
+        
+        with open(file_path, 'rb') as f:
+            for index in range(session['total_chunks']):
+                if index not in received:
+                    f.seek(index * chunk_size)
+                    data = f.read(chunk_size)
+                    headers = {
+                        'Content-Type': 'application/octet-stream',
+                        'X-Chunk-Checksum': hashlib.sha256(data).hexdigest(),
+                    }
+                    url = f'{API_BASE_URL}/upload/sessions/{session["id"]}/chunks/{index}/'
+                    
+                    for attempt in range(CHUNK_UPLOAD_RETRIES):
+                        try:
+                            response = self.session.put(url, data=data, headers=headers)
+                            if response.status_code == 200:
+                                break
+                            if response.status_code < 500:
+                                return False, response.json().get('error', 'Chunk rejected')
+                        except requests.RequestException:
+                            pass
+                        time.sleep(2 ** attempt)
+                    else:
+                        return False, 'Upload interrupted by network errors; upload again to resume'
+                
+                if progress:
+                    progress(min((index + 1) * chunk_size, total_size), total_size)
+        
+        return True, ''
+    
+    def get_job(self, job_id: int) -> Tuple[bool, Dict]:
+        """Get background ingestion job status."""
         try:
-            params = {'upload_id': upload_id} if upload_id else {}
-            response = self.session.get(f'{API_BASE_URL}/data/', params=params)
+            response = self.session.get(f'{API_BASE_URL}/jobs/{job_id}/')
             if response.status_code == 200:
                 return True, response.json()
             return False, response.json()
         except Exception as e:
             return False, {'error': str(e)}
     
+    def wait_for_job(self, job_id: int) -> Tuple[bool, Dict]:
+        """Poll an ingestion job until it finishes or JOB_TIMEOUT passes."""
+        deadline = time.monotonic() + JOB_TIMEOUT
+        while True:
+            success, job = self.get_job(job_id)
+            if not success:
+                return False, job
+            if job['status'] == 'succeeded':
+                return True, {
+                    'message': 'Upload successful',
+                    'upload': {'id': job['upload_id'], 'filename': job['filename']},
+                    'equipment_count': job['rows_processed']
+                }
+            if job['status'] == 'failed':
+                return False, {'error': f"Failed to parse CSV: {job['error']}"}
+            if time.monotonic() >= deadline:
+                return False, {'error': (
+                    f"Upload is still {job['status']} after {JOB_TIMEOUT // 60} minutes "
+                    f"({job['rows_processed']} rows processed); check the upload history later"
+                )}
+            time.sleep(JOB_POLL_INTERVAL)
+    
+    def _cached_get(self, url: str, params: Optional[Dict] = None,
+                    binary: bool = False) -> Tuple[int, Any]:
+        """
+        GET a URL, revalidating a cached copy with If-None-Match.
+        
+        A ``304 Not Modified`` is answered from the cache, so an unchanged
+        resource is never downloaded twice. Returns (status code, decoded
+        JSON body, or raw bytes with ``binary``).
+        """
+        url = requests.Request('GET', url, params=params).prepare().url
+        cached = self._response_cache.get(url)
+        headers = {'If-None-Match': cached[0]} if cached else {}
+        response = self.session.get(url, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            self._response_cache.move_to_end(url)
+            return 200, cached[1]
+        
+        body = response.content if binary else response.json()
+        etag = response.headers.get('ETag')
+        if response.status_code == 200 and etag:
+            self._response_cache[url] = (etag, body)
+            self._response_cache.move_to_end(url)
+            while len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        return response.status_code, body
+    
+    def get_data(self, upload_id: Optional[int] = None, page_url: Optional[str] = None,
+                 page_size: int = DATA_PAGE_SIZE, **filters) -> Tuple[bool, Any]:
+        """
+        Get one page of equipment data: {'next', 'previous', 'results'}.
+        
+        Pass a page's ``next`` link as ``page_url`` to fetch the following
+        page; ``filters`` are /data/ query parameters (type, name, min_flowrate...).
+        Pages are transferred in the compact columnar format.
+        """
+        try:
+            if page_url:
+                status_code, body = self._cached_get(page_url)
+            else:
+                params = {'page_size': page_size, 'format': 'columns', **filters}
+                if upload_id:
+                    params['upload_id'] = upload_id
+                status_code, body = self._cached_get(f'{API_BASE_URL}/data/', params)
+            if status_code == 200:
+                return True, with_rows(body)
+            return False, body
+        except Exception as e:
+            return False, {'error': str(e)}
+    
+    def get_dashboard(self, upload_id: Optional[int] = None,
+                      page_size: int = DATA_PAGE_SIZE) -> Tuple[bool, Dict]:
+        """
+        Get the first data page, summary and history in one request:
+        {'upload', 'data', 'summary', 'history'}.
+        
+        ``data['next']`` continues on /data/ and can be passed to get_data().
+        """
+        try:
+            params = {'page_size': page_size, 'format': 'columns'}
+            if upload_id:
+                params['upload_id'] = upload_id
+            status_code, body = self._cached_get(f'{API_BASE_URL}/dashboard/', params)
+            if status_code == 200:
+                return True, {**body, 'data': with_rows(body['data'])}
+            return False, body
+        except Exception as e:
+            return False, {'error': str(e)}
+    
     def get_summary(self, upload_id: Optional[int] = None) -> Tuple[bool, Dict]:
         """Get summary statistics."""
         try:
             params = {'upload_id': upload_id} if upload_id else {}
-            response = self.session.get(f'{API_BASE_URL}/summary/', params=params)
-            if response.status_code == 200:
-                return True, response.json()
-            return False, response.json()
+            status_code, body = self._cached_get(f'{API_BASE_URL}/summary/', params)
+            return status_code == 200, body
+        except Exception as e:
+            return False, {'error': str(e)}
+    
+    def get_charts(self, upload_id: Optional[int] = None) -> Tuple[bool, Dict]:
+        """
+        Get chart aggregates computed over every row of an upload:
+        {'type_distribution', 'top_flowrate', 'histograms', 'sample', 'source'}.
+        """
+        try:
+            params = {'upload_id': upload_id} if upload_id else {}
+            status_code, body = self._cached_get(f'{API_BASE_URL}/charts/', params)
+            return status_code == 200, body
         except Exception as e:
             return False, {'error': str(e)}
     
     def get_history(self) -> Tuple[bool, Any]:
         """Get upload history."""
         try:
-            response = self.session.get(f'{API_BASE_URL}/history/')
-            if response.status_code == 200:
-                return True, response.json()
-            return False, response.json()
+            status_code, body = self._cached_get(f'{API_BASE_URL}/history/')
+            return status_code == 200, body
         except Exception as e:
             return False, {'error': str(e)}
     
@@ -115,9 +382,9 @@ class APIClient:
         """Download PDF report."""
         try:
             params = {'upload_id': upload_id} if upload_id else {}
-            response = self.session.get(f'{API_BASE_URL}/report/', params=params)
-            if response.status_code == 200:
-                return True, response.content
+            status_code, body = self._cached_get(f'{API_BASE_URL}/report/', params, binary=True)
+            if status_code == 200:
+                return True, body
             return False, b''
         except Exception as e:
             return False, b''
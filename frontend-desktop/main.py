@@ -31,19 +31,47 @@ class DataLoader(QThread):
     
     def run(self):
         try:
-            data_success, data = api_client.get_data(self.upload_id)
-            summary_success, summary = api_client.get_summary(self.upload_id)
-            history_success, history = api_client.get_history()
+            # Data page, summary and history arrive in a single round trip
+            success, dashboard = api_client.get_dashboard(self.upload_id)
+            if not success:
+                self.error.emit(dashboard.get('error', dashboard.get('detail', 'Request failed')))
+                return
+            
+            # Charts cover the whole upload, not just the first data page
+            charts = {}
+            if dashboard['upload']:
+                success, body = api_client.get_charts(dashboard['upload']['id'])
+                if success:
+                    charts = body
             
             self.finished.emit({
-                'data': data if data_success else [],
-                'summary': summary if summary_success else {},
-                'history': history if history_success else []
+                'data': dashboard['data']['results'],
+                'next_page': dashboard['data']['next'],
+                'summary': dashboard['summary'],
+                'charts': charts,
+                'history': dashboard['history']
             })
         except Exception as e:
             self.error.emit(str(e))
 
 
+class PageLoader(QThread):
+    """Background thread fetching the next page of equipment data."""
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+    
+    def __init__(self, page_url):
+        super().__init__()
+        self.page_url = page_url
+    
+    def run(self):
+        success, page = api_client.get_data(page_url=self.page_url)
+        if success:
+            self.finished.emit(page)
+        else:
+            self.error.emit(page.get('error', page.get('detail', 'Request failed')))
+
+
 class MainWindow(QMainWindow):
     """Main application window."""
     
@@ -52,6 +80,7 @@ class MainWindow(QMainWindow):
         self.user = None
         self.selected_upload_id = None
         self.loader = None
+        self.page_loader = None
         self.setup_ui()
         self.apply_styles()
     
@@ -147,6 +176,7 @@ class MainWindow(QMainWindow):
         
         # Data tab
         self.data_tab = DataTab()
+        self.data_tab.load_more_requested.connect(self.load_more_data)
         self.tabs.addTab(self.data_tab, '📋 Data')
         
         # Charts tab
@@ -499,11 +529,23 @@ class MainWindow(QMainWindow):
         summary = result.get('summary', {})
         history = result.get('history', [])
         
-        self.data_tab.set_data(data)
-        self.charts_tab.set_data(data, summary)
+        self.data_tab.set_data(data, result.get('next_page'))
+        self.charts_tab.set_data(result.get('charts', {}))
         self.summary_widget.set_summary(summary)
         self.history_tab.set_history(history)
     
+    def load_more_data(self, page_url):
+        """Fetch the next page of the data table in the background."""
+        if self.page_loader and self.page_loader.isRunning():
+            return
+        
+        self.page_loader = PageLoader(page_url)
+        self.page_loader.finished.connect(
+            lambda page: self.data_tab.append_data(page['results'], page['next'])
+        )
+        self.page_loader.error.connect(self.on_data_error)
+        self.page_loader.start()
+    
     def on_data_error(self, error):
         """Handle data loading error."""
         QMessageBox.warning(self, 'Error', f'Failed to load data: {error}')
@@ -15,8 +15,7 @@ class ChartsTab(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.data = []
-        self.summary = {}
+        self.charts = {}
         self.setup_ui()
         
         # Set matplotlib dark style
@@ -110,15 +109,14 @@ class ChartsTab(QWidget):
         main_layout.addWidget(self.empty_label)
         self.empty_label.hide()
     
-    def set_data(self, data, summary):
-        """Set chart data."""
-        self.data = data if data else []
-        self.summary = summary if summary else {}
+    def set_data(self, charts):
+        """Set chart data, as returned by /api/charts/."""
+        self.charts = charts if charts else {}
         self.update_charts()
     
     def update_charts(self):
         """Update all charts."""
-        if not self.data or not self.summary:
+        if not self.charts.get('type_distribution'):
             self.pie_container.hide()
             self.bar_container.hide()
             self.line_container.hide()
@@ -140,7 +138,7 @@ class ChartsTab(QWidget):
         ax = self.pie_figure.add_subplot(111)
         ax.set_facecolor('#1e293b')
         
-        type_dist = self.summary.get('type_distribution', {})
+        type_dist = self.charts.get('type_distribution', {})
         if type_dist:
             labels = list(type_dist.keys())
             values = list(type_dist.values())
@@ -165,12 +163,12 @@ class ChartsTab(QWidget):
         ax = self.bar_figure.add_subplot(111)
         ax.set_facecolor('#1e293b')
         
-        # Sort by flowrate and take top 10
-        sorted_data = sorted(self.data, key=lambda x: x.get('flowrate', 0), reverse=True)[:10]
+        # Top 10 by flowrate across the whole upload, largest first
+        top = self.charts.get('top_flowrate', [])
         
-        if sorted_data:
-            names = [d.get('name', '')[:10] for d in sorted_data]
-            flowrates = [d.get('flowrate', 0) for d in sorted_data]
+        if top:
+            names = [d.get('name', '')[:10] for d in top]
+            flowrates = [d.get('flowrate', 0) for d in top]
             
             bars = ax.bar(names, flowrates, color='#6366f1', edgecolor='#818cf8', linewidth=1)
             ax.set_xlabel('Equipment', color='#a0aec0')
@@ -193,10 +191,12 @@ class ChartsTab(QWidget):
         ax = self.line_figure.add_subplot(111)
         ax.set_facecolor('#1e293b')
         
-        if self.data:
-            names = [d.get('name', '')[:8] for d in self.data]
-            pressures = [d.get('pressure', 0) for d in self.data]
-            temperatures = [d.get('temperature', 0) for d in self.data]
+        # Row sample of the upload, not the loaded data page
+        sample = self.charts.get('sample', [])
+        if sample:
+            names = [d.get('name', '')[:8] for d in sample]
+            pressures = [d.get('pressure', 0) for d in sample]
+            temperatures = [d.get('temperature', 0) for d in sample]
             
             ax.plot(names, pressures, 'o-', color='#10b981', label='Pressure (bar)', linewidth=2, markersize=6)
             ax.plot(names, temperatures, 's-', color='#ef4444', label='Temperature (°C)', linewidth=2, markersize=6)
@@ -5,16 +5,19 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget,
     QTableWidgetItem, QHeaderView, QLineEdit, QPushButton, QFrame
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QColor
 
 
 class DataTab(QWidget):
     """Equipment data table tab."""
+    # Emitted with the next page's URL when the user asks for more rows
+    load_more_requested = pyqtSignal(str)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.data = []
+        self.next_page = None
         self.filtered_data = []
         self.setup_ui()
     
@@ -91,15 +94,41 @@ class DataTab(QWidget):
         layout.addWidget(self.table)
         
         # Status bar
+        footer = QHBoxLayout()
         self.status_label = QLabel('No data loaded')
         self.status_label.setStyleSheet('color: #64748b; font-size: 13px;')
-        layout.addWidget(self.status_label)
+        footer.addWidget(self.status_label)
+        footer.addStretch()
+        
+        self.load_more_btn = QPushButton('Load more rows')
+        self.load_more_btn.setStyleSheet('''
+            QPushButton {
+                background: #334155;
+                border: none;
+                border-radius: 8px;
+                padding: 8px 16px;
+                color: #f1f5f9;
+            }
+            QPushButton:hover {
+                background: #3b82f6;
+            }
+        ''')
+        self.load_more_btn.clicked.connect(lambda: self.load_more_requested.emit(self.next_page))
+        self.load_more_btn.hide()
+        footer.addWidget(self.load_more_btn)
+        layout.addLayout(footer)
     
-    def set_data(self, data):
-        """Set the equipment data."""
+    def set_data(self, data, next_page=None):
+        """Set the equipment data (the first page when ``next_page`` is set)."""
         self.data = data if data else []
+        self.next_page = next_page
+        self.load_more_btn.setVisible(bool(next_page))
         self.filter_data()
     
+    def append_data(self, data, next_page=None):
+        """Add the rows of a following page."""
+        self.set_data(self.data + data, next_page)
+    
     def filter_data(self):
         """Filter data based on search term."""
         search = self.search_input.text().lower()
@@ -148,7 +177,9 @@ class DataTab(QWidget):
         
         total = len(self.data)
         showing = len(self.filtered_data)
-        if total == showing:
+        if self.next_page:
+            self.status_label.setText(f'Showing {showing} of {total} loaded records (more available)')
+        elif total == showing:
             self.status_label.setText(f'Showing all {total} records')
         else:
             self.status_label.setText(f'Showing {showing} of {total} records')
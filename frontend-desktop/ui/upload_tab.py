@@ -3,12 +3,32 @@ Upload Tab for PyQt5 Desktop Application.
 """
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFileDialog, QFrame, QMessageBox
+    QFileDialog, QFrame, QMessageBox, QCheckBox
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont
 
 
+class UploadWorker(QThread):
+    """Background thread for uploading a file."""
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(bool, dict)
+    
+    def __init__(self, api_client, file_path, compress=False):
+        super().__init__()
+        self.api_client = api_client
+        self.file_path = file_path
+        self.compress = compress
+    
+    def run(self):
+        success, data = self.api_client.upload_csv(
+            self.file_path,
+            progress=lambda sent, total: self.progress.emit(sent, total),
+            compress=self.compress
+        )
+        self.finished.emit(success, data)
+
+
 class UploadTab(QWidget):
     """CSV file upload tab."""
     
@@ -18,6 +38,7 @@ class UploadTab(QWidget):
         super().__init__(parent)
         self.api_client = api_client
         self.selected_file = None
+        self.worker = None
         self.setup_ui()
     
     def setup_ui(self):
@@ -108,6 +129,11 @@ class UploadTab(QWidget):
         self.upload_btn.clicked.connect(self.upload_file)
         layout.addWidget(self.upload_btn)
         
+        # Compression option
+        self.compress_check = QCheckBox('Compress before sending (gzip)')
+        self.compress_check.setStyleSheet('color: #94a3b8; font-size: 13px;')
+        layout.addWidget(self.compress_check, alignment=Qt.AlignCenter)
+        
         # Status message
         self.status_label = QLabel('')
         self.status_label.setAlignment(Qt.AlignCenter)
@@ -119,7 +145,8 @@ class UploadTab(QWidget):
     def select_file(self):
         """Open file dialog to select CSV."""
         file_path, _ = QFileDialog.getOpenFileName(
-            self, 'Select CSV File', '', 'CSV Files (*.csv)'
+            self, 'Select CSV File', '',
+            'Data Files (*.csv *.csv.gz *.csv.bz2 *.csv.xz *.zip *.parquet *.arrow *.feather)'
         )
         
         if file_path:
@@ -146,8 +173,22 @@ class UploadTab(QWidget):
         self.upload_btn.setText('Uploading...')
         self.status_label.setText('')
         
-        success, data = self.api_client.upload_csv(self.selected_file)
-        
+        self.worker = UploadWorker(
+            self.api_client, self.selected_file, self.compress_check.isChecked()
+        )
+        self.worker.progress.connect(self.on_upload_progress)
+        self.worker.finished.connect(self.on_upload_finished)
+        self.worker.start()
+    
+    def on_upload_progress(self, sent, total):
+        """Show chunked upload progress."""
+        percent = int(sent * 100 / total) if total else 100
+        self.upload_btn.setText(f'Uploading... {percent}%')
+        if sent >= total:
+            self.upload_btn.setText('Processing...')
+    
+    def on_upload_finished(self, success, data):
+        """Handle upload result."""
         if success:
             count = data.get('equipment_count', 0)
             self.status_label.setStyleSheet('''
@@ -11,7 +11,9 @@ import './App.css';
 function App() {
   const [user, setUser] = useState(null);
   const [data, setData] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [summary, setSummary] = useState(null);
+  const [charts, setCharts] = useState(null);
   const [history, setHistory] = useState([]);
   const [selectedUploadId, setSelectedUploadId] = useState(null);
   const [activeTab, setActiveTab] = useState('dashboard');
@@ -35,12 +37,16 @@ function App() {
   const fetchData = async () => {
     setLoading(true);
     try {
-      const [dataRes, summaryRes] = await Promise.all([
+      const [dataRes, summaryRes, chartsRes] = await Promise.all([
         dataAPI.getData(selectedUploadId),
-        dataAPI.getSummary(selectedUploadId)
+        dataAPI.getSummary(selectedUploadId),
+        // 404 until there is an upload to chart
+        dataAPI.getCharts(selectedUploadId).catch(() => ({ data: null }))
       ]);
-      setData(dataRes.data);
+      setData(dataRes.data.results);
+      setNextPage(dataRes.data.next);
       setSummary(summaryRes.data);
+      setCharts(chartsRes.data);
     } catch (err) {
       console.error('Failed to fetch data:', err);
     } finally {
@@ -48,6 +54,17 @@ function App() {
     }
   };
 
+  const loadMoreData = async () => {
+    if (!nextPage) return;
+    try {
+      const res = await dataAPI.getData(selectedUploadId, { pageUrl: nextPage });
+      setData(rows => [...rows, ...res.data.results]);
+      setNextPage(res.data.next);
+    } catch (err) {
+      console.error('Failed to fetch more data:', err);
+    }
+  };
+
   const fetchHistory = async () => {
     try {
       const res = await dataAPI.getHistory();
@@ -66,7 +83,9 @@ function App() {
     localStorage.removeItem('user');
     setUser(null);
     setData([]);
+    setNextPage(null);
     setSummary(null);
+    setCharts(null);
     setHistory([]);
   };
 
@@ -163,7 +182,7 @@ function App() {
           {activeTab === 'dashboard' && (
             <>
               <Summary summary={summary} />
-              <Charts data={data} summary={summary} />
+              <Charts charts={charts} />
             </>
           )}
 
@@ -172,11 +191,11 @@ function App() {
           )}
 
           {activeTab === 'data' && (
-            <DataTable data={data} />
+            <DataTable data={data} hasMore={Boolean(nextPage)} onLoadMore={loadMoreData} />
           )}
 
           {activeTab === 'charts' && (
-            <Charts data={data} summary={summary} />
+            <Charts charts={charts} />
           )}
         </section>
       </main>
@@ -44,14 +44,28 @@ export const dataAPI = {
             headers: { 'Content-Type': 'multipart/form-data' },
         });
     },
-    getData: (uploadId = null) => {
-        const params = uploadId ? { upload_id: uploadId } : {};
+    // One keyset page of equipment rows ({ next, previous, results });
+    // pass a page's `next` link to fetch the following page
+    getData: (uploadId = null, { pageUrl = null, pageSize = 1000, filters = {} } = {}) => {
+        if (pageUrl) {
+            return api.get(pageUrl);
+        }
+        const params = { page_size: pageSize, ...filters };
+        if (uploadId) {
+            params.upload_id = uploadId;
+        }
         return api.get('/data/', { params });
     },
     getSummary: (uploadId = null) => {
         const params = uploadId ? { upload_id: uploadId } : {};
         return api.get('/summary/', { params });
     },
+    // Chart aggregates over every row of an upload (type distribution,
+    // top flowrates, histograms and a row sample)
+    getCharts: (uploadId = null) => {
+        const params = uploadId ? { upload_id: uploadId } : {};
+        return api.get('/charts/', { params });
+    },
     getHistory: () => api.get('/history/'),
     downloadReport: async (uploadId = null) => {
         const params = uploadId ? { upload_id: uploadId } : {};
@@ -21,8 +21,11 @@ const BORDER_COLORS = [
     'rgba(6, 182, 212, 1)',
 ];
 
-function Charts({ data, summary }) {
-    if (!data || data.length === 0 || !summary) {
+// Renders the /api/charts/ aggregates, which cover the whole upload rather
+// than the rows loaded into the data table
+function Charts({ charts }) {
+    const typeDistribution = charts?.type_distribution || {};
+    if (Object.keys(typeDistribution).length === 0) {
         return (
             <div className="charts-section">
                 <h2>📈 Visualizations</h2>
@@ -36,8 +39,8 @@ function Charts({ data, summary }) {
     }
 
     // Pie Chart - Type Distribution
-    const typeLabels = Object.keys(summary.type_distribution || {});
-    const typeValues = Object.values(summary.type_distribution || {});
+    const typeLabels = Object.keys(typeDistribution);
+    const typeValues = Object.values(typeDistribution);
 
     const pieData = {
         labels: typeLabels,
@@ -69,14 +72,14 @@ function Charts({ data, summary }) {
         }
     };
 
-    // Bar Chart - Flowrate by Equipment
-    const sortedByFlowrate = [...data].sort((a, b) => b.flowrate - a.flowrate).slice(0, 10);
+    // Bar Chart - Top Flowrates, largest first
+    const topFlowrate = charts.top_flowrate || [];
 
     const barData = {
-        labels: sortedByFlowrate.map(d => d.name),
+        labels: topFlowrate.map(d => d.name),
         datasets: [{
             label: 'Flowrate',
-            data: sortedByFlowrate.map(d => d.flowrate),
+            data: topFlowrate.map(d => d.flowrate),
             backgroundColor: 'rgba(99, 102, 241, 0.7)',
             borderColor: 'rgba(99, 102, 241, 1)',
             borderWidth: 2,
@@ -108,13 +111,15 @@ function Charts({ data, summary }) {
         }
     };
 
-    // Line Chart - Pressure vs Temperature
+    // Line Chart - Pressure vs Temperature of the row sample
+    const sample = charts.sample || [];
+
     const lineData = {
-        labels: data.map(d => d.name),
+        labels: sample.map(d => d.name),
         datasets: [
             {
                 label: 'Pressure (bar)',
-                data: data.map(d => d.pressure),
+                data: sample.map(d => d.pressure),
                 borderColor: 'rgba(16, 185, 129, 1)',
                 backgroundColor: 'rgba(16, 185, 129, 0.2)',
                 tension: 0.4,
@@ -122,7 +127,7 @@ function Charts({ data, summary }) {
             },
             {
                 label: 'Temperature (°C)',
-                data: data.map(d => d.temperature),
+                data: sample.map(d => d.temperature),
                 borderColor: 'rgba(239, 68, 68, 1)',
                 backgroundColor: 'rgba(239, 68, 68, 0.2)',
                 tension: 0.4,
@@ -1,6 +1,6 @@
 import { useState } from 'react';
 
-function DataTable({ data }) {
+function DataTable({ data, hasMore = false, onLoadMore }) {
     const [currentPage, setCurrentPage] = useState(1);
     const [sortField, setSortField] = useState('name');
     const [sortDirection, setSortDirection] = useState('asc');
@@ -120,7 +120,13 @@ function DataTable({ data }) {
             <div className="pagination">
                 <span className="page-info">
                     Showing {startIndex + 1}-{Math.min(startIndex + itemsPerPage, sortedData.length)} of {sortedData.length}
+                    {hasMore && ' loaded (more available)'}
                 </span>
+                {hasMore && (
+                    <button className="pagination-btn" onClick={onLoadMore}>
+                        Load more rows
+                    </button>
+                )}
                 <div className="page-controls">
                     <button
                         onClick={() => setCurrentPage(1)}